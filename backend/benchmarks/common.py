@@ -0,0 +1,58 @@
+"""
+Shared helpers for the benchmark scripts
+
+Run benchmarks from the backend directory, e.g. `python -m benchmarks.serialization`.
+"""
+import json
+import os
+import platform
+import statistics
+import subprocess
+import time
+from typing import Callable, Dict, List
+
+
+def offline_environment() -> None:
+    """Provide placeholder settings so modules can be imported without a .env file"""
+    os.environ.setdefault("SUPABASE_URL", "http://127.0.0.1:54321")
+    os.environ.setdefault("SUPABASE_ANON_KEY", "bench-anon-key")
+    os.environ.setdefault("SUPABASE_SERVICE_ROLE_KEY", "bench-service-role-key")
+    os.environ.setdefault("JWT_SECRET", "bench-secret")
+    os.environ.setdefault("DEBUG", "false")
+
+
+def time_call(fn: Callable[[], object], repeat: int = 5, warmup: int = 1) -> Dict:
+    """Run fn several times and return timing statistics in seconds"""
+    for _ in range(warmup):
+        fn()
+    samples: List[float] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return {
+        "min": min(samples),
+        "median": statistics.median(samples),
+        "max": max(samples),
+        "repeat": repeat,
+    }
+
+
+def environment_info() -> Dict:
+    """Metadata stored with results so runs can be compared across commits"""
+    try:
+        commit = subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except Exception:
+        commit = None
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+    }
+
+
+def write_results(path: str, results: Dict) -> None:
+    with open(path, "w", encoding="utf-8") as fh:
+        json.dump({"environment": environment_info(), **results}, fh, indent=2)
+    print(f"Results written to {path}")
@@ -0,0 +1,157 @@
+"""
+Reproducible synthetic college dataset for benchmarks and load tests
+
+    config = DatasetConfig.for_users(10_000)
+    college = seed_repositories(repos, config)
+
+Everything is derived from `seed`, so two runs with the same config produce the
+same users, hackathons and registrations.
+"""
+import random
+import uuid
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List
+
+DEFAULT_DEPARTMENTS = ("CSE", "ECE", "EEE", "MECH", "CIVIL", "IT", "AIDS", "BIO")
+DEFAULT_PASSWORD = "bench-password"
+
+
+@dataclass
+class DatasetConfig:
+    departments: int = 5
+    students_per_department: int = 200
+    teachers_per_department: int = 10
+    hackathons: int = 100
+    pending_hackathons: int = 10
+    registrations_per_hackathon: int = 50
+    activated_ratio: float = 0.8
+    seed: int = 42
+
+    @classmethod
+    def for_users(cls, total_users: int, **overrides) -> "DatasetConfig":
+        """Size students per department so the college has roughly total_users users"""
+        config = cls(**overrides)
+        staff = 2 + config.departments * (1 + config.teachers_per_department)
+        config.students_per_department = max(1, (total_users - staff) // config.departments)
+        return config
+
+    @property
+    def total_users(self) -> int:
+        return 2 + self.departments * (1 + self.teachers_per_department + self.students_per_department)
+
+
+@dataclass
+class SyntheticCollege:
+    """Handles to seeded entities that benchmarks and scenarios pick from"""
+    config: DatasetConfig
+    admin: Dict = field(default_factory=dict)
+    principal: Dict = field(default_factory=dict)
+    hods: List[Dict] = field(default_factory=list)
+    teachers: List[Dict] = field(default_factory=list)
+    students: List[Dict] = field(default_factory=list)
+    pending_students: List[Dict] = field(default_factory=list)
+    hackathon_ids: List[str] = field(default_factory=list)
+    pending_hackathon_ids: List[str] = field(default_factory=list)
+    registration_ids: List[str] = field(default_factory=list)
+
+    def summary(self) -> Dict:
+        return {
+            **asdict(self.config),
+            "total_users": self.config.total_users,
+            "registrations": len(self.registration_ids),
+        }
+
+
+def _user(college_id: str, name: str, role: str, department) -> Dict:
+    return {
+        "college_id": college_id,
+        "name": name,
+        "email": f"{college_id.lower()}@college.edu",
+        "role": role,
+        "department": department,
+        "is_active": True,
+        "auth_user_id": None,
+    }
+
+
+def generate_users(config: DatasetConfig) -> List[Dict]:
+    departments = DEFAULT_DEPARTMENTS[: config.departments] if config.departments <= len(DEFAULT_DEPARTMENTS) else [
+        f"DEPT{i:02d}" for i in range(config.departments)
+    ]
+    users = [_user("ADM0001", "Admin", "admin", None), _user("PRN0001", "Principal", "principal", None)]
+    for dept in departments:
+        users.append(_user(f"HOD{dept}", f"HOD {dept}", "hod", dept))
+        for i in range(config.teachers_per_department):
+            users.append(_user(f"TCH{dept}{i:04d}", f"Teacher {dept} {i}", "teacher", dept))
+        for i in range(config.students_per_department):
+            users.append(_user(f"STU{dept}{i:06d}", f"Student {dept} {i}", "student", dept))
+    return users
+
+
+def generate_hackathons(config: DatasetConfig, rng: random.Random) -> List[Dict]:
+    base = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    domains = ("AI", "Web", "IoT", "Security", "FinTech", "Health")
+    hackathons = []
+    for i in range(config.hackathons + config.pending_hackathons):
+        pending = i >= config.hackathons
+        hackathons.append({
+            "id": str(uuid.UUID(int=rng.getrandbits(128))),
+            "title": f"Hackathon {i}",
+            "description": "Synthetic hackathon for benchmarking",
+            "link": f"https://hackathon{i}.example.com/",
+            "domain": rng.choice(domains),
+            "deadline": (base + timedelta(days=rng.randint(0, 365))).isoformat() if rng.random() > 0.1 else None,
+            "is_active": not pending,
+            "source": "ai" if pending else "manual",
+            "approval_status": "pending" if pending else "approved",
+            "approved_by": None,
+            "created_by_college_id": "ADM0001",
+            "created_at": (base + timedelta(minutes=i)).isoformat(),
+        })
+    return hackathons
+
+
+def seed_repositories(repos, config: DatasetConfig) -> SyntheticCollege:
+    """Populate in-memory repositories (and their auth stand-in) with a synthetic college"""
+    rng = random.Random(config.seed)
+    college = SyntheticCollege(config=config)
+
+    for user in generate_users(config):
+        activated = user["role"] != "student" or rng.random() < config.activated_ratio
+        if activated:
+            auth_user = repos.auth.create_user(user["email"], DEFAULT_PASSWORD)
+            user["auth_user_id"] = auth_user["id"]
+        row = repos.users.insert(user)
+        if row["role"] == "admin":
+            college.admin = row
+        elif row["role"] == "principal":
+            college.principal = row
+        elif row["role"] == "hod":
+            college.hods.append(row)
+        elif row["role"] == "teacher":
+            college.teachers.append(row)
+        elif activated:
+            college.students.append(row)
+        else:
+            college.pending_students.append(row)
+
+    for hackathon in generate_hackathons(config, rng):
+        repos.hackathons.insert(hackathon)
+        if hackathon["approval_status"] == "pending":
+            college.pending_hackathon_ids.append(hackathon["id"])
+        else:
+            college.hackathon_ids.append(hackathon["id"])
+
+    per_hackathon = min(config.registrations_per_hackathon, len(college.students))
+    for hackathon_id in college.hackathon_ids:
+        for student in rng.sample(college.students, per_hackathon):
+            row = repos.registrations.insert({
+                "hackathon_id": hackathon_id,
+                "student_college_id": student["college_id"],
+                "link_submission": f"https://github.com/{student['college_id'].lower()}/project",
+                "status": "applied",
+            })
+            college.registration_ids.append(row["id"])
+
+    return college
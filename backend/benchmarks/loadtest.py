@@ -0,0 +1,286 @@
+"""
+End-to-end HTTP load harness for one uvicorn worker running `main.app`
+
+    python -m benchmarks.loadtest --scenario mixed --duration 30 --concurrency 64 \
+        --users 10000 --latency-ms 15 --jitter-ms 5 [--slo-file slo.json] [--output run.json]
+
+Starts the Supabase stub (`benchmarks.stub_supabase`) seeded with a synthetic
+college, launches uvicorn against it, measures upstream calls per request for
+every route with a short sequential calibration pass, then drives the chosen
+scenario and reports throughput and p50/p95/p99 per route. Exits with status 1
+when any SLO is missed.
+
+Scenarios: login_storm, list_polling, registration_burst, staff_stats, mixed.
+SLO file format: {"GET /hackathons/": {"p95_ms": 150, "p99_ms": 400, "max_error_rate": 0.01}}
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+import httpx
+
+from benchmarks.common import environment_info
+from benchmarks.dataset import DEFAULT_PASSWORD, DatasetConfig, SyntheticCollege, seed_repositories
+from benchmarks.stub_supabase import STUB_ANON_KEY, STUB_SERVICE_ROLE_KEY, StubRepositories, StubSupabaseServer
+
+DEFAULT_SLOS = {
+    "POST /auth/login": {"p95_ms": 300, "p99_ms": 600, "max_error_rate": 0.01},
+    "GET /auth/me": {"p95_ms": 150, "p99_ms": 300, "max_error_rate": 0.01},
+    "GET /hackathons/": {"p95_ms": 200, "p99_ms": 400, "max_error_rate": 0.01},
+    "POST /hackathons/{id}/register": {"p95_ms": 300, "p99_ms": 600, "max_error_rate": 0.01},
+    "GET /hackathons/{id}/stats": {"p95_ms": 500, "p99_ms": 1000, "max_error_rate": 0.01},
+    "GET /admin/dashboard/stats": {"p95_ms": 500, "p99_ms": 1000, "max_error_rate": 0.01},
+}
+
+# Route -> weight for each scenario
+SCENARIOS = {
+    "login_storm": {"POST /auth/login": 9, "GET /auth/me": 1},
+    "list_polling": {"GET /hackathons/": 9, "GET /auth/me": 1},
+    "registration_burst": {"POST /hackathons/{id}/register": 8, "GET /hackathons/": 2},
+    "staff_stats": {"GET /hackathons/{id}/stats": 7, "GET /admin/dashboard/stats": 3},
+    "mixed": {
+        "POST /auth/login": 1,
+        "GET /auth/me": 2,
+        "GET /hackathons/": 10,
+        "POST /hackathons/{id}/register": 3,
+        "GET /hackathons/{id}/stats": 2,
+        "GET /admin/dashboard/stats": 1,
+    },
+}
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an unsorted sample list"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[rank]
+
+
+class Workload:
+    """Builds one request per route label from the seeded college"""
+
+    def __init__(self, college: SyntheticCollege, server: StubSupabaseServer):
+        rng = random.Random(college.config.seed)
+        self._rng = rng
+        self.students = college.students
+        self.student_tokens = [server.db.issue_token(s["auth_user_id"]) for s in college.students]
+        self.staff_tokens = [server.db.issue_token(u["auth_user_id"]) for u in [college.admin, college.principal] + college.hods]
+        self.admin_token = self.staff_tokens[0]
+        self.hackathon_ids = college.hackathon_ids
+        # Deadline-hour burst: every student registers for the newest hackathons, one pair at a time
+        self._registrations = itertools.product(college.hackathon_ids[-5:], range(len(college.students)))
+
+    def _auth(self, token: str) -> Dict[str, str]:
+        return {"Authorization": f"Bearer {token}"}
+
+    def request(self, route: str) -> Tuple[str, str, Dict]:
+        """(method, url, httpx kwargs) for a route label"""
+        rng = self._rng
+        if route == "POST /auth/login":
+            student = rng.choice(self.students)
+            return "POST", "/auth/login", {"json": {"email": student["email"], "password": DEFAULT_PASSWORD}}
+        if route == "GET /auth/me":
+            return "GET", "/auth/me", {"headers": self._auth(rng.choice(self.student_tokens))}
+        if route == "GET /hackathons/":
+            return "GET", "/hackathons/", {"headers": self._auth(rng.choice(self.student_tokens))}
+        if route == "POST /hackathons/{id}/register":
+            pair = next(self._registrations, None)
+            hackathon_id, index = pair if pair else (rng.choice(self.hackathon_ids), rng.randrange(len(self.students)))
+            return "POST", f"/hackathons/{hackathon_id}/register", {
+                "headers": self._auth(self.student_tokens[index]),
+                "json": {"notes": "load test"},
+            }
+        if route == "GET /hackathons/{id}/stats":
+            return "GET", f"/hackathons/{rng.choice(self.hackathon_ids)}/stats", {
+                "headers": self._auth(rng.choice(self.staff_tokens))
+            }
+        if route == "GET /admin/dashboard/stats":
+            return "GET", "/admin/dashboard/stats", {"headers": self._auth(self.admin_token)}
+        raise ValueError(f"Unknown route {route}")
+
+
+def start_app(stub_url: str, port: int) -> subprocess.Popen:
+    env = {
+        **os.environ,
+        "SUPABASE_URL": stub_url,
+        "SUPABASE_ANON_KEY": STUB_ANON_KEY,
+        "SUPABASE_SERVICE_ROLE_KEY": STUB_SERVICE_ROLE_KEY,
+        "JWT_SECRET": "loadtest-secret",
+        "REPOSITORY_BACKEND": "supabase",
+        "DEBUG": "false",
+    }
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", "1", "--log-level", "warning"],
+        env=env,
+    )
+
+
+async def wait_ready(base_url: str, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        while time.monotonic() < deadline:
+            try:
+                if (await client.get("/health")).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError("App did not become ready")
+
+
+async def calibrate(client: httpx.AsyncClient, stub: httpx.AsyncClient, workload: Workload, routes, samples: int) -> Dict[str, float]:
+    """Upstream calls per request, measured one request at a time"""
+    calls = {}
+    for route in routes:
+        await stub.post("/__stub/reset")
+        for _ in range(samples):
+            method, url, kwargs = workload.request(route)
+            await client.request(method, url, **kwargs)
+        calls[route] = (await stub.get("/__stub/stats")).json()["requests"] / samples
+    await stub.post("/__stub/reset")
+    return calls
+
+
+async def drive(client: httpx.AsyncClient, workload: Workload, weights: Dict[str, int], duration: float, concurrency: int):
+    routes, route_weights = zip(*weights.items())
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    errors: Dict[str, int] = defaultdict(int)
+    deadline = time.monotonic() + duration
+
+    async def worker(seed: int):
+        rng = random.Random(seed)
+        while time.monotonic() < deadline:
+            route = rng.choices(routes, route_weights)[0]
+            method, url, kwargs = workload.request(route)
+            start = time.perf_counter()
+            try:
+                response = await client.request(method, url, **kwargs)
+                failed = response.status_code >= 500 or response.status_code in (401, 403)
+            except httpx.HTTPError:
+                failed = True
+            latencies[route].append((time.perf_counter() - start) * 1000)
+            if failed:
+                errors[route] += 1
+
+    started = time.monotonic()
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    return latencies, errors, time.monotonic() - started
+
+
+def build_report(latencies, errors, elapsed: float, upstream: Dict[str, float], slos: Dict) -> Dict:
+    report = {"elapsed_s": elapsed, "total_requests": 0, "throughput_rps": 0.0, "routes": {}, "slo_failures": []}
+    for route, samples in sorted(latencies.items()):
+        count = len(samples)
+        route_report = {
+            "requests": count,
+            "throughput_rps": count / elapsed,
+            "error_rate": errors.get(route, 0) / count if count else 0.0,
+            "p50_ms": percentile(samples, 50),
+            "p95_ms": percentile(samples, 95),
+            "p99_ms": percentile(samples, 99),
+            "upstream_calls_per_request": upstream.get(route),
+        }
+        report["routes"][route] = route_report
+        report["total_requests"] += count
+        for key, limit in slos.get(route, {}).items():
+            actual = route_report["error_rate"] if key == "max_error_rate" else route_report.get(key)
+            if actual is not None and actual > limit:
+                report["slo_failures"].append({"route": route, "metric": key, "limit": limit, "actual": actual})
+    report["throughput_rps"] = report["total_requests"] / elapsed if elapsed else 0.0
+    return report
+
+
+def print_report(report: Dict) -> None:
+    print(f"\n{report['total_requests']} requests in {report['elapsed_s']:.1f}s ({report['throughput_rps']:.1f} req/s)")
+    print(f"{'route':<34}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'errors':>8}{'upstream':>10}")
+    for route, r in report["routes"].items():
+        upstream = r["upstream_calls_per_request"]
+        print(f"{route:<34}{r['throughput_rps']:>9.1f}{r['p50_ms']:>9.1f}{r['p95_ms']:>9.1f}{r['p99_ms']:>9.1f}"
+              f"{r['error_rate']:>8.1%}{upstream if upstream is not None else '-':>10}")
+    for failure in report["slo_failures"]:
+        print(f"SLO MISSED: {failure['route']} {failure['metric']} = {failure['actual']:.3f} > {failure['limit']}")
+
+
+async def run(args) -> Dict:
+    stub_server = StubSupabaseServer(port=args.stub_port, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms)
+    config = DatasetConfig.for_users(args.users, seed=args.seed)
+    college = seed_repositories(StubRepositories(stub_server.db), config)
+    stub_server.start()
+
+    app_port = args.app_port or _free_port()
+    base_url = f"http://127.0.0.1:{app_port}"
+    app = start_app(stub_server.url, app_port)
+    try:
+        await wait_ready(base_url)
+        workload = Workload(college, stub_server)
+        weights = SCENARIOS[args.scenario]
+        limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+        async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=args.timeout) as client, \
+                httpx.AsyncClient(base_url=stub_server.url) as stub:
+            upstream = await calibrate(client, stub, workload, weights, args.calibration_samples)
+            latencies, errors, elapsed = await drive(client, workload, weights, args.duration, args.concurrency)
+    finally:
+        app.terminate()
+        app.wait(timeout=10)
+        stub_server.stop()
+
+    slos = DEFAULT_SLOS
+    if args.slo_file:
+        with open(args.slo_file, encoding="utf-8") as fh:
+            slos = json.load(fh)
+    report = build_report(latencies, errors, elapsed, upstream, slos)
+    report["scenario"] = args.scenario
+    report["dataset"] = college.summary()
+    report["settings"] = {
+        "concurrency": args.concurrency, "duration_s": args.duration,
+        "latency_ms": args.latency_ms, "jitter_ms": args.jitter_ms,
+    }
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenario", choices=sorted(SCENARIOS), default="mixed")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds of load")
+    parser.add_argument("--concurrency", type=int, default=64, help="concurrent virtual clients")
+    parser.add_argument("--users", type=int, default=5000, help="size of the synthetic college")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--latency-ms", type=float, default=10.0, help="injected upstream latency")
+    parser.add_argument("--jitter-ms", type=float, default=5.0)
+    parser.add_argument("--timeout", type=float, default=30.0, help="client timeout per request")
+    parser.add_argument("--calibration-samples", type=int, default=5)
+    parser.add_argument("--app-port", type=int)
+    parser.add_argument("--stub-port", type=int, default=0)
+    parser.add_argument("--slo-file")
+    parser.add_argument("--output")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    print_report(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            json.dump({"environment": environment_info(), **report}, fh, indent=2)
+    if report["slo_failures"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
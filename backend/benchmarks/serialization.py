@@ -0,0 +1,125 @@
+"""
+Per-row serialization cost of the list endpoints, before and after the fast path
+
+    python -m benchmarks.serialization --rows 10000 [--output results.json]
+
+"before" reproduces the old route behaviour: build a response model per row,
+then FastAPI dumps, re-validates and JSON-encodes the list for response_model.
+"""
+import argparse
+import json
+import uuid
+from datetime import datetime, timedelta
+
+from benchmarks.common import offline_environment, time_call, write_results
+
+offline_environment()
+
+from pydantic import TypeAdapter  # noqa: E402
+from typing import List  # noqa: E402
+from models.hackathon import HackathonResponse, HackathonRegistrationResponse  # noqa: E402
+from models.user import UserResponse  # noqa: E402
+from core.serialization import serialize_rows  # noqa: E402
+
+
+def make_hackathons(n: int):
+    base = datetime(2025, 1, 1)
+    return [
+        {
+            "id": str(uuid.UUID(int=i)),
+            "title": f"Hackathon {i}",
+            "description": "Build something useful in 48 hours",
+            "link": f"https://hack{i}.example.com/event",
+            "domain": "AI",
+            "deadline": (base + timedelta(days=i % 90)).isoformat() + "+00:00",
+            "is_active": True,
+            "approval_status": "approved",
+            "approved_by": None,
+            "source": "manual",
+            "suggested_by_model": None,
+            "created_by_college_id": "STAFF001",
+            "created_at": base.isoformat() + "+00:00",
+            "updated_at": base.isoformat() + "+00:00",
+        }
+        for i in range(n)
+    ]
+
+
+def make_registrations(n: int):
+    return [
+        {
+            "id": str(uuid.UUID(int=i)),
+            "hackathon_id": str(uuid.UUID(int=1)),
+            "student_college_id": f"STU{i:06d}",
+            "link_submission": f"https://github.com/student{i}/project",
+            "notes": None,
+            "status": "applied",
+            "acknowledged_by": None,
+            "created_at": "2025-01-01T00:00:00+00:00",
+            "updated_at": "2025-01-01T00:00:00+00:00",
+        }
+        for i in range(n)
+    ]
+
+
+def make_users(n: int):
+    return [
+        {
+            "id": str(uuid.UUID(int=i)),
+            "college_id": f"STU{i:06d}",
+            "name": f"Student {i}",
+            "email": f"student{i}@college.edu",
+            "role": "student",
+            "department": ("CSE", "ECE", "MECH", "CIVIL")[i % 4],
+            "is_active": True,
+            "auth_user_id": None,
+            "created_at": "2025-01-01T00:00:00+00:00",
+            "updated_at": "2025-01-01T00:00:00+00:00",
+        }
+        for i in range(n)
+    ]
+
+
+def before(model, rows) -> bytes:
+    """Old path: model per row, then response_model dump + validate + serialize + json.dumps"""
+    objects = [model(**row) for row in rows]
+    adapter = TypeAdapter(List[model])
+    content = [obj.model_dump() for obj in objects]
+    validated = adapter.validate_python(content)
+    return json.dumps(adapter.dump_python(validated, mode="json")).encode("utf-8")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output")
+    args = parser.parse_args()
+
+    datasets = {
+        "hackathons": (HackathonResponse, make_hackathons(args.rows)),
+        "registrations": (HackathonRegistrationResponse, make_registrations(args.rows)),
+        "users": (UserResponse, make_users(args.rows)),
+    }
+    variants = {
+        "before": before,
+        "validated_once": lambda model, rows: serialize_rows(model, rows, trusted=False),
+        "trusted": lambda model, rows: serialize_rows(model, rows, trusted=True),
+    }
+
+    results = {"rows": args.rows, "per_row_us": {}}
+    print(f"{'endpoint':<15}{'variant':<16}{'median ms':>12}{'per row us':>12}")
+    for name, (model, rows) in datasets.items():
+        results["per_row_us"][name] = {}
+        for variant, fn in variants.items():
+            timing = time_call(lambda: fn(model, rows), repeat=args.repeat)
+            per_row = timing["median"] / args.rows * 1e6
+            results["per_row_us"][name][variant] = per_row
+            print(f"{name:<15}{variant:<16}{timing['median'] * 1e3:>12.2f}{per_row:>12.2f}")
+
+    if args.output:
+        write_results(args.output, results)
+
+
+if __name__ == "__main__":
+    main()
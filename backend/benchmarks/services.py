@@ -0,0 +1,204 @@
+"""
+Service-layer microbenchmarks against the in-memory repositories
+
+    python -m benchmarks.services [--scales 1000,10000,100000] [--output results.json]
+    python -m benchmarks.services --compare results-main.json --output results-branch.json
+
+Each AuthService/HackathonService method and the role dependencies are timed at
+every scale on a reproducible synthetic college. Results are saved as JSON
+(microseconds per call) and --compare prints the change against an earlier run.
+"""
+import argparse
+import itertools
+import json
+import sys
+from typing import Callable, Dict
+
+from benchmarks.common import offline_environment, time_call, write_results
+
+offline_environment()
+import os  # noqa: E402
+
+os.environ["REPOSITORY_BACKEND"] = "memory"
+
+from types import SimpleNamespace  # noqa: E402
+from fastapi.security import HTTPAuthorizationCredentials  # noqa: E402
+from config.repositories import build_repositories, repos  # noqa: E402
+from dependencies.auth import get_current_user, require_admin, require_admin_principal_hod_teacher  # noqa: E402
+from models.user import ActivateAccountRequest, AddUserRequest, UserRole  # noqa: E402
+from services.auth import AuthService  # noqa: E402
+from services.hackathon import HackathonService  # noqa: E402
+from benchmarks.dataset import DEFAULT_PASSWORD, DatasetConfig, SyntheticCollege, seed_repositories  # noqa: E402
+
+
+def reset_repositories() -> None:
+    """Swap in fresh in-memory repositories behind the shared `repos` instance"""
+    fresh = build_repositories("memory")
+    for name in vars(fresh):
+        setattr(repos, name, getattr(fresh, name))
+
+
+def build_cases(college: SyntheticCollege, calls: int) -> Dict[str, Callable[[int], object]]:
+    """Benchmark name -> fn(i) performing one call; i is unique across the whole run"""
+    admin, student, teacher = college.admin, college.students[0], college.teachers[0]
+    admin_token = repos.auth.issue_token(admin["auth_user_id"])
+    credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=admin_token)
+    request = SimpleNamespace(scope={})
+    hackathon_id = college.hackathon_ids[0]
+    target = HackathonService.create_hackathon(
+        {"title": "Registration target", "link": "https://target.example.com/"}, admin
+    )
+    pending = iter(college.pending_hackathon_ids)
+    pending_students = iter(college.pending_students)
+    students = iter(college.students)
+    registrations = itertools.cycle(college.registration_ids)
+
+    return {
+        "AuthService.verify_jwt_token": lambda i: AuthService.verify_jwt_token(admin_token),
+        "AuthService.get_user_by_auth_id": lambda i: AuthService.get_user_by_auth_id(student["auth_user_id"]),
+        "AuthService.get_user_by_college_id": lambda i: AuthService.get_user_by_college_id(student["college_id"]),
+        "AuthService.add_user": lambda i: AuthService.add_user(AddUserRequest(
+            college_id=f"NEW{i:07d}", name="New", email=f"new{i}@college.edu", role=UserRole.STUDENT, department="CSE"
+        )),
+        "AuthService.activate_account": lambda i: _activate(next(pending_students, None)),
+        "AuthService.login": lambda i: AuthService.login(student["email"], DEFAULT_PASSWORD),
+        "AuthService.list_users": lambda i: AuthService.list_users(role="student"),
+        "AuthService.get_dashboard_stats": lambda i: AuthService.get_dashboard_stats(),
+        "dependencies.get_current_user": lambda i: get_current_user(request, credentials),
+        "dependencies.require_admin": lambda i: require_admin(get_current_user(request, credentials)),
+        "dependencies.require_admin_principal_hod_teacher": lambda i: require_admin_principal_hod_teacher(
+            get_current_user(request, credentials)
+        ),
+        "HackathonService.create_hackathon": lambda i: HackathonService.create_hackathon(
+            {"title": f"Bench {i}", "link": f"https://bench{i}.example.com/"}, teacher
+        ),
+        "HackathonService.list_hackathons": lambda i: HackathonService.list_hackathons(),
+        "HackathonService.list_pending": lambda i: HackathonService.list_pending(),
+        "HackathonService.approve_hackathon": lambda i: _approve(next(pending, None), admin),
+        "HackathonService.register_for_hackathon": lambda i: _register(target["id"], next(students, None)),
+        "HackathonService.list_registrations": lambda i: HackathonService.list_registrations(hackathon_id),
+        "HackathonService.acknowledge_registration": lambda i: HackathonService.acknowledge_registration(
+            next(registrations), teacher, "acknowledged"
+        ),
+        "HackathonService.get_hackathon_stats": lambda i: HackathonService.get_hackathon_stats(hackathon_id),
+        "HackathonService.get_changes": lambda i: HackathonService.get_changes(None, student, 500),
+    }
+
+
+def _activate(user):
+    if user is None:
+        raise RuntimeError("Not enough pending students; lower --calls or --repeat")
+    AuthService.activate_account(ActivateAccountRequest(
+        college_id=user["college_id"], email=user["email"], password=DEFAULT_PASSWORD
+    ))
+
+
+def _approve(hackathon_id, admin):
+    if hackathon_id is None:
+        raise RuntimeError("Not enough pending hackathons; raise pending_hackathons")
+    HackathonService.approve_hackathon(hackathon_id, admin)
+
+
+def _register(hackathon_id, student):
+    if student is None:
+        raise RuntimeError("Not enough students; lower --calls or --repeat")
+    HackathonService.register_for_hackathon(hackathon_id, student, {})
+
+
+def run_scale(config: DatasetConfig, calls: int, repeat: int, only: str | None) -> Dict:
+    reset_repositories()
+    college = seed_repositories(repos, config)
+    # Consuming benchmarks draw one fresh entity per call across warmup + repeats.
+    needed = calls * (repeat + 1)
+    for i in range(len(college.pending_hackathon_ids), needed):
+        row = repos.hackathons.insert({
+            "title": f"Pending {i}", "link": f"https://pending{i}.example.com/",
+            "approval_status": "pending", "source": "ai", "is_active": False,
+        })
+        college.pending_hackathon_ids.append(row["id"])
+
+    results = {}
+    counter = itertools.count()
+    for name, fn in build_cases(college, calls).items():
+        if only and only not in name:
+            continue
+        if name == "AuthService.activate_account" and len(college.pending_students) < needed:
+            print(f"  skipping {name}: only {len(college.pending_students)} pending students", file=sys.stderr)
+            continue
+
+        def batch():
+            for _ in range(calls):
+                fn(next(counter))
+
+        timing = time_call(batch, repeat=repeat)
+        results[name] = {
+            "per_call_us": timing["median"] / calls * 1e6,
+            "min_per_call_us": timing["min"] / calls * 1e6,
+            "calls": calls,
+            "repeat": repeat,
+        }
+        print(f"  {name:<55}{results[name]['per_call_us']:>12.1f} us")
+    return {"dataset": college.summary(), "methods": results}
+
+
+def compare(previous_path: str, current: Dict, threshold: float) -> int:
+    """Print per-method change against a previous results file; returns number of regressions"""
+    with open(previous_path, encoding="utf-8") as fh:
+        previous = json.load(fh)
+    regressions = 0
+    print(f"\nComparison with {previous_path} (commit {previous.get('environment', {}).get('commit')})")
+    for scale, data in current["scales"].items():
+        old_methods = previous.get("scales", {}).get(scale, {}).get("methods", {})
+        for name, result in data["methods"].items():
+            old = old_methods.get(name)
+            if not old:
+                continue
+            change = result["per_call_us"] / old["per_call_us"] - 1
+            flag = ""
+            if change > threshold:
+                flag = "  REGRESSION"
+                regressions += 1
+            print(f"  {scale:>7} {name:<55}{change:>+9.1%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", default="1000,10000,100000", help="comma separated total user counts")
+    parser.add_argument("--departments", type=int, default=5)
+    parser.add_argument("--students-per-department", type=int, help="overrides --scales with a single custom size")
+    parser.add_argument("--hackathons", type=int, default=100)
+    parser.add_argument("--registrations-per-hackathon", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--calls", type=int, default=20, help="calls per timed batch")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--only", help="run only benchmarks whose name contains this string")
+    parser.add_argument("--output")
+    parser.add_argument("--compare", help="previous results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="regression threshold for --compare")
+    args = parser.parse_args()
+
+    common = dict(
+        departments=args.departments,
+        hackathons=args.hackathons,
+        registrations_per_hackathon=args.registrations_per_hackathon,
+        seed=args.seed,
+    )
+    if args.students_per_department:
+        configs = [DatasetConfig(students_per_department=args.students_per_department, **common)]
+    else:
+        configs = [DatasetConfig.for_users(int(n), **common) for n in args.scales.split(",")]
+
+    output = {"scales": {}}
+    for config in configs:
+        print(f"Scale: {config.total_users} users")
+        output["scales"][str(config.total_users)] = run_scale(config, args.calls, args.repeat, args.only)
+
+    if args.output:
+        write_results(args.output, output)
+    if args.compare and compare(args.compare, output, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
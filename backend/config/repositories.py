@@ -0,0 +1,111 @@
+import threading
+from dataclasses import dataclass
+from typing import Optional
+from config.settings import settings
+from core.replicas import Replica, ReplicaRouter
+from core.upstream import UpstreamProxy
+from repositories.base import (
+    AuthGateway,
+    HackathonRepository,
+    IdempotencyRepository,
+    JobRepository,
+    RegistrationRepository,
+    TombstoneRepository,
+    UserRepository,
+)
+
+
+@dataclass
+class Repositories:
+    """Data access used by the services, selected by Settings.REPOSITORY_BACKEND"""
+    users: UserRepository
+    hackathons: HackathonRepository
+    registrations: RegistrationRepository
+    tombstones: TombstoneRepository
+    idempotency: IdempotencyRepository
+    jobs: JobRepository
+    auth: AuthGateway
+    backend: str
+    configured: bool = True
+
+
+def _instrumented(repos: Repositories, resilient: bool = False, router: Optional[ReplicaRouter] = None) -> Repositories:
+    """Route every repository call through the upstream layer (metrics and friends)"""
+    repos.users = UpstreamProxy(repos.users, "college_users", resilient, router)
+    repos.hackathons = UpstreamProxy(repos.hackathons, "hackathons", resilient, router)
+    repos.registrations = UpstreamProxy(repos.registrations, "hackathon_registrations", resilient, router)
+    repos.tombstones = UpstreamProxy(repos.tombstones, "sync_tombstones", resilient, router)
+    repos.idempotency = UpstreamProxy(repos.idempotency, "idempotency_keys", resilient)
+    repos.jobs = UpstreamProxy(repos.jobs, "jobs", resilient)
+    repos.auth = UpstreamProxy(repos.auth, "auth", resilient)
+    return repos
+
+
+def build_repositories(backend: str) -> Repositories:
+    if backend == "memory":
+        from repositories.memory import (
+            MemoryAuthGateway,
+            MemoryHackathonRepository,
+            MemoryIdempotencyRepository,
+            MemoryJobRepository,
+            MemoryRegistrationRepository,
+            MemoryTombstoneRepository,
+            MemoryUserRepository,
+        )
+
+        lock = threading.RLock()
+        tombstones = MemoryTombstoneRepository(lock)
+        users = MemoryUserRepository(lock)
+        registrations = MemoryRegistrationRepository(lock, tombstones, users)
+        return _instrumented(Repositories(
+            users=users,
+            hackathons=MemoryHackathonRepository(lock, registrations, tombstones),
+            registrations=registrations,
+            tombstones=tombstones,
+            idempotency=MemoryIdempotencyRepository(lock),
+            jobs=MemoryJobRepository(lock),
+            auth=MemoryAuthGateway(lock),
+            backend=backend,
+        ))
+
+    if backend == "supabase":
+        from config.supabase import replica_clients, supabase, supabase_admin
+        from repositories.supabase import (
+            SupabaseAuthGateway,
+            SupabaseHackathonRepository,
+            SupabaseIdempotencyRepository,
+            SupabaseJobRepository,
+            SupabaseRegistrationRepository,
+            SupabaseTombstoneRepository,
+            SupabaseUserRepository,
+        )
+
+        replicas = [
+            Replica(
+                f"replica{index}",
+                {
+                    "college_users": SupabaseUserRepository(client),
+                    "hackathons": SupabaseHackathonRepository(client),
+                    "hackathon_registrations": SupabaseRegistrationRepository(client),
+                },
+                lambda client=client: client.rpc("replica_lag_seconds").execute().data,
+            )
+            for index, client in enumerate(replica_clients, 1)
+        ]
+        return _instrumented(Repositories(
+            users=SupabaseUserRepository(supabase_admin),
+            hackathons=SupabaseHackathonRepository(supabase_admin),
+            registrations=SupabaseRegistrationRepository(supabase_admin),
+            tombstones=SupabaseTombstoneRepository(supabase_admin),
+            idempotency=SupabaseIdempotencyRepository(supabase_admin),
+            jobs=SupabaseJobRepository(supabase_admin),
+            auth=SupabaseAuthGateway(supabase, supabase_admin),
+            backend=backend,
+            configured=supabase_admin is not None,
+        ), resilient=True, router=ReplicaRouter(replicas) if replicas else None)
+
+    raise ValueError(f"Unknown REPOSITORY_BACKEND '{backend}'. Use 'supabase' or 'memory'")
+
+
+# Global repositories instance
+repos = build_repositories(settings.REPOSITORY_BACKEND)
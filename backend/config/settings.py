@@ -25,6 +25,114 @@ class Settings(BaseSettings):
     # CORS Configuration
     ALLOWED_ORIGINS: list[str] = ["*"]
     
+    # Data backend: "supabase" (default) or "memory" for offline testing and benchmarks
+    REPOSITORY_BACKEND: str = "supabase"
+    
+    # Batch endpoint
+    BATCH_MAX_REQUESTS: int = 25
+    
+    # Observability
+    METRICS_ENABLED: bool = True
+    METRICS_SCRAPE_TOKEN: Optional[str] = None  # bearer token for GET /metrics; without it only admins can scrape
+    SERVER_TIMING_ENABLED: bool = True
+    SERVER_TIMING_LOG: bool = False  # one JSON line per request on the "hackathon.timing" logger
+    
+    # On-demand profiling of single requests by admins (X-Profile header)
+    PROFILING_ENABLED: bool = True
+    PROFILE_SAMPLE_INTERVAL_MS: float = 1.0
+    
+    # Tracing: OpenTelemetry-style spans exported locally as JSON lines; see core/tracing.py
+    TRACING_ENABLED: bool = False
+    TRACING_EXPORTER: str = "console"  # "console" (hackathon.tracing logger) or "file"
+    TRACING_FILE: str = "traces.jsonl"
+    TRACING_SAMPLE_RATIO: float = 1.0  # for requests without an incoming traceparent
+    
+    # Upstream round-trip budgets per route ("GET /hackathons/": 3); see core/budget.py
+    ROUND_TRIP_BUDGET_MODE: Optional[str] = None  # "off", "warn" or "raise"; defaults to "warn" when DEBUG
+    ROUND_TRIP_BUDGETS: dict[str, int] = {}
+    
+    # Upstream resilience (Supabase backend); see core/resilience.py
+    UPSTREAM_READ_TIMEOUT_S: float = 5.0
+    UPSTREAM_WRITE_TIMEOUT_S: float = 10.0
+    UPSTREAM_TIMEOUTS: dict[str, float] = {}  # per-operation overrides, e.g. {"hackathons.list": 3.0}
+    UPSTREAM_RETRY_ATTEMPTS: int = 3  # total attempts for idempotent reads; writes are never retried
+    UPSTREAM_RETRY_BASE_MS: float = 50.0
+    UPSTREAM_RETRY_MAX_MS: float = 1000.0
+    UPSTREAM_POOL_SIZE: int = 64  # never below ADMISSION_TOTAL_LIMIT; the rest is headroom for hedges and abandoned attempts
+    CIRCUIT_FAILURE_THRESHOLD: int = 5  # consecutive transient failures before the circuit opens
+    CIRCUIT_RESET_TIMEOUT_S: float = 10.0
+    
+    # Hedged reads (Supabase backend); see core/hedging.py
+    HEDGING_ENABLED: bool = False
+    HEDGE_PERCENTILE: float = 95.0  # hedge once the first attempt is slower than this percentile
+    HEDGE_MIN_DELAY_MS: float = 10.0
+    HEDGE_MIN_SAMPLES: int = 50  # per operation, before hedging starts
+    HEDGE_BUDGET_RATIO: float = 0.05  # at most 5% extra read attempts
+    
+    # Admission control per route class; see core/admission.py
+    ADMISSION_ENABLED: bool = True
+    ADMISSION_TOTAL_LIMIT: int = 40  # matches the default threadpool size
+    ADMISSION_LIMITS: dict[str, int] = {"critical": 40, "registration": 24, "default": 24, "expensive": 4}
+    ADMISSION_QUEUE_SIZES: dict[str, int] = {"critical": 200, "registration": 100, "default": 50, "expensive": 8}
+    ADMISSION_RESERVED: dict[str, int] = {"critical": 8, "registration": 8}  # slots other classes may not use
+    ADMISSION_ROUTE_CLASSES: dict[str, str] = {}  # e.g. {"GET /hackathons/{hackathon_id}/registrations": "expensive"}
+    ADMISSION_QUEUE_TIMEOUT_S: float = 2.0
+    ADMISSION_RETRY_AFTER_S: int = 1
+    
+    # Change feeds (delta sync, analytics refresh); see repositories/base.py:next_position
+    CHANGE_FEED_SETTLE_S: float = 10.0  # longer than any write transaction; rows this fresh are read again
+    
+    # Read replicas (Supabase backend); see core/replicas.py
+    READ_REPLICA_URLS: list[str] = []  # e.g. ["https://<ref>-rr-<region>.supabase.co"]
+    READ_YOUR_WRITES_S: float = 5.0  # keep a principal's reads on the primary this long after they write
+    REPLICA_MAX_LAG_S: float = 2.0
+    REPLICA_CHECK_INTERVAL_S: float = 5.0
+    
+    # Idempotency-Key support for create/register endpoints; see core/idempotency.py
+    IDEMPOTENCY_ENABLED: bool = True
+    IDEMPOTENCY_STORE: str = "memory"  # "memory" (per worker) or "table" (idempotency_keys, shared)
+    IDEMPOTENCY_TTL_S: int = 24 * 3600
+    IDEMPOTENCY_MAX_ENTRIES: int = 10_000  # memory store only
+    IDEMPOTENCY_WAIT_S: float = 10.0  # how long a concurrent duplicate waits before 409
+    
+    # Background jobs for heavy admin operations; see core/jobs.py
+    JOB_WORKERS: int = 4  # job threads per worker process
+    JOB_STALE_S: float = 900.0  # a running job with no heartbeat for this long is marked failed on restart
+    JOB_RESULTS_DIR: str = "job_results"  # where file results (exports) are written
+    
+    # Bulk account activation job; see services/provisioning.py
+    BULK_ACTIVATION_CONCURRENCY: int = 8  # auth create_user calls in flight
+    BULK_ACTIVATION_RATE: float = 20.0  # auth create_user calls per second; 0 = unlimited
+    BULK_LINK_BATCH_SIZE: int = 200  # auth ids linked per link_auth_users call
+    BULK_PASSWORD_TTL_S: float = 86400.0  # one-time passwords are blanked from the outcomes file after this long, or once downloaded
+    
+    # Cold storage for finished hackathons (needs pyarrow); see core/archive.py
+    ARCHIVE_ENABLED: bool = False
+    ARCHIVE_DIR: str = "archive"
+    ARCHIVE_RETENTION_DAYS: int = 180  # archive hackathons this long after their deadline
+    ARCHIVE_BATCH_SIZE: int = 500  # hackathons per pair of archive files
+    ARCHIVE_COMPRESSION: str = "zstd"
+    
+    # Participation analytics (needs numpy); see core/analytics.py
+    ANALYTICS_REFRESH_S: float = 60.0  # analytics reads pull registration changes at most this often
+    ANALYTICS_PAGE_SIZE: int = 1000  # rows per change-feed page
+    
+    # In-process read caches and their cross-worker invalidation; see core/cache.py, core/invalidation.py
+    CACHE_TTLS: dict[str, float] = {}  # namespace -> seconds, e.g. {"principal": 30, "hackathons": 10, "registrations": 10, "stats": 30}
+    CACHE_MAX_ENTRIES: int = 1000  # per namespace
+    INVALIDATION_BUS: str = "local"  # "local" (one worker), "socket" (workers on one host) or "postgres" (LISTEN/NOTIFY)
+    INVALIDATION_SOCKET_DIR: str = "/tmp/hackathon-invalidation"
+    INVALIDATION_DATABASE_URL: Optional[str] = None  # direct Postgres connection string for the "postgres" bus
+    INVALIDATION_CHANNEL: str = "cache_invalidation"
+    
+    # Several colleges on one deployment; see core/tenancy.py
+    MULTI_TENANT: bool = False
+    TENANT_ADMISSION_LIMIT: int = 0  # concurrent requests per tenant and worker; 0 = unlimited
+    TENANT_ADMISSION_LIMITS: dict[str, int] = {}  # per-tenant overrides, e.g. {"big-college": 20}
+    
+    # Serialization: trust rows from our own tables instead of re-validating them
+    TRUSTED_SERIALIZATION: bool = True
+    
     model_config = SettingsConfigDict(
         env_file=".env",
         env_file_encoding="utf-8",
@@ -1,11 +1,33 @@
+import httpx
 from supabase import create_client, Client
+from supabase.lib.client_options import SyncClientOptions as ClientOptions
 from config.settings import settings
 
+
+def _options() -> ClientOptions:
+    """HTTP timeout matching the longest per-operation timeout in core/resilience.py,
+    so attempts abandoned by the resilience layer also release their pool thread.
+    The httpx client carries it to GoTrue (auth), which has no timeout of its own."""
+    timeouts = [settings.UPSTREAM_READ_TIMEOUT_S, settings.UPSTREAM_WRITE_TIMEOUT_S, *settings.UPSTREAM_TIMEOUTS.values()]
+    timeout = max(timeouts)
+    return ClientOptions(
+        postgrest_client_timeout=timeout,
+        httpx_client=httpx.Client(timeout=timeout, follow_redirects=True),
+    )
+
+
 # Initialize Supabase client (for user operations)
-supabase: Client = create_client(settings.SUPABASE_URL, settings.SUPABASE_ANON_KEY)
+supabase: Client = create_client(settings.SUPABASE_URL, settings.SUPABASE_ANON_KEY, options=_options())
 
 # Initialize Supabase admin client (for admin operations like creating users)
 supabase_admin: Client = create_client(
     settings.SUPABASE_URL, 
-    settings.SUPABASE_SERVICE_ROLE_KEY
+    settings.SUPABASE_SERVICE_ROLE_KEY,
+    options=_options()
 ) if settings.SUPABASE_SERVICE_ROLE_KEY else None
+
+# Read replicas (service role), used by core/replicas.py for read-only service methods
+replica_clients: list[Client] = [
+    create_client(url, settings.SUPABASE_SERVICE_ROLE_KEY, options=_options())
+    for url in settings.READ_REPLICA_URLS
+] if settings.SUPABASE_SERVICE_ROLE_KEY else []
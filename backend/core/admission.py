@@ -0,0 +1,204 @@
+"""
+Admission control: per-route-class concurrency limits with bounded wait queues
+
+Every route belongs to a class (DEFAULT_ROUTE_CLASSES, overridable with
+Settings.ADMISSION_ROUTE_CLASSES; unlisted routes are "default"). Classes in
+priority order:
+
+- "critical":     health checks, metrics and login
+- "registration": registering for a hackathon, activating an account
+- "default":      everything else
+- "expensive":    staff stats, user listings and delta sync
+
+A /batch envelope is not admitted itself; each of its sub-requests is, by its
+own route, so a batch of stats calls queues like that many separate calls.
+
+A request is admitted when its class is under its own limit and the worker as
+a whole is under ADMISSION_TOTAL_LIMIT minus the slots reserved for classes of
+higher priority, so stats and exports can never crowd out logins. Otherwise it
+waits in its class's bounded queue (up to ADMISSION_QUEUE_TIMEOUT_S); a full
+queue or a timed-out wait is answered with 503 + Retry-After. Freed slots are
+handed to waiters in priority order.
+
+The controller runs on the worker's event loop only, so it needs no locks.
+
+With MULTI_TENANT, TENANT_ADMISSION_LIMIT additionally caps each tenant's
+concurrent requests per worker, so one large college cannot take every slot.
+The tenant is only known once the principal resolves, so that check runs in
+get_current_user (on the threadpool) and rejects at once instead of queueing.
+"""
+import asyncio
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, Optional
+from config.settings import settings
+from core.metrics import REGISTRY
+
+PRIORITY = ("critical", "registration", "default", "expensive")
+DEFAULT_CLASS = "default"
+
+# "<METHOD> <route template>" -> admission class
+DEFAULT_ROUTE_CLASSES: Dict[str, str] = {
+    "GET /": "critical",
+    "GET /health": "critical",
+    "GET /health/ready": "critical",
+    "GET /metrics": "critical",
+    "POST /auth/login": "critical",
+    "POST /auth/activate": "registration",
+    "POST /auth/check-activation-eligibility": "registration",
+    "POST /hackathons/{hackathon_id}/register": "registration",
+    "GET /admin/users": "expensive",
+    "GET /admin/dashboard/stats": "expensive",
+    "GET /hackathons/{hackathon_id}/stats": "expensive",
+    "GET /hackathons/changes": "expensive",
+    "GET /admin/jobs/{job_id}/result": "expensive",
+    "GET /admin/analytics/participation": "expensive",
+    "GET /admin/analytics/repeat-participants": "expensive",
+    "GET /admin/analytics/reviewers": "expensive",
+    "POST /admin/analytics/refresh": "expensive",
+}
+# Only authenticate and fan out; their sub-requests take the slots
+UNADMITTED_ROUTES = {"POST /batch"}
+
+ADMISSION_REJECTED = REGISTRY.counter(
+    "admission_rejected_total", "Requests shed by admission control by class and reason", ("class", "reason")
+)
+ADMISSION_WAIT = REGISTRY.histogram(
+    "admission_wait_seconds", "Time admitted requests spent queued by class", ("class",),
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+ADMISSION_IN_FLIGHT = REGISTRY.gauge("admission_in_flight", "Admitted requests in progress by class", ("class",))
+ADMISSION_QUEUED = REGISTRY.gauge("admission_queued", "Requests waiting for admission by class", ("class",))
+TENANT_REJECTED = REGISTRY.counter("tenant_admission_rejected_total", "Requests shed by the per-tenant limit", ("tenant",))
+
+
+class AdmissionRejected(Exception):
+    def __init__(self, admission_class: str, reason: str):
+        super().__init__(f"{admission_class} requests are saturated ({reason})")
+        self.admission_class = admission_class
+        self.reason = reason
+
+
+class AdmissionController:
+    def __init__(self, total_limit: int, limits: Dict[str, int], queue_sizes: Dict[str, int], reserved: Dict[str, int]):
+        self.total_limit = total_limit
+        self.limits = {name: limits.get(name, total_limit) for name in PRIORITY}
+        self.queue_sizes = {name: queue_sizes.get(name, 0) for name in PRIORITY}
+        # Slots of total capacity this class may not use because they are kept for higher priorities
+        self.headroom = {
+            name: sum(reserved.get(higher, 0) for higher in PRIORITY[:index])
+            for index, name in enumerate(PRIORITY)
+        }
+        self.total = 0
+        self.in_flight = {name: 0 for name in PRIORITY}
+        self.waiters: Dict[str, Deque[asyncio.Future]] = {name: deque() for name in PRIORITY}
+        for name in PRIORITY:
+            ADMISSION_IN_FLIGHT.set_function(lambda name=name: self.in_flight[name], name)
+            ADMISSION_QUEUED.set_function(lambda name=name: len(self.waiters[name]), name)
+
+    def _can_admit(self, name: str) -> bool:
+        return self.in_flight[name] < self.limits[name] and self.total < self.total_limit - self.headroom[name]
+
+    def _take(self, name: str) -> None:
+        self.in_flight[name] += 1
+        self.total += 1
+
+    async def acquire(self, name: str) -> None:
+        # Never jump the queue of the same class
+        if not self.waiters[name] and self._can_admit(name):
+            self._take(name)
+            return
+        queue = self.waiters[name]
+        if len(queue) >= self.queue_sizes[name]:
+            ADMISSION_REJECTED.labels(name, "queue_full").inc()
+            raise AdmissionRejected(name, "queue full")
+        future = asyncio.get_running_loop().create_future()
+        queue.append(future)
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(asyncio.shield(future), timeout=settings.ADMISSION_QUEUE_TIMEOUT_S)
+        except asyncio.TimeoutError:
+            if future.done():
+                # Granted a slot in the same tick the wait expired; give it back
+                self.release(name)
+            else:
+                future.cancel()
+                queue.remove(future)
+            ADMISSION_REJECTED.labels(name, "queue_timeout").inc()
+            raise AdmissionRejected(name, "queue timeout")
+        except asyncio.CancelledError:
+            # Client went away while queued
+            if future.done() and not future.cancelled():
+                self.release(name)
+            elif future in queue:
+                queue.remove(future)
+            raise
+        ADMISSION_WAIT.labels(name).observe(time.perf_counter() - start)
+
+    def release(self, name: str) -> None:
+        self.in_flight[name] -= 1
+        self.total -= 1
+        self._wake()
+
+    def _wake(self) -> None:
+        for name in PRIORITY:
+            queue = self.waiters[name]
+            while queue and self._can_admit(name):
+                future = queue.popleft()
+                if future.done():
+                    continue
+                self._take(name)
+                future.set_result(None)
+
+
+_controller: Optional[AdmissionController] = None
+
+
+def controller() -> AdmissionController:
+    global _controller
+    if _controller is None:
+        _controller = AdmissionController(
+            settings.ADMISSION_TOTAL_LIMIT,
+            settings.ADMISSION_LIMITS,
+            settings.ADMISSION_QUEUE_SIZES,
+            settings.ADMISSION_RESERVED,
+        )
+    return _controller
+
+
+def admission_class(method: str, route: str) -> Optional[str]:
+    """The route's class, or None for routes that are not admitted themselves"""
+    key = f"{method} {route}"
+    if key in UNADMITTED_ROUTES:
+        return None
+    return settings.ADMISSION_ROUTE_CLASSES.get(key) or DEFAULT_ROUTE_CLASSES.get(key, DEFAULT_CLASS)
+
+
+class TenantLimiter:
+    """Per-tenant concurrency cap; acquired from request threads, hence the lock"""
+
+    def __init__(self):
+        self.in_flight: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def limit_for(tenant: str) -> int:
+        return settings.TENANT_ADMISSION_LIMITS.get(tenant, settings.TENANT_ADMISSION_LIMIT)
+
+    def try_acquire(self, tenant: str) -> bool:
+        limit = self.limit_for(tenant)
+        with self._lock:
+            count = self.in_flight.get(tenant, 0)
+            if limit and count >= limit:
+                TENANT_REJECTED.labels(tenant).inc()
+                return False
+            self.in_flight[tenant] = count + 1
+            return True
+
+    def release(self, tenant: str) -> None:
+        with self._lock:
+            self.in_flight[tenant] -= 1
+
+
+tenant_limiter = TenantLimiter()
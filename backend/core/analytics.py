@@ -0,0 +1,284 @@
+"""
+Columnar participation analytics over hackathon_registrations
+
+A ParticipationFrame holds one tenant's registrations as NumPy arrays, with
+strings integer-coded through per-column dictionaries:
+
+    student    int32  code of student_college_id
+    hackathon  int32  code of hackathon_id
+    period     int32  code of the registration month ("2025-03"), -1 if unknown
+    status     int8   index into STATUSES, -1 if unknown
+    reviewer   int32  code of acknowledged_by, -1 if not reviewed
+    alive      bool   False once the registration was deleted
+
+Departments come from the student roster (college_users), reloaded on every
+refresh into `department_of`, indexed by student code, so a department change
+moves all of that student's history. Registrations of students no longer on
+the roster count overall but in no department.
+
+Refreshes are incremental: AnalyticsService pages through registrations and
+tombstones changed after the positions stored here (the change feeds delta
+sync uses), overwriting changed rows in place, appending new ones and marking
+deleted ones dead. Registrations moved to cold storage (core/archive.py) stay:
+their tombstones are skipped, and a full load reads the archive as well.
+Coding a page is one pass over the changed rows; the metrics themselves are
+group-bys over the arrays (np.unique / np.bincount).
+
+Needs numpy.
+"""
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, Hashable, Iterable, List, Optional
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+STATUSES = ("applied", "acknowledged", "rejected")
+STATUS_CODES = {name: code for code, name in enumerate(STATUSES)}
+ACKNOWLEDGED = STATUS_CODES["acknowledged"]
+REJECTED = STATUS_CODES["rejected"]
+
+_SCHEMA = {
+    "student": "int32",
+    "hackathon": "int32",
+    "period": "int32",
+    "status": "int8",
+    "reviewer": "int32",
+    "alive": "bool",
+}
+MIN_CAPACITY = 1024
+
+
+def available() -> bool:
+    return np is not None
+
+
+class Codes:
+    """Dictionary encoding: value <-> dense integer code, in first-seen order"""
+
+    def __init__(self):
+        self.values: List[Hashable] = []
+        self._codes: Dict[Hashable, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def code(self, value: Hashable) -> int:
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+
+class ParticipationFrame:
+    """One tenant's registrations in columnar form (see module docstring)"""
+
+    def __init__(self):
+        # Held while refreshing and while computing, so metrics see one consistent snapshot
+        self.lock = threading.RLock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self.lock:
+            self.student_codes = Codes()
+            self.hackathon_codes = Codes()
+            self.period_codes = Codes()
+            self.reviewer_codes = Codes()
+            self.department_codes = Codes()
+            self.size = 0
+            self.columns = {name: np.zeros(0, dtype) for name, dtype in _SCHEMA.items()}
+            self.department_of = np.zeros(0, "int32")
+            self.students_per_department = np.zeros(0, "int64")
+            self.positions: Dict[str, Optional[List]] = {"r": None, "t": None}
+            self.archive_loaded = False
+            self.refreshed_at: Optional[datetime] = None
+            self._refreshed_monotonic: Optional[float] = None
+            self._row_of: Dict[str, int] = {}
+
+    def age(self) -> float:
+        """Seconds since the last refresh (infinite before the first)"""
+        if self._refreshed_monotonic is None:
+            return float("inf")
+        return time.monotonic() - self._refreshed_monotonic
+
+    def _reserve(self, extra: int) -> None:
+        capacity = len(self.columns["student"])
+        if self.size + extra <= capacity:
+            return
+        capacity = max(self.size + extra, capacity * 2, MIN_CAPACITY)
+        for name, column in self.columns.items():
+            grown = np.zeros(capacity, column.dtype)
+            grown[:self.size] = column[:self.size]
+            self.columns[name] = grown
+
+    def upsert(self, rows: List[Dict]) -> None:
+        """Apply a page of changed registration rows"""
+        if not rows:
+            return
+        with self.lock:
+            index = np.empty(len(rows), "int64")
+            added = 0
+            for i, row in enumerate(rows):
+                position = self._row_of.get(row["id"])
+                if position is None:
+                    position = self._row_of[row["id"]] = self.size + added
+                    added += 1
+                index[i] = position
+            self._reserve(added)
+            self.size += added
+            columns = self.columns
+            columns["student"][index] = [self.student_codes.code(row["student_college_id"]) for row in rows]
+            columns["hackathon"][index] = [self.hackathon_codes.code(row["hackathon_id"]) for row in rows]
+            columns["period"][index] = [
+                self.period_codes.code(row["created_at"][:7]) if row.get("created_at") else -1 for row in rows
+            ]
+            columns["status"][index] = [STATUS_CODES.get(row.get("status"), -1) for row in rows]
+            columns["reviewer"][index] = [
+                self.reviewer_codes.code(row["acknowledged_by"]) if row.get("acknowledged_by") else -1 for row in rows
+            ]
+            columns["alive"][index] = True
+
+    def delete(self, registration_ids: Iterable[str]) -> None:
+        with self.lock:
+            index = [self._row_of[i] for i in registration_ids if i in self._row_of]
+            if index:
+                self.columns["alive"][index] = False
+
+    def hackathon_of(self, registration_id: str) -> Optional[str]:
+        position = self._row_of.get(registration_id)
+        return None if position is None else self.hackathon_codes.values[self.columns["hackathon"][position]]
+
+    def set_roster(self, students: List[Dict]) -> None:
+        """Replace the student -> department mapping and the per-department head counts"""
+        with self.lock:
+            codes = np.array([self.student_codes.code(row["college_id"]) for row in students], "int64")
+            departments = np.array([self.department_codes.code(row.get("department")) for row in students], "int64")
+            self.department_of = np.full(len(self.student_codes), -1, "int32")
+            self.department_of[codes] = departments
+            self.students_per_department = np.bincount(departments, minlength=len(self.department_codes))
+
+    def mark_refreshed(self) -> None:
+        self.refreshed_at = datetime.now(timezone.utc)
+        self._refreshed_monotonic = time.monotonic()
+
+    def _live(self, *names: str) -> List:
+        alive = self.columns["alive"][:self.size]
+        return [self.columns[name][:self.size][alive] for name in names]
+
+    def _department_of(self, student_codes):
+        """Department code per student code; -1 for students registered after the last roster load"""
+        if not len(self.department_of):
+            return np.full(len(student_codes), -1, "int64")
+        known = student_codes < len(self.department_of)
+        return np.where(known, self.department_of[np.where(known, student_codes, 0)], -1)
+
+    def summary(self) -> Dict:
+        with self.lock:
+            return {
+                "registrations": int(self.columns["alive"][:self.size].sum()),
+                "students": int((self.department_of >= 0).sum()),
+                "hackathons": len(self.hackathon_codes),
+                "refreshed_at": self.refreshed_at,
+            }
+
+    def participation(self) -> Dict:
+        """Distinct registering students per department and month, and that as a share of the department"""
+        with self.lock:
+            student, period = self._live("student", "period")
+            dated = period >= 0
+            n_periods = max(len(self.period_codes), 1)
+            pairs = np.unique(student[dated].astype("int64") * n_periods + period[dated])
+            department = self._department_of(pairs // n_periods)
+            on_roster = department >= 0
+            n_departments = len(self.department_codes)
+            counts = np.bincount(
+                department[on_roster] * n_periods + pairs[on_roster] % n_periods,
+                minlength=n_departments * n_periods,
+            ).reshape(n_departments, n_periods)
+            order = np.argsort(self.period_codes.values).astype("int64")  # codes in first-seen order -> chronological
+            counts = counts[:, order]
+            totals = self.students_per_department
+            rates = counts / np.maximum(totals, 1)[:, None]
+            return {
+                "periods": [self.period_codes.values[i] for i in order],
+                "departments": [
+                    {
+                        "department": self.department_codes.values[d],
+                        "total_students": int(totals[d]),
+                        "participants": counts[d].tolist(),
+                        "rates": rates[d].round(4).tolist(),
+                    }
+                    for d in range(n_departments)
+                ],
+                "refreshed_at": self.refreshed_at,
+            }
+
+    def repeat_participants(self) -> Dict:
+        """Students registered for at least two different hackathons, overall and per department"""
+        with self.lock:
+            student, hackathon = self._live("student", "hackathon")
+            n_hackathons = max(len(self.hackathon_codes), 1)
+            pairs = np.unique(student.astype("int64") * n_hackathons + hackathon)
+            per_student = np.bincount(pairs // n_hackathons, minlength=len(self.student_codes))
+            participant = per_student >= 1
+            repeat = per_student >= 2
+            department = self._department_of(np.arange(len(self.student_codes)))
+            on_roster = department >= 0
+            n_departments = len(self.department_codes)
+            participants = np.bincount(department[participant & on_roster], minlength=n_departments)
+            repeats = np.bincount(department[repeat & on_roster], minlength=n_departments)
+            total, total_repeat = int(participant.sum()), int(repeat.sum())
+            return {
+                "participants": total,
+                "repeat_participants": total_repeat,
+                "ratio": round(total_repeat / total, 4) if total else 0.0,
+                "per_department": [
+                    {
+                        "department": self.department_codes.values[d],
+                        "participants": int(participants[d]),
+                        "repeat_participants": int(repeats[d]),
+                        "ratio": round(int(repeats[d]) / int(participants[d]), 4) if participants[d] else 0.0,
+                    }
+                    for d in range(n_departments)
+                ],
+                "refreshed_at": self.refreshed_at,
+            }
+
+    def reviewers(self) -> Dict:
+        """Decisions per reviewer (acknowledged_by) and the share that were acknowledgements"""
+        with self.lock:
+            reviewer, status = self._live("reviewer", "status")
+            decided = (reviewer >= 0) & ((status == ACKNOWLEDGED) | (status == REJECTED))
+            n_reviewers = len(self.reviewer_codes)
+            reviewed = np.bincount(reviewer[decided], minlength=n_reviewers)
+            acknowledged = np.bincount(reviewer[decided & (status == ACKNOWLEDGED)], minlength=n_reviewers)
+            rates = acknowledged / np.maximum(reviewed, 1)
+            return {
+                "reviewers": [
+                    {
+                        "reviewer": self.reviewer_codes.values[r],
+                        "reviewed": int(reviewed[r]),
+                        "acknowledged": int(acknowledged[r]),
+                        "rejected": int(reviewed[r] - acknowledged[r]),
+                        "acknowledgement_rate": round(float(rates[r]), 4),
+                    }
+                    for r in np.flatnonzero(reviewed)
+                ],
+                "refreshed_at": self.refreshed_at,
+            }
+
+
+_frames: Dict[Optional[str], ParticipationFrame] = {}
+_frames_lock = threading.Lock()
+
+
+def frame_for(tenant: Optional[str]) -> ParticipationFrame:
+    frame = _frames.get(tenant)
+    if frame is None:
+        with _frames_lock:
+            frame = _frames.setdefault(tenant, ParticipationFrame())
+    return frame
@@ -0,0 +1,182 @@
+"""
+Cold storage for finished hackathons: compressed Parquet files on local disk
+
+The "archive_hackathons" job (services/jobs.py) moves hackathons whose deadline
+is more than ARCHIVE_RETENTION_DAYS in the past, with their registrations, out
+of the hot tables into ARCHIVE_DIR, one pair of files per batch:
+
+    <batch>.registrations.parquet   registrations, plus the student's department
+    <batch>.hackathons.parquet      the hackathon rows
+
+Files are written under a temporary name and renamed, registrations first, so
+a batch becomes visible only once both files are complete. Reads of a
+hackathon that is no longer in the hot table (GET /hackathons/{id}, its
+registrations and stats) fall back to the archive through an in-memory
+index of hackathon id -> batch. A worker adds the batches it writes to its own
+index at once and notices other workers' batches within
+INDEX_CHECK_INTERVAL_S (from the directory's mtime), so lookups never scan
+the directory.
+Rows keep their tenant_id and reads are filtered to the current tenant.
+
+Needs pyarrow. Put ARCHIVE_DIR on a shared volume when several hosts serve
+the API, since each host only sees its own disk.
+"""
+import glob
+import os
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Optional, Tuple
+from config.settings import settings
+from core.metrics import REGISTRY
+from core.tenancy import current_tenant
+
+try:
+    import pyarrow
+    import pyarrow.parquet as parquet
+except ImportError:  # pragma: no cover - optional dependency
+    pyarrow = None
+    parquet = None
+
+ARCHIVE_READS = REGISTRY.counter("archive_reads_total", "Reads served from cold storage by kind", ("kind",))
+ARCHIVED_HACKATHONS = REGISTRY.gauge("archived_hackathons", "Hackathons held in cold storage on this host")
+
+HACKATHONS_SUFFIX = ".hackathons.parquet"
+REGISTRATIONS_SUFFIX = ".registrations.parquet"
+INDEX_CHECK_INTERVAL_S = 5.0
+
+
+def available() -> bool:
+    return bool(settings.ARCHIVE_ENABLED) and parquet is not None
+
+
+def _visible(row: Dict, tenant: Optional[str]) -> bool:
+    return tenant is None or row.get("tenant_id") == tenant
+
+
+class ArchiveStore:
+    """Parquet batches in one directory, with a hackathon id -> batch index"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._index: Dict[str, str] = {}
+        self._batches: Tuple[str, ...] = ()
+        self._mtime: Optional[int] = None
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+        ARCHIVED_HACKATHONS.set_function(lambda: len(self._index))
+
+    def _path(self, batch: str, suffix: str) -> str:
+        return os.path.join(self.directory, batch + suffix)
+
+    def refresh(self) -> None:
+        """Pick up batches written by other workers now rather than at the next check"""
+        if available():
+            self._next_check = 0.0
+            self._refresh()
+
+    def _refresh(self) -> Dict[str, str]:
+        """
+        The index, rebuilt when the directory changed (batches written by other
+        workers or hosts). Checked at most every INDEX_CHECK_INTERVAL_S, with
+        one stat of the directory; the scan only runs when its mtime moved.
+        """
+        now = time.monotonic()
+        if now < self._next_check:
+            return self._index
+        with self._lock:
+            if now < self._next_check:
+                return self._index
+            self._next_check = now + INDEX_CHECK_INTERVAL_S
+            try:
+                mtime = os.stat(self.directory).st_mtime_ns
+            except FileNotFoundError:
+                return self._index
+            if mtime == self._mtime:
+                return self._index
+            batches = tuple(sorted(
+                os.path.basename(path)[: -len(HACKATHONS_SUFFIX)]
+                for path in glob.glob(os.path.join(self.directory, "*" + HACKATHONS_SUFFIX))
+            ))
+            if batches != self._batches:
+                index = {}
+                for batch in batches:
+                    table = parquet.read_table(self._path(batch, HACKATHONS_SUFFIX), columns=["id"])
+                    for hackathon_id in table.column("id").to_pylist():
+                        index[hackathon_id] = batch
+                self._index, self._batches = index, batches
+            self._mtime = mtime
+        return self._index
+
+    def contains(self, hackathon_id: str) -> bool:
+        return available() and hackathon_id in self._refresh()
+
+    def get_hackathon(self, hackathon_id: str) -> Optional[Dict]:
+        if not available():
+            return None
+        batch = self._refresh().get(hackathon_id)
+        if batch is None:
+            return None
+        ARCHIVE_READS.labels("hackathon").inc()
+        table = parquet.read_table(self._path(batch, HACKATHONS_SUFFIX), filters=[("id", "==", hackathon_id)])
+        tenant = current_tenant()
+        rows = [row for row in table.to_pylist() if _visible(row, tenant)]
+        return rows[0] if rows else None
+
+    def list_registrations(self, hackathon_id: str, department: Optional[str] = None) -> List[Dict]:
+        """Archived registrations of a hackathon; each carries the student's department at archive time"""
+        if not available():
+            return []
+        batch = self._refresh().get(hackathon_id)
+        if batch is None:
+            return []
+        ARCHIVE_READS.labels("registrations").inc()
+        path = self._path(batch, REGISTRATIONS_SUFFIX)
+        if not os.path.exists(path):
+            return []  # the batch had no registrations
+        tenant = current_tenant()
+        table = parquet.read_table(path, filters=[("hackathon_id", "==", hackathon_id)])
+        return [
+            row for row in table.to_pylist()
+            if _visible(row, tenant) and (department is None or row.get("student_department") == department)
+        ]
+
+    def iter_registrations(self, columns: List[str]) -> Iterator[List[Dict]]:
+        """Every archived registration of the current tenant, one list per batch"""
+        if not available():
+            return
+        tenant = current_tenant()
+        for batch in sorted(set(self._refresh().values())):
+            path = self._path(batch, REGISTRATIONS_SUFFIX)
+            if not os.path.exists(path):
+                continue
+            table = parquet.read_table(path)
+            names = [name for name in (*columns, "tenant_id") if name in table.column_names]
+            yield [row for row in table.select(names).to_pylist() if _visible(row, tenant)]
+
+    def write_batch(self, hackathons: List[Dict], registrations: List[Dict]) -> str:
+        """Write one batch; returns its name. Registrations go first so readers never see half a batch."""
+        if parquet is None:
+            raise RuntimeError("Archiving requires the pyarrow package")
+        os.makedirs(self.directory, exist_ok=True)
+        batch = f"{datetime.now(timezone.utc):%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:8]}"
+        if registrations:
+            self._write(registrations, self._path(batch, REGISTRATIONS_SUFFIX))
+        self._write(hackathons, self._path(batch, HACKATHONS_SUFFIX))
+        with self._lock:
+            # Visible to this worker at once; the others pick it up at their next directory check
+            self._index = {**self._index, **{row["id"]: batch for row in hackathons}}
+            self._batches = tuple(sorted(self._batches + (batch,)))
+        return batch
+
+    def _write(self, rows: List[Dict], path: str) -> None:
+        # Same columns in every row; pyarrow infers the schema from the first one
+        columns = list(dict.fromkeys(column for row in rows for column in row))
+        table = pyarrow.Table.from_pylist([{column: row.get(column) for column in columns} for row in rows])
+        tmp = path + ".tmp"
+        parquet.write_table(table, tmp, compression=settings.ARCHIVE_COMPRESSION)
+        os.replace(tmp, path)
+
+
+store = ArchiveStore(settings.ARCHIVE_DIR)
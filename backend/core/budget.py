@@ -0,0 +1,134 @@
+"""
+Per-request upstream round-trip budgets and repeated call-site detection
+
+Every upstream call is recorded on the RequestContext under its call site
+("<table>.<operation>(<keyword args>)"). Each route has a budget of round
+trips (DEFAULT_BUDGETS, overridable with Settings.ROUND_TRIP_BUDGETS).
+Settings.ROUND_TRIP_BUDGET_MODE controls what happens on overrun:
+
+- "off":   nothing
+- "warn":  log one warning per request with the repeated call sites (default when DEBUG)
+- "raise": fail the call that would exceed the budget (for tests)
+
+Outside HTTP requests, `round_trip_budget` applies the same check to a block:
+
+    with round_trip_budget(3):
+        AuthService.add_user(request)
+"""
+import logging
+from contextlib import contextmanager
+from typing import Dict, Optional
+from fastapi import HTTPException, status
+from config.settings import settings
+from core.context import begin_request, current_request, end_request
+from core.metrics import REGISTRY
+
+logger = logging.getLogger("hackathon.budget")
+
+# "<METHOD> <route template>" -> max upstream round trips, auth lookups included
+DEFAULT_BUDGETS: Dict[str, int] = {
+    "POST /auth/activate": 3,
+    "POST /auth/login": 2,
+    "GET /auth/me": 2,
+    "POST /auth/change-password": 5,
+    "POST /auth/check-activation-eligibility": 1,
+    "POST /admin/add-student": 5,
+    "POST /admin/add-teacher": 5,
+    "POST /admin/add-hod": 5,
+    "POST /admin/add-principal": 5,
+    "GET /admin/users": 3,
+    "GET /admin/users/{college_id}": 3,
+    "PATCH /admin/users/{college_id}/deactivate": 3,
+    "PATCH /admin/users/{college_id}/activate": 3,
+    "GET /admin/dashboard/stats": 3,
+    "POST /hackathons/": 3,
+    "GET /hackathons/": 4,  # 3, plus the grouped count with with_counts=true
+    "GET /hackathons/changes": 5,
+    "GET /hackathons/{hackathon_id}": 3,
+    "DELETE /hackathons/{hackathon_id}": 3,
+    "POST /hackathons/{hackathon_id}/register": 4,
+    "GET /hackathons/{hackathon_id}/registrations": 3,
+    "PATCH /hackathons/registrations/{registration_id}/acknowledge": 3,
+    "GET /hackathons/{hackathon_id}/stats": 6,
+    "POST /batch": 2,
+}
+
+BUDGET_EXCEEDED = REGISTRY.counter(
+    "round_trip_budget_exceeded_total", "Requests that made more upstream calls than their route budget", ("route",)
+)
+REPEATED_CALL_SITES = REGISTRY.counter(
+    "upstream_repeated_call_sites_total",
+    "Requests in which the same upstream call site ran more than once",
+    ("route", "call_site"),
+)
+
+
+class RoundTripBudgetExceeded(HTTPException):
+    """
+    Raised in "raise" mode when a request goes over its round-trip budget. An
+    HTTPException, so the services' `except HTTPException: raise` lets it
+    through as a 500 instead of turning it into "not found" or "Error ...".
+    """
+
+    def __init__(self, detail: str):
+        super().__init__(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=detail)
+
+
+def budget_mode() -> str:
+    if settings.ROUND_TRIP_BUDGET_MODE:
+        return settings.ROUND_TRIP_BUDGET_MODE
+    return "warn" if settings.DEBUG else "off"
+
+
+def budget_for(method: str, route: str) -> Optional[int]:
+    key = f"{method} {route}"
+    if key in settings.ROUND_TRIP_BUDGETS:
+        return settings.ROUND_TRIP_BUDGETS[key]
+    return DEFAULT_BUDGETS.get(key)
+
+
+def call_site(resource: str, operation: str, kwargs: Dict) -> str:
+    """Filter shape of a repository call: argument names, never values"""
+    return f"{resource}.{operation}({','.join(sorted(kwargs))})"
+
+
+def before_call(site: str) -> None:
+    """Record a call site and enforce the budget in "raise" mode"""
+    context = current_request()
+    if context is None:
+        return
+    context.call_sites[site] = context.call_sites.get(site, 0) + 1
+    if context.budget is not None and context.round_trips >= context.budget and budget_mode() == "raise":
+        raise RoundTripBudgetExceeded(
+            f"{context.method} {context.route} exceeded its budget of {context.budget} round trips at {site}; "
+            f"calls so far: {context.call_sites}"
+        )
+
+
+def report(context) -> None:
+    """End-of-request accounting: metrics always, a warning in "warn" mode"""
+    repeated = {site: count for site, count in context.call_sites.items() if count > 1}
+    for site in repeated:
+        REPEATED_CALL_SITES.labels(context.route, site).inc()
+    over_budget = context.budget is not None and context.round_trips > context.budget
+    if over_budget:
+        BUDGET_EXCEEDED.labels(context.route).inc()
+    if (over_budget or repeated) and budget_mode() == "warn":
+        logger.warning(
+            "%s %s made %d upstream calls (budget %s); repeated call sites: %s",
+            context.method, context.route, context.round_trips, context.budget, repeated or "none",
+        )
+
+
+@contextmanager
+def round_trip_budget(limit: int, label: str = "block"):
+    """Fail if the enclosed code makes more than `limit` upstream calls (raises on exit)"""
+    context, token = begin_request("CALL", label)
+    try:
+        yield context
+    finally:
+        end_request(token)
+    if context.round_trips > limit:
+        raise RoundTripBudgetExceeded(
+            f"{label} made {context.round_trips} upstream calls, budget {limit}; call sites: {context.call_sites}"
+        )
@@ -0,0 +1,165 @@
+"""
+Short-lived in-process caches for hot service reads
+
+    @staticmethod
+    @single_flight
+    @cached("stats", tag="hackathon_id")
+    def get_hackathon_stats(hackathon_id: str) -> Dict:
+        ...
+
+Each namespace is cached for Settings.CACHE_TTLS[namespace] seconds; namespaces
+without a TTL are not cached at all (the default). Entries can be dropped by
+namespace, or by tag (the value of the `tag` argument, e.g. one hackathon's
+id). Write paths do that through core.invalidation.publish, which also tells
+the other workers. Entries are kept per tenant (core/tenancy.py), and a
+tenant's invalidations leave other tenants' entries alone.
+
+A read that started before an invalidation does not store its result, so a
+write is never hidden behind a value fetched just before it. Put
+`@single_flight` outside `@cached`: a read that joins a flight started before
+the write then shares the leader's result without storing it, since only the
+leader (whose read predates the invalidation) reaches `cached`. While the
+invalidation bus is disconnected the caches are bypassed (see
+core/invalidation.py).
+"""
+import functools
+import inspect
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+from config.settings import settings
+from core.metrics import REGISTRY
+from core.tenancy import current_tenant
+
+CACHE_REQUESTS = REGISTRY.counter(
+    "cache_requests_total", "Cached service reads by namespace and outcome (hit, miss, bypass)", ("namespace", "outcome")
+)
+CACHE_ENTRIES = REGISTRY.gauge("cache_entries", "Entries held per cache namespace", ("namespace",))
+
+_MISSING = object()
+
+
+def _copy(value: Any) -> Any:
+    if isinstance(value, list):
+        return [dict(item) if isinstance(item, dict) else item for item in value]
+    if isinstance(value, dict):
+        return dict(value)
+    return value
+
+
+class TTLCache:
+    """Bounded LRU whose entries expire after the namespace's TTL"""
+
+    def __init__(self, namespace: str, max_entries: int):
+        self.namespace = namespace
+        self.max_entries = max_entries
+        # Bumped by every invalidation; reads that straddle one do not store
+        self.generation = 0
+        # (function, tenant, tag, arguments) -> (expires, value)
+        self._entries: "OrderedDict[Tuple[str, Optional[str], Optional[str], Hashable], Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        CACHE_ENTRIES.set_function(lambda: len(self._entries), namespace)
+
+    def get(self, key: Tuple) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return _MISSING
+            if entry[0] <= time.monotonic():
+                del self._entries[key]
+                return _MISSING
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key: Tuple, value: Any, ttl: float, generation: int) -> None:
+        with self._lock:
+            if generation != self.generation:
+                return
+            self._entries[key] = (time.monotonic() + ttl, value)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, tag: Optional[str] = None, tenant: Optional[str] = None) -> None:
+        """Drop entries matching `tag` (all if None) of `tenant` (all if None); unscoped entries always match"""
+        with self._lock:
+            self.generation += 1
+            if tag is None and tenant is None:
+                self._entries.clear()
+                return
+            for key in [
+                key for key in self._entries
+                if (tag is None or key[2] == tag) and (tenant is None or key[1] in (tenant, None))
+            ]:
+                del self._entries[key]
+
+
+_caches: Dict[str, TTLCache] = {}
+_caches_lock = threading.Lock()
+_coherent = True
+
+
+def cache_for(namespace: str) -> TTLCache:
+    cache = _caches.get(namespace)
+    if cache is None:
+        with _caches_lock:
+            cache = _caches.setdefault(namespace, TTLCache(namespace, settings.CACHE_MAX_ENTRIES))
+    return cache
+
+
+def invalidate(namespace: str, tag: Optional[str] = None, tenant: Optional[str] = None) -> None:
+    """Drop this worker's entries for a namespace, or only those carrying `tag` / belonging to `tenant`"""
+    cache_for(namespace).invalidate(tag, tenant)
+
+
+def invalidate_all() -> None:
+    for cache in list(_caches.values()):
+        cache.invalidate()
+
+
+def set_coherent(coherent: bool) -> None:
+    """Called by the invalidation bus: while False nothing is served from or stored in a cache"""
+    global _coherent
+    _coherent = coherent
+    invalidate_all()
+
+
+def cached(namespace: str, tag: Optional[str] = None) -> Callable:
+    """
+    Decorator: cache results of `fn` per bound arguments for the namespace's TTL.
+    `tag` names the argument whose value targeted invalidations match. None
+    results are not cached.
+    """
+    def decorate(fn: Callable) -> Callable:
+        signature = inspect.signature(fn)
+        name = fn.__qualname__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            ttl = settings.CACHE_TTLS.get(namespace)
+            if not ttl:
+                return fn(*args, **kwargs)
+            if not _coherent:
+                CACHE_REQUESTS.labels(namespace, "bypass").inc()
+                return fn(*args, **kwargs)
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key = (
+                name,
+                current_tenant(),
+                str(bound.arguments[tag]) if tag is not None else None,
+                repr(tuple(bound.arguments.items())),
+            )
+            cache = cache_for(namespace)
+            value = cache.get(key)
+            if value is not _MISSING:
+                CACHE_REQUESTS.labels(namespace, "hit").inc()
+                return _copy(value)
+            CACHE_REQUESTS.labels(namespace, "miss").inc()
+            generation = cache.generation
+            value = fn(*args, **kwargs)
+            if value is not None:
+                cache.set(key, _copy(value), ttl, generation)
+            return value
+        return wrapper
+    return decorate
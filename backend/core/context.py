@@ -0,0 +1,143 @@
+"""
+Request-scoped context shared by middleware, services and the upstream layer
+
+`RequestContextMiddleware` opens a `RequestContext` per HTTP request; sync
+routes run in the threadpool with a copy of the contextvars, so they see (and
+mutate) the same object. `instrument_service` wraps every static method of a
+service class so the upstream layer knows which service method issued a call
+(and opens a child span for it when tracing is enabled). `route_template`
+resolves the matched route path (e.g. "/hackathons/{hackathon_id}/stats") so
+metrics and budgets are keyed by route rather than by raw URL; it matches once
+per request and keeps the result in the scope for the other middlewares.
+"""
+import functools
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+from starlette.routing import Match
+from core.tracing import start_span
+
+_service_method: ContextVar[Optional[str]] = ContextVar("service_method", default=None)
+
+UNMATCHED_ROUTE = "unmatched"
+ROUTE_TEMPLATE_SCOPE_KEY = "hackathon.route_template"
+
+
+@dataclass
+class RequestContext:
+    method: str
+    route: str
+    started: float = field(default_factory=time.perf_counter)
+    # phase name -> [seconds, upstream calls made inside the phase]
+    phases: Dict[str, List[float]] = field(default_factory=dict)
+    round_trips: int = 0
+    active_phase: Optional[str] = None
+    budget: Optional[int] = None
+    # "<table>.<operation>(<kwargs>)" -> calls made from this request
+    call_sites: Dict[str, int] = field(default_factory=dict)
+    # core.profiling.StackSampler when an admin asked for this request to be profiled
+    profiler: Optional[object] = None
+    # college_id of the authenticated caller, once get_current_user has resolved it
+    principal: Optional[str] = None
+    # The caller's tenant (see core/tenancy.py), and whether it holds a per-tenant admission slot
+    tenant: Optional[str] = None
+    tenant_admitted: bool = False
+
+    def add_phase(self, name: str, seconds: float, calls: int = 0) -> None:
+        entry = self.phases.setdefault(name, [0.0, 0])
+        entry[0] += seconds
+        entry[1] += calls
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+
+_request_context: ContextVar[Optional[RequestContext]] = ContextVar("request_context", default=None)
+
+
+def current_request() -> Optional[RequestContext]:
+    return _request_context.get()
+
+
+def begin_request(method: str, route: str):
+    """Open a request context; returns (context, token) — pass the token to end_request"""
+    context = RequestContext(method=method, route=route)
+    return context, _request_context.set(context)
+
+
+def end_request(token) -> None:
+    _request_context.reset(token)
+
+
+def current_service_method() -> str:
+    return _service_method.get() or "none"
+
+
+def run_profiled(fn):
+    """Call fn with this thread sampled if the current request is profiled (for pool threads)"""
+    context = _request_context.get()
+    profiler = context.profiler if context is not None else None
+    if profiler is None:
+        return fn()
+    profiler.enter()
+    try:
+        return fn()
+    finally:
+        profiler.exit()
+
+
+def instrument_service(cls):
+    """Class decorator: record "<Class>.<method>" as the current service method while it runs"""
+    for name, attr in list(vars(cls).items()):
+        if not isinstance(attr, staticmethod) or name.startswith("_"):
+            continue
+        fn = attr.__func__
+        label = f"{cls.__name__}.{name}"
+
+        def make_wrapper(fn=fn, label=label):
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                token = _service_method.set(label)
+                context = _request_context.get()
+                profiler = context.profiler if context is not None else None
+                if profiler is not None:
+                    profiler.enter()
+                try:
+                    with start_span(label):
+                        return fn(*args, **kwargs)
+                finally:
+                    if profiler is not None:
+                        profiler.exit()
+                    _service_method.reset(token)
+            return wrapper
+
+        setattr(cls, name, staticmethod(make_wrapper()))
+    return cls
+
+
+def route_template(app, scope) -> str:
+    """Path template of the route that will handle this request"""
+    route = scope.get("route")
+    if route is not None and hasattr(route, "path"):
+        return route.path
+    template = scope.get(ROUTE_TEMPLATE_SCOPE_KEY)
+    if template is None:
+        template = _match_template(app.router.routes, scope)
+        # Middlewares share the scope dict, so the outermost one matches for all of them
+        scope[ROUTE_TEMPLATE_SCOPE_KEY] = template
+    return template
+
+
+def _match_template(routes, scope) -> str:
+    for candidate in routes:
+        match, _ = candidate.matches(scope)
+        if match != Match.FULL:
+            continue
+        path = getattr(candidate, "path", None)
+        if path is not None:
+            return path
+        # Newer FastAPI keeps included routers as one entry instead of copying their routes
+        included = getattr(candidate, "original_router", None)
+        return _match_template(included.routes, scope) if included is not None else UNMATCHED_ROUTE
+    return UNMATCHED_ROUTE
@@ -0,0 +1,188 @@
+"""
+Hedged reads: a second identical attempt when the first is slower than usual
+
+For idempotent reads on the Supabase backend (see core/resilience.py), if the
+first attempt has not answered within the observed latency percentile for that
+operation (HEDGE_PERCENTILE, e.g. p95), a second attempt is fired and whichever
+answers first wins. As in core.resilience, each attempt's clock starts when
+it gets a pool thread, and a first attempt that never does is reported as
+saturation rather than an upstream timeout. Hedges are paid for from a global
+token bucket that earns HEDGE_BUDGET_RATIO tokens per read, capping extra
+upstream load at that ratio.
+"""
+import contextvars
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Executor, wait
+from typing import Any, Callable, Dict, Optional, Tuple, Type
+from config.settings import settings
+from core.context import run_profiled
+from core.metrics import REGISTRY
+
+HEDGES_FIRED = REGISTRY.counter(
+    "upstream_hedges_fired_total", "Second attempts fired for slow reads", ("resource", "operation")
+)
+HEDGES_WON = REGISTRY.counter(
+    "upstream_hedges_won_total", "Hedged reads answered by the second attempt", ("resource", "operation")
+)
+HEDGES_DENIED = REGISTRY.counter(
+    "upstream_hedges_denied_total", "Hedges skipped because the hedge budget was exhausted", ("resource", "operation")
+)
+HEDGE_BUDGET = REGISTRY.gauge("upstream_hedge_budget_tokens", "Hedges currently affordable under the hedge budget")
+
+SAMPLE_WINDOW = 512
+BUDGET_BURST = 10.0
+
+
+class LatencyTracker:
+    """Sliding window of attempt latencies with a cached percentile"""
+
+    def __init__(self, size: int = SAMPLE_WINDOW):
+        self._samples = deque(maxlen=size)
+        self._lock = threading.Lock()
+        self._sorted: list = []
+        self._dirty = 0
+
+    def observe(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+            self._dirty += 1
+
+    def percentile(self, pct: float) -> Optional[float]:
+        with self._lock:
+            if len(self._samples) < settings.HEDGE_MIN_SAMPLES:
+                return None
+            # Re-sort at most every 32 observations; the delay only needs to be approximately right
+            if self._dirty >= 32 or not self._sorted:
+                self._sorted = sorted(self._samples)
+                self._dirty = 0
+            values = self._sorted
+        index = min(int(len(values) * pct / 100), len(values) - 1)
+        return values[index]
+
+
+class HedgeBudget:
+    """Token bucket: every read earns `ratio` tokens, every hedge spends one"""
+
+    def __init__(self, ratio: float, burst: float = BUDGET_BURST):
+        self.ratio = ratio
+        self.burst = burst
+        self.tokens = burst
+        self._lock = threading.Lock()
+
+    def earn(self) -> None:
+        with self._lock:
+            self.tokens = min(self.burst, self.tokens + self.ratio)
+
+    def try_spend(self) -> bool:
+        with self._lock:
+            if self.tokens < 1.0:
+                return False
+            self.tokens -= 1.0
+            return True
+
+
+_trackers: Dict[Tuple[str, str], LatencyTracker] = {}
+budget = HedgeBudget(settings.HEDGE_BUDGET_RATIO)
+HEDGE_BUDGET.set_function(lambda: budget.tokens)
+
+
+def tracker_for(resource: str, operation: str) -> LatencyTracker:
+    key = (resource, operation)
+    tracker = _trackers.get(key)
+    if tracker is None:
+        tracker = _trackers.setdefault(key, LatencyTracker())
+    return tracker
+
+
+def hedge_delay(resource: str, operation: str) -> Optional[float]:
+    """Seconds to wait before hedging, or None while there are too few samples"""
+    observed = tracker_for(resource, operation).percentile(settings.HEDGE_PERCENTILE)
+    if observed is None:
+        return None
+    return max(observed, settings.HEDGE_MIN_DELAY_MS / 1000)
+
+
+class _Attempt:
+    """
+    One attempt of fn on the pool; its clock starts when it gets a thread, not
+    when it is queued. Its latency goes to `tracker` whenever it finishes, even
+    after another attempt has won, so slow attempts still shape the percentile.
+    """
+
+    def __init__(self, fn: Callable[[], Any], pool: Executor, tracker: LatencyTracker):
+        context = contextvars.copy_context()
+        self.started = threading.Event()
+        self.started_at: Optional[float] = None
+        self.submitted_at = time.monotonic()
+
+        def attempt():
+            self.started_at = time.monotonic()
+            self.started.set()
+            try:
+                return context.run(run_profiled, fn)
+            finally:
+                tracker.observe(time.monotonic() - self.started_at)
+
+        self.future = pool.submit(attempt)
+
+    def deadline(self, timeout: float) -> float:
+        """Abandoned `timeout` after it started, or after it was queued if it never got a thread"""
+        return (self.started_at if self.started_at is not None else self.submitted_at) + timeout
+
+
+def run_hedged(
+    resource: str, operation: str, fn: Callable[[], Any], timeout: float, pool: Executor,
+    timeout_error: Type[Exception] = TimeoutError, saturated_error: Type[Exception] = TimeoutError,
+) -> Any:
+    """
+    Run fn on `pool`, hedging once if it is slow. Returns the first successful
+    answer; raises the first error if every attempt failed, `timeout_error` if
+    nothing answered within `timeout` of starting, or `saturated_error` if the
+    first attempt got no pool thread within `timeout`.
+    """
+    tracker = tracker_for(resource, operation)
+    budget.earn()
+
+    first = _Attempt(fn, pool, tracker)
+    if not first.started.wait(timeout):
+        if first.future.cancel():
+            raise saturated_error(f"no upstream thread free within {timeout:.1f}s")
+        first.started.wait()  # got a thread just now
+    attempts = [first]
+    delay = hedge_delay(resource, operation)
+    if delay is not None and delay < timeout:
+        done, _ = wait([first.future], timeout=max(first.started_at + delay - time.monotonic(), 0))
+        if not done:
+            if budget.try_spend():
+                HEDGES_FIRED.labels(resource, operation).inc()
+                attempts.append(_Attempt(fn, pool, tracker))
+            else:
+                HEDGES_DENIED.labels(resource, operation).inc()
+
+    error = None
+    timed_out = False
+    pending = list(attempts)
+    while pending:
+        now = time.monotonic()
+        for attempt in [a for a in pending if a.deadline(timeout) <= now and not a.future.done()]:
+            attempt.future.cancel()
+            pending.remove(attempt)
+            timed_out = timed_out or attempt.started_at is not None
+        if not pending:
+            break
+        wake = min(a.deadline(timeout) for a in pending) - now
+        done, _ = wait([a.future for a in pending], timeout=max(wake, 0), return_when=FIRST_COMPLETED)
+        for attempt in [a for a in pending if a.future in done]:
+            pending.remove(attempt)
+            if attempt.future.exception() is None:
+                for other in pending:
+                    other.future.cancel()
+                if attempt is not first:
+                    HEDGES_WON.labels(resource, operation).inc()
+                return attempt.future.result()
+            error = error or attempt.future.exception()
+    if error is not None and not timed_out:
+        raise error
+    raise timeout_error(f"no answer within {timeout:.1f}s")
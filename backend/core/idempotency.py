@@ -0,0 +1,147 @@
+"""
+Idempotency-Key support for create and register endpoints
+
+The first response to a (principal, Idempotency-Key) pair is stored for
+IDEMPOTENCY_TTL_S and replayed for retries, so a client on a flaky connection
+can resend a POST without redoing the duplicate checks and inserts (and without
+the 400 a second insert would produce). Reusing a key with a different request
+gets 422. 5xx responses are not stored, so those retries run again.
+
+Stores (Settings.IDEMPOTENCY_STORE):
+- "memory": bounded LRU per worker (IDEMPOTENCY_MAX_ENTRIES); the default
+- "table":  the idempotency_keys table, shared by every worker
+
+Concurrent duplicates wait for the first request to finish: within a worker on
+an asyncio event, across workers (table store) by polling the in-progress row.
+Expired rows of the table store are deleted every SWEEP_INTERVAL_S.
+"""
+import base64
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+from starlette.concurrency import run_in_threadpool
+from config.repositories import repos
+from config.settings import settings
+from core.metrics import REGISTRY
+
+logger = logging.getLogger("hackathon.idempotency")
+
+IN_PROGRESS, COMPLETED = "in_progress", "completed"
+
+SWEEP_INTERVAL_S = 3600.0
+
+# "<METHOD> <route template>" accepting an Idempotency-Key header
+IDEMPOTENT_ROUTES = {
+    "POST /hackathons/",
+    "POST /hackathons/{hackathon_id}/register",
+    "POST /admin/add-student",
+    "POST /admin/add-teacher",
+    "POST /admin/add-hod",
+    "POST /admin/add-principal",
+}
+
+# Response headers that describe this particular response rather than the stored result
+UNSTORED_HEADERS = {b"content-length", b"date", b"server"}
+
+IDEMPOTENCY_REQUESTS = REGISTRY.counter(
+    "idempotency_requests_total",
+    "Requests carrying an Idempotency-Key by route and outcome (stored, replayed, mismatch, conflict, not_stored)",
+    ("route", "outcome"),
+)
+
+
+def fingerprint(method: str, path: str, body: bytes) -> str:
+    return hashlib.sha256(method.encode() + b" " + path.encode() + b"\n" + body).hexdigest()
+
+
+def encode_response(status_code: int, headers: List[Tuple[bytes, bytes]], body: bytes) -> Dict:
+    return {
+        "status_code": status_code,
+        "headers": [[k.decode("latin-1"), v.decode("latin-1")] for k, v in headers if k.lower() not in UNSTORED_HEADERS],
+        "body": base64.b64encode(body).decode(),
+    }
+
+
+def decode_response(record: Dict) -> Tuple[int, List[Tuple[bytes, bytes]], bytes]:
+    headers = [(k.encode("latin-1"), v.encode("latin-1")) for k, v in record["headers"]]
+    return record["status_code"], headers, base64.b64decode(record["body"])
+
+
+class MemoryStore:
+    """Per-worker bounded LRU of idempotency records"""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._records: "OrderedDict[str, Dict]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    async def claim(self, record: Dict) -> Optional[Dict]:
+        with self._lock:
+            existing = self._records.get(record["key"])
+            if existing is not None and existing["expires"] > time.monotonic():
+                self._records.move_to_end(record["key"])
+                return existing
+            self._records[record["key"]] = {**record, "expires": time.monotonic() + settings.IDEMPOTENCY_TTL_S}
+            while len(self._records) > self.max_entries:
+                self._records.popitem(last=False)
+            return None
+
+    async def get(self, key: str) -> Optional[Dict]:
+        with self._lock:
+            record = self._records.get(key)
+            return record if record is not None and record["expires"] > time.monotonic() else None
+
+    async def complete(self, key: str, values: Dict) -> None:
+        with self._lock:
+            if key in self._records:
+                self._records[key].update(values)
+
+    async def release(self, key: str) -> None:
+        with self._lock:
+            self._records.pop(key, None)
+
+
+class TableStore:
+    """idempotency_keys through the repository layer (runs in the threadpool)"""
+
+    async def claim(self, record: Dict) -> Optional[Dict]:
+        expires_at = datetime.now(timezone.utc) + timedelta(seconds=settings.IDEMPOTENCY_TTL_S)
+        return await run_in_threadpool(repos.idempotency.claim, {**record, "expires_at": expires_at.isoformat()})
+
+    async def get(self, key: str) -> Optional[Dict]:
+        return await run_in_threadpool(repos.idempotency.get, key)
+
+    async def complete(self, key: str, values: Dict) -> None:
+        await run_in_threadpool(repos.idempotency.complete, key, values)
+
+    async def release(self, key: str) -> None:
+        await run_in_threadpool(repos.idempotency.release, key)
+
+
+_store = None
+
+
+def store():
+    global _store
+    if _store is None:
+        _store = TableStore() if settings.IDEMPOTENCY_STORE == "table" else MemoryStore(settings.IDEMPOTENCY_MAX_ENTRIES)
+    return _store
+
+
+def _sweep_forever() -> None:
+    while True:
+        time.sleep(SWEEP_INTERVAL_S)
+        try:
+            repos.idempotency.delete_expired()
+        except Exception as exc:
+            logger.warning("Idempotency key sweep failed: %s", exc)
+
+
+def start_sweeper() -> None:
+    """Delete expired idempotency_keys rows every SWEEP_INTERVAL_S in a daemon thread (table store only)"""
+    if settings.IDEMPOTENCY_STORE == "table":
+        threading.Thread(target=_sweep_forever, name="idempotency-sweep", daemon=True).start()
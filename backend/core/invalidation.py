@@ -0,0 +1,230 @@
+"""
+Cross-worker invalidation bus for core.cache
+
+    publish("principal")                      # every cached principal
+    publish("stats", tag=hackathon_id)        # one hackathon's cached stats
+
+`publish` drops the matching entries in this worker at once, then broadcasts
+the message to the other workers over Settings.INVALIDATION_BUS:
+
+- "local":    no broadcast; for a single worker (the default)
+- "socket":   Unix datagram sockets, one per worker, in INVALIDATION_SOCKET_DIR;
+              for several workers on one host
+- "postgres": NOTIFY / LISTEN on INVALIDATION_CHANNEL over
+              INVALIDATION_DATABASE_URL (a direct, session-mode connection;
+              needs psycopg)
+
+Bounded staleness: every cache entry expires after its namespace's TTL, so a
+lost message leaves another worker stale for at most that long. A worker whose
+listener is down serves nothing from cache, and clears its caches whenever the
+listener (re)connects, since anything sent in between was missed. Broadcasts
+go through a background sender so a slow or unreachable bus never delays the
+write that published.
+"""
+import atexit
+import glob
+import json
+import logging
+import os
+import queue
+import socket
+import threading
+import time
+from typing import Dict, Optional
+from config.settings import settings
+from core import cache
+from core.metrics import REGISTRY
+from core.tenancy import current_tenant
+
+logger = logging.getLogger("hackathon.invalidation")
+
+ORIGIN = f"{socket.gethostname()}:{os.getpid()}"
+RECONNECT_DELAY_S = 1.0
+MAX_RECONNECT_DELAY_S = 30.0
+
+INVALIDATIONS = REGISTRY.counter(
+    "cache_invalidations_total", "Cache invalidations applied by namespace and source (local or remote)", ("namespace", "source")
+)
+BUS_SENT = REGISTRY.counter("invalidation_messages_sent_total", "Invalidation broadcasts by outcome (sent, dropped)", ("outcome",))
+BUS_CONNECTED = REGISTRY.gauge("invalidation_bus_connected", "1 while this worker is receiving invalidations")
+
+
+def _apply(message: Dict) -> None:
+    if message.get("origin") == ORIGIN:
+        return  # already applied when published
+    cache.invalidate(message["namespace"], message.get("tag"), message.get("tenant"))
+    INVALIDATIONS.labels(message["namespace"], "remote").inc()
+
+
+class Bus:
+    """Single worker: invalidations are applied locally and not broadcast"""
+
+    name = "local"
+
+    def __init__(self):
+        self.connected = True
+
+    def start(self) -> None:
+        pass
+
+    def send(self, message: Dict) -> None:
+        pass
+
+
+class _ThreadedBus(Bus):
+    """A background sender plus a listener thread that reconnects with backoff"""
+
+    def __init__(self):
+        super().__init__()
+        self.connected = False
+        self._outbox: "queue.Queue[Dict]" = queue.Queue(maxsize=10_000)
+        self._started = False
+        self._lock = threading.Lock()
+        cache.set_coherent(False)
+        BUS_CONNECTED.set_function(lambda: 1 if self.connected else 0)
+
+    def start(self) -> None:
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+        threading.Thread(target=self._listen_forever, name=f"invalidation-{self.name}-listen", daemon=True).start()
+        threading.Thread(target=self._send_forever, name=f"invalidation-{self.name}-send", daemon=True).start()
+
+    def send(self, message: Dict) -> None:
+        try:
+            self._outbox.put_nowait(message)
+        except queue.Full:
+            BUS_SENT.labels("dropped").inc()  # the TTL still bounds staleness
+
+    def _set_connected(self, connected: bool) -> None:
+        if connected != self.connected:
+            logger.info("Invalidation bus (%s) %s", self.name, "connected" if connected else "disconnected")
+        self.connected = connected
+        cache.set_coherent(connected)
+
+    def _listen_forever(self) -> None:
+        delay = RECONNECT_DELAY_S
+        while True:
+            try:
+                self._listen()  # returns or raises when the connection is lost
+                delay = RECONNECT_DELAY_S
+            except Exception as exc:
+                logger.warning("Invalidation listener (%s) failed: %s", self.name, exc)
+            self._set_connected(False)
+            time.sleep(delay)
+            delay = min(delay * 2, MAX_RECONNECT_DELAY_S)
+
+    def _send_forever(self) -> None:
+        while True:
+            message = self._outbox.get()
+            try:
+                self._publish(json.dumps(message, separators=(",", ":")))
+                BUS_SENT.labels("sent").inc()
+            except Exception as exc:
+                logger.warning("Invalidation broadcast (%s) failed: %s", self.name, exc)
+                BUS_SENT.labels("dropped").inc()
+
+    def _listen(self) -> None:
+        raise NotImplementedError
+
+    def _publish(self, payload: str) -> None:
+        raise NotImplementedError
+
+
+class SocketBus(_ThreadedBus):
+    """One Unix datagram socket per worker; a broadcast is sent to every socket in the directory"""
+
+    name = "socket"
+
+    def __init__(self, directory: str):
+        super().__init__()
+        self.directory = directory
+        self.path = os.path.join(directory, f"{os.getpid()}.sock")
+        self._sender = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        atexit.register(self._remove_socket)
+
+    def _remove_socket(self) -> None:
+        try:
+            os.unlink(self.path)
+        except OSError:
+            pass
+
+    def _listen(self) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        self._remove_socket()
+        with socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM) as listener:
+            listener.bind(self.path)
+            self._set_connected(True)
+            while True:
+                _apply(json.loads(listener.recv(65536)))
+
+    def _publish(self, payload: str) -> None:
+        data = payload.encode()
+        for path in glob.glob(os.path.join(self.directory, "*.sock")):
+            if path == self.path:
+                continue
+            try:
+                self._sender.sendto(data, path)
+            except (ConnectionRefusedError, FileNotFoundError):
+                # The worker that owned it is gone
+                try:
+                    os.unlink(path)
+                except OSError:
+                    pass
+
+
+class PostgresBus(_ThreadedBus):
+    """LISTEN/NOTIFY on one channel; each worker keeps a listening and a notifying connection"""
+
+    name = "postgres"
+
+    def __init__(self, dsn: str, channel: str):
+        super().__init__()
+        try:
+            import psycopg
+        except ImportError:
+            raise RuntimeError("INVALIDATION_BUS=postgres requires the psycopg package")
+        if not dsn:
+            raise RuntimeError("INVALIDATION_BUS=postgres requires INVALIDATION_DATABASE_URL")
+        self._psycopg = psycopg
+        self.dsn = dsn
+        self.channel = channel
+        self._notifier = None
+
+    def _listen(self) -> None:
+        with self._psycopg.connect(self.dsn, autocommit=True) as conn:
+            conn.execute(f'LISTEN "{self.channel}"')
+            self._set_connected(True)
+            for notify in conn.notifies():
+                _apply(json.loads(notify.payload))
+
+    def _publish(self, payload: str) -> None:
+        if self._notifier is None or self._notifier.closed:
+            self._notifier = self._psycopg.connect(self.dsn, autocommit=True)
+        try:
+            self._notifier.execute("SELECT pg_notify(%s, %s)", (self.channel, payload))
+        except Exception:
+            self._notifier.close()
+            raise
+
+
+def _make_bus() -> Bus:
+    if settings.INVALIDATION_BUS == "socket":
+        return SocketBus(settings.INVALIDATION_SOCKET_DIR)
+    if settings.INVALIDATION_BUS == "postgres":
+        return PostgresBus(settings.INVALIDATION_DATABASE_URL, settings.INVALIDATION_CHANNEL)
+    return Bus()
+
+
+bus = _make_bus()
+
+
+def publish(namespace: str, tag: Optional[str] = None) -> None:
+    """Invalidate the current tenant's `namespace` (or its `tag` entries) here and in every other worker"""
+    if not settings.CACHE_TTLS.get(namespace):
+        return  # not cached by any worker
+    tenant = current_tenant()
+    cache.invalidate(namespace, tag, tenant)
+    INVALIDATIONS.labels(namespace, "local").inc()
+    bus.send({"namespace": namespace, "tag": tag, "tenant": tenant, "origin": ORIGIN})
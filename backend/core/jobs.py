@@ -0,0 +1,184 @@
+"""
+In-process background job runner backed by the jobs table
+
+    @job_handler("dashboard_stats")
+    def dashboard_stats(params: Dict, progress: JobProgress):
+        return AuthService.get_dashboard_stats()
+
+    job = runner.submit("dashboard_stats", {}, created_by="ADM001")
+
+Jobs are persisted (queued -> running -> done | failed) before they are handed
+to a pool of JOB_WORKERS threads, so the request that submitted one returns at
+once and clients poll /admin/jobs/{id}. A handler returns a JSON-compatible
+result (stored on the row), or writes a file under JOB_RESULTS_DIR and returns
+`JobResult(location=path)`. Handlers report progress through `JobProgress`;
+independently, the runner touches a running job's row every
+HEARTBEAT_INTERVAL_S as a heartbeat. On start-up each worker re-queues queued
+jobs and fails running jobs whose heartbeat is older than JOB_STALE_S (their
+worker died).
+"""
+import logging
+import os
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Iterator, Optional
+from fastapi import HTTPException
+from fastapi.encoders import jsonable_encoder
+from config.repositories import repos
+from config.settings import settings
+from core.metrics import REGISTRY
+from core.tenancy import use_tenant
+
+logger = logging.getLogger("hackathon.jobs")
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+JOBS_FINISHED = REGISTRY.counter("jobs_finished_total", "Background jobs finished by kind and status", ("kind", "status"))
+JOB_DURATION = REGISTRY.histogram(
+    "job_duration_seconds", "Background job run time by kind", ("kind",),
+    buckets=(0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0, 3600.0),
+)
+
+
+@dataclass
+class JobResult:
+    """Returned by handlers whose output is a file rather than a JSON value"""
+    location: str
+    summary: Optional[Dict] = None
+
+
+class JobProgress:
+    """Progress reporter handed to handlers; writes are throttled to one per PROGRESS_INTERVAL_S"""
+
+    PROGRESS_INTERVAL_S = 1.0
+
+    def __init__(self, job_id: str):
+        self.job_id = job_id
+        self._last_write = 0.0
+
+    def update(self, done: int, total: Optional[int] = None, message: Optional[str] = None, force: bool = False) -> None:
+        now = time.monotonic()
+        if not force and now - self._last_write < self.PROGRESS_INTERVAL_S:
+            return
+        self._last_write = now
+        values: Dict[str, Any] = {"progress": done}
+        if total is not None:
+            values["total"] = total
+        if message is not None:
+            values["message"] = message
+        repos.jobs.update(self.job_id, values)
+
+
+RECOVERY_PAGE_SIZE = 100
+HEARTBEAT_INTERVAL_S = 60.0  # never more than a third of JOB_STALE_S
+
+_handlers: Dict[str, Callable[[Dict, JobProgress], Any]] = {}
+
+
+def job_handler(kind: str):
+    """Register a function(params, progress) as the handler for a job kind"""
+    def register(fn):
+        _handlers[kind] = fn
+        return fn
+    return register
+
+
+def job_kinds():
+    return sorted(_handlers)
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _all_by_status(status: str) -> Iterator[Dict]:
+    """Every job in `status`, oldest first, a page at a time"""
+    after = None
+    while True:
+        page = repos.jobs.list_by_status(status, limit=RECOVERY_PAGE_SIZE, after=after)
+        yield from page
+        if len(page) < RECOVERY_PAGE_SIZE:
+            return
+        after = [page[-1]["created_at"], page[-1]["id"]]
+
+
+def _heartbeat(job_id: str, tenant_id: Optional[str], stop: threading.Event) -> None:
+    """Touch the job's row (its updated_at) until `stop` is set, however rarely the handler reports progress"""
+    interval = min(HEARTBEAT_INTERVAL_S, settings.JOB_STALE_S / 3)
+    with use_tenant(tenant_id):
+        while not stop.wait(interval):
+            try:
+                repos.jobs.update(job_id, {"worker": WORKER_ID})
+            except Exception as exc:
+                logger.warning("Heartbeat of job %s failed: %s", job_id, exc)
+
+
+class JobRunner:
+    def __init__(self, workers: int):
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="job")
+        self._recovered = False
+        self._lock = threading.Lock()
+
+    def submit(self, kind: str, params: Dict, created_by: Optional[str]) -> Dict:
+        if kind not in _handlers:
+            raise HTTPException(status_code=400, detail=f"Unknown job kind '{kind}'. Available: {', '.join(job_kinds())}")
+        self.recover()
+        job = repos.jobs.insert({"kind": kind, "params": jsonable_encoder(params), "status": QUEUED, "progress": 0, "created_by": created_by})
+        self._pool.submit(self._run, job["id"])
+        return job
+
+    def recover(self) -> None:
+        """Once per worker: pick up queued jobs and fail running ones whose worker stopped heartbeating"""
+        with self._lock:
+            if self._recovered:
+                return
+            self._recovered = True
+        try:
+            stale_before = (datetime.now(timezone.utc) - timedelta(seconds=settings.JOB_STALE_S)).isoformat()
+            for job in _all_by_status(RUNNING):
+                if (job.get("updated_at") or "") < stale_before:
+                    repos.jobs.update(job["id"], {"status": FAILED, "error": "Worker stopped before the job finished", "finished_at": _now()})
+            for job in _all_by_status(QUEUED):
+                self._pool.submit(self._run, job["id"])
+        except Exception as exc:
+            logger.warning("Job recovery failed: %s", exc)
+
+    def _run(self, job_id: str) -> None:
+        job = repos.jobs.claim(job_id, {"status": RUNNING, "started_at": _now(), "worker": WORKER_ID})
+        if job is None:
+            return  # another worker took it
+        kind = job["kind"]
+        started = time.perf_counter()
+        stop_heartbeat = threading.Event()
+        threading.Thread(
+            target=_heartbeat, args=(job_id, job.get("tenant_id"), stop_heartbeat), name=f"job-heartbeat-{job_id}", daemon=True,
+        ).start()
+        try:
+            with use_tenant(job.get("tenant_id")):
+                result = _handlers[kind](job.get("params") or {}, JobProgress(job_id))
+            values: Dict[str, Any] = {"status": DONE, "finished_at": _now()}
+            if isinstance(result, JobResult):
+                values.update(result_location=result.location, result=jsonable_encoder(result.summary))
+            else:
+                values["result"] = jsonable_encoder(result)
+            repos.jobs.update(job_id, values)
+            JOBS_FINISHED.labels(kind, DONE).inc()
+        except Exception as exc:
+            detail = exc.detail if isinstance(exc, HTTPException) else f"{type(exc).__name__}: {exc}"
+            logger.exception("Job %s (%s) failed", job_id, kind)
+            try:
+                repos.jobs.update(job_id, {"status": FAILED, "error": str(detail), "finished_at": _now()})
+            except Exception:
+                logger.exception("Could not record failure of job %s", job_id)
+            JOBS_FINISHED.labels(kind, FAILED).inc()
+        finally:
+            stop_heartbeat.set()
+            JOB_DURATION.labels(kind).observe(time.perf_counter() - started)
+
+
+runner = JobRunner(settings.JOB_WORKERS)
@@ -0,0 +1,201 @@
+"""
+Minimal thread-safe metrics registry rendered in Prometheus text format
+
+    REQUESTS.labels("GET", "/hackathons/", "200").inc()
+    LATENCY.labels("GET", "/hackathons/").observe(0.012)
+
+Each uvicorn worker keeps its own registry; scrape every worker (or run one
+worker per scrape target) to aggregate.
+"""
+import math
+import threading
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 10.0)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: Tuple = ()) -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)] + [f'{n}="{_escape(v)}"' for n, v in extra]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._children: Dict[Tuple[str, ...], object] = {}
+
+    def labels(self, *values: str):
+        key = tuple(str(v) for v in values)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+
+class _Value:
+    __slots__ = ("value", "_lock")
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value -= amount
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self):
+        return _Value()
+
+    def samples(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(child.value)}"
+            for key, child in list(self._children.items())
+        ]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._functions: Dict[Tuple[str, ...], Callable[[], float]] = {}
+
+    def set_function(self, fn: Callable[[], float], *values: str) -> None:
+        """Compute the value at scrape time (e.g. circuit breaker state)"""
+        self._functions[tuple(str(v) for v in values)] = fn
+
+    def samples(self) -> List[str]:
+        lines = super().samples()
+        for key, fn in list(self._functions.items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(fn())}")
+        return lines
+
+
+class _HistogramValue:
+    __slots__ = ("buckets", "counts", "sum", "_lock")
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        index = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                index = i
+                break
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return _HistogramValue(self.buckets)
+
+    def samples(self) -> List[str]:
+        lines = []
+        for key, child in list(self._children.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), child.counts):
+                cumulative += count
+                labels = _format_labels(self.labelnames, key, (("le", _format_value(bound)),))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(child.sum)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        existing = self._metrics.get(metric.name)
+        if existing is not None:
+            return existing
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Optional[Sequence[float]] = None) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets or DEFAULT_BUCKETS))
+
+    def render(self) -> str:
+        return "\n".join(metric.render() for metric in list(self._metrics.values())) + "\n"
+
+
+REGISTRY = Registry()
+
+HTTP_REQUESTS = REGISTRY.counter(
+    "http_requests_total", "HTTP requests by route and status code", ("method", "route", "status")
+)
+HTTP_LATENCY = REGISTRY.histogram(
+    "http_request_duration_seconds", "HTTP request latency by route", ("method", "route")
+)
+HTTP_IN_FLIGHT = REGISTRY.gauge(
+    "http_requests_in_flight", "HTTP requests currently being served", ("method", "route")
+)
+UPSTREAM_CALLS = REGISTRY.counter(
+    "upstream_calls_total",
+    "Supabase calls by table (or auth), repository operation, issuing service method and outcome",
+    ("resource", "operation", "service_method", "outcome"),
+)
+UPSTREAM_LATENCY = REGISTRY.histogram(
+    "upstream_call_duration_seconds",
+    "Supabase call latency by table (or auth), repository operation and issuing service method",
+    ("resource", "operation", "service_method"),
+)
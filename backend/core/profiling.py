@@ -0,0 +1,82 @@
+"""
+Sampling profiler for a single request
+
+A `StackSampler` is attached to the RequestContext of a profiled request. Code
+that runs on behalf of the request calls `enter()`/`exit()` so the sampler
+knows which threads to look at: the middleware for the event loop thread,
+service methods and timing spans for threadpool threads, and
+`core.context.run_profiled` for upstream attempts on the resilience pool;
+the sampler thread then reads their stacks with `sys._current_frames()` at a
+fixed interval. Output is collapsed stacks ("frame;frame;frame count"), which
+flamegraph.pl, speedscope and inferno read directly.
+
+Requests that are not profiled never create a sampler, so the only cost on the
+normal path is a None check.
+"""
+import os
+import sys
+import threading
+from collections import Counter
+from typing import Dict
+
+MAX_DEPTH = 128
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def _collapse(frame) -> str:
+    labels = []
+    while frame is not None and len(labels) < MAX_DEPTH:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    return ";".join(reversed(labels))
+
+
+class StackSampler:
+    def __init__(self, interval_s: float):
+        self.interval_s = interval_s
+        self.samples: Counter = Counter()
+        self._threads: Dict[int, int] = {}  # thread ident -> nesting depth
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def enter(self) -> None:
+        ident = threading.get_ident()
+        with self._lock:
+            self._threads[ident] = self._threads.get(ident, 0) + 1
+
+    def exit(self) -> None:
+        ident = threading.get_ident()
+        with self._lock:
+            depth = self._threads.get(ident, 0) - 1
+            if depth > 0:
+                self._threads[ident] = depth
+            else:
+                self._threads.pop(ident, None)
+
+    def start(self) -> "StackSampler":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval_s):
+            with self._lock:
+                idents = list(self._threads)
+            if not idents:
+                continue
+            frames = sys._current_frames()
+            for ident in idents:
+                frame = frames.get(ident)
+                if frame is not None:
+                    self.samples[_collapse(frame)] += 1
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
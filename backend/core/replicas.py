@@ -0,0 +1,135 @@
+"""
+Read-replica routing for read-only service methods
+
+With Settings.READ_REPLICA_URLS set (Supabase backend), table reads issued by
+the service methods in REPLICA_SERVICE_METHODS go to a healthy replica,
+round-robin; everything else (writes, auth, principal lookups, delta sync, and
+reads inside write paths such as duplicate checks) stays on the primary.
+
+- Read-your-writes: after a principal writes, their reads stay on the primary
+  for READ_YOUR_WRITES_S (and core/singleflight.py stops sharing their reads
+  with other principals). The window is tracked per worker, with or without
+  replicas, so it holds across workers only with sticky routing at the proxy.
+- Lag: a background thread polls each replica's `replica_lag_seconds()` RPC
+  every REPLICA_CHECK_INTERVAL_S; replicas lagging more than REPLICA_MAX_LAG_S,
+  or whose check failed, are skipped until they recover.
+- Failure: a replica read that raises is retried once on the primary and the
+  replica is taken out of rotation until its next successful check.
+"""
+import itertools
+import logging
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+from config.settings import settings
+from core.context import current_request, current_service_method
+from core.metrics import REGISTRY
+from core.resilience import is_idempotent_read
+
+logger = logging.getLogger("hackathon.replicas")
+
+# Service methods whose reads tolerate a replica that is a little behind
+REPLICA_SERVICE_METHODS = {
+    "HackathonService.get_hackathon",
+    "HackathonService.list_hackathons",
+    "HackathonService.list_pending",
+    "HackathonService.with_registration_counts",
+    "HackathonService.list_registrations",
+    "HackathonService.get_hackathon_stats",
+    "AuthService.list_users",
+    "AuthService.get_dashboard_stats",
+    "AnalyticsService.participation",
+    "AnalyticsService.repeat_participants",
+    "AnalyticsService.reviewers",
+}
+
+REPLICA_READS = REGISTRY.counter(
+    "replica_reads_total", "Table reads sent to a read replica (routed) and those retried on the primary (fallback)", ("replica", "outcome")
+)
+REPLICA_LAG = REGISTRY.gauge("replica_lag_seconds", "Last measured replication lag per replica", ("replica",))
+REPLICA_HEALTHY = REGISTRY.gauge("replica_healthy", "1 while the replica is in rotation", ("replica",))
+
+# principal -> monotonic time of their last write
+_last_write: Dict[str, float] = {}
+
+
+def note_write(resource: str, operation: str) -> None:
+    """Open the current principal's read-your-writes window (a no-op for reads)"""
+    if is_idempotent_read(resource, operation):
+        return
+    context = current_request()
+    if context is not None and context.principal:
+        _last_write[context.principal] = time.monotonic()
+
+
+def wrote_recently(principal: Optional[str]) -> bool:
+    """True while `principal` is inside READ_YOUR_WRITES_S of their last write"""
+    wrote_at = _last_write.get(principal) if principal else None
+    return wrote_at is not None and time.monotonic() - wrote_at < settings.READ_YOUR_WRITES_S
+
+
+class Replica:
+    def __init__(self, name: str, targets: Dict[str, object], lag_check: Callable[[], float]):
+        self.name = name
+        # resource (table) -> repository bound to the replica's client
+        self.targets = targets
+        self.lag_check = lag_check
+        self.lag: Optional[float] = None
+        self.healthy = False
+        REPLICA_LAG.set_function(lambda: self.lag if self.lag is not None else -1, name)
+        REPLICA_HEALTHY.set_function(lambda: 1 if self.healthy else 0, name)
+
+    def check(self) -> None:
+        try:
+            self.lag = float(self.lag_check() or 0.0)
+            self.healthy = self.lag <= settings.REPLICA_MAX_LAG_S
+        except Exception as exc:
+            logger.warning("Replica %s health check failed: %s", self.name, exc)
+            self.healthy = False
+
+
+class ReplicaRouter:
+    def __init__(self, replicas: List[Replica]):
+        self.replicas = replicas
+        self._cycle = itertools.cycle(replicas)
+        self._lock = threading.Lock()
+        self._checker: Optional[threading.Thread] = None
+
+    def _start_checker(self) -> None:
+        with self._lock:
+            if self._checker is not None:
+                return
+            self._checker = threading.Thread(target=self._check_loop, name="replica-check", daemon=True)
+            self._checker.start()
+
+    def _check_loop(self) -> None:
+        while True:
+            for replica in self.replicas:
+                replica.check()
+            time.sleep(settings.REPLICA_CHECK_INTERVAL_S)
+
+    def pick(self, resource: str, operation: str) -> Optional[Replica]:
+        """Replica to serve this read from, or None for the primary"""
+        if self._checker is None:
+            self._start_checker()
+        if resource == "auth" or not is_idempotent_read(resource, operation):
+            return None
+        if operation == "changed_since":
+            # A change feed read from a lagging replica moves its position past rows the replica has not seen yet
+            return None
+        if current_service_method() not in REPLICA_SERVICE_METHODS:
+            return None
+        context = current_request()
+        if context is not None and wrote_recently(context.principal):
+            return None
+        for _ in range(len(self.replicas)):
+            replica = next(self._cycle)
+            if replica.healthy and resource in replica.targets:
+                REPLICA_READS.labels(replica.name, "routed").inc()
+                return replica
+        return None
+
+    def mark_failed(self, replica: Replica, exc: Exception) -> None:
+        logger.warning("Read from replica %s failed, using the primary: %s", replica.name, exc)
+        replica.healthy = False
+        REPLICA_READS.labels(replica.name, "fallback").inc()
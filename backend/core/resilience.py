@@ -0,0 +1,223 @@
+"""
+Timeouts, retries and circuit breaking for upstream (Supabase) calls
+
+`core.upstream.call` runs every repository call through `execute` when the
+proxy was built with resilience enabled (the Supabase backend):
+
+- each attempt runs on a dedicated bounded pool and is abandoned after a
+  per-operation timeout, so a hung PostgREST/GoTrue call cannot pin a request
+  thread (the HTTP clients carry the same timeout, which frees the pool thread).
+  The clock starts when the attempt starts running, not when it is queued: the
+  pool has at least ADMISSION_TOTAL_LIMIT threads, and an attempt that never
+  got a thread fails with 503 without counting against the breaker;
+- idempotent reads are retried on transient failures with full-jitter backoff,
+  and hedged when HEDGING_ENABLED (see core.hedging);
+- one circuit breaker per upstream service ("postgrest", "auth") opens after
+  consecutive transient failures and rejects calls with 503 + Retry-After until
+  a half-open probe succeeds.
+
+Application errors (not found, unique violations, invalid credentials) pass
+through untouched and never count against the breaker.
+"""
+import contextvars
+import math
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict
+from fastapi import HTTPException, status
+from config.settings import settings
+from core.context import run_profiled
+from core.hedging import run_hedged
+from core.metrics import REGISTRY
+
+try:
+    import httpx
+    _TRANSIENT_ERRORS = (TimeoutError, ConnectionError, httpx.TransportError)
+except ImportError:  # pragma: no cover - httpx ships with supabase
+    httpx = None
+    _TRANSIENT_ERRORS = (TimeoutError, ConnectionError)
+
+CLOSED, HALF_OPEN, OPEN = "closed", "half_open", "open"
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+READ_PREFIXES = ("get", "find", "list")
+
+CIRCUIT_STATE = REGISTRY.gauge(
+    "upstream_circuit_state", "Circuit breaker state per upstream (0 closed, 1 half-open, 2 open)", ("upstream",)
+)
+CIRCUIT_REJECTIONS = REGISTRY.counter(
+    "upstream_circuit_rejections_total", "Calls rejected without reaching upstream because the circuit was open", ("upstream",)
+)
+UPSTREAM_RETRIES = REGISTRY.counter(
+    "upstream_retries_total", "Retried upstream attempts by table (or auth) and operation", ("resource", "operation")
+)
+UPSTREAM_TIMEOUTS = REGISTRY.counter(
+    "upstream_timeouts_total", "Upstream attempts abandoned after their timeout", ("resource", "operation")
+)
+
+
+class UpstreamTimeout(TimeoutError):
+    pass
+
+
+class UpstreamSaturated(Exception):
+    """The attempt never got a pool thread, so it never reached the upstream"""
+
+
+class CircuitBreaker:
+    """Consecutive-failure breaker: closed -> open -> half-open (one probe) -> closed"""
+
+    def __init__(self, name: str, failure_threshold: int, reset_timeout: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+        CIRCUIT_STATE.set_function(lambda: _STATE_VALUES[self.state], name)
+
+    def retry_after(self) -> float:
+        return max(self.opened_at + self.reset_timeout - time.monotonic(), 0.0)
+
+    def before_call(self) -> None:
+        """Raise 503 if the circuit is open (or half-open with a probe already in flight)"""
+        with self._lock:
+            if self.state == OPEN and self.retry_after() <= 0:
+                self.state = HALF_OPEN
+            if self.state == CLOSED:
+                return
+            if self.state == HALF_OPEN and not self._probing:
+                self._probing = True
+                return
+        CIRCUIT_REJECTIONS.labels(self.name).inc()
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Upstream {self.name} is unavailable, try again shortly",
+            headers={"Retry-After": str(max(math.ceil(self.retry_after()), 1))},
+        )
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self._probing = False
+            self.state = CLOSED
+
+    def release(self) -> None:
+        """Give back a half-open probe slot without a verdict"""
+        with self._lock:
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            self._probing = False
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = OPEN
+                self.opened_at = time.monotonic()
+
+    def snapshot(self) -> Dict:
+        return {"state": self.state, "consecutive_failures": self.failures, "retry_after_s": round(self.retry_after(), 1)}
+
+
+breakers: Dict[str, CircuitBreaker] = {
+    name: CircuitBreaker(name, settings.CIRCUIT_FAILURE_THRESHOLD, settings.CIRCUIT_RESET_TIMEOUT_S)
+    for name in ("postgrest", "auth")
+}
+
+# Every admitted request can hold an attempt at once; below that, attempts would queue behind each other
+_pool = ThreadPoolExecutor(
+    max_workers=max(settings.UPSTREAM_POOL_SIZE, settings.ADMISSION_TOTAL_LIMIT), thread_name_prefix="upstream"
+)
+
+
+def upstream_for(resource: str) -> str:
+    return "auth" if resource == "auth" else "postgrest"
+
+
+def is_idempotent_read(resource: str, operation: str) -> bool:
+    if resource == "auth":
+        return operation == "get_user"
+    return operation.startswith(READ_PREFIXES) or operation == "changed_since"
+
+
+def timeout_for(resource: str, operation: str) -> float:
+    override = settings.UPSTREAM_TIMEOUTS.get(f"{resource}.{operation}")
+    if override is not None:
+        return override
+    return settings.UPSTREAM_READ_TIMEOUT_S if is_idempotent_read(resource, operation) else settings.UPSTREAM_WRITE_TIMEOUT_S
+
+
+def is_transient(exc: BaseException) -> bool:
+    if isinstance(exc, _TRANSIENT_ERRORS):
+        return True
+    if httpx is not None and isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code >= 500
+    return False
+
+
+def run_with_timeout(fn: Callable[[], Any], timeout: float) -> Any:
+    """Run fn on the upstream pool with the caller's contextvars; abandon it `timeout` seconds after it started"""
+    context = contextvars.copy_context()
+    started = threading.Event()
+
+    def attempt():
+        started.set()
+        return context.run(run_profiled, fn)
+
+    future = _pool.submit(attempt)
+    if not started.wait(timeout) and future.cancel():
+        raise UpstreamSaturated(f"no upstream thread free within {timeout:.1f}s")
+    done, _ = wait([future], timeout=timeout)
+    if not done:
+        future.cancel()
+        raise UpstreamTimeout(f"no answer within {timeout:.1f}s")
+    return future.result()
+
+
+def execute(resource: str, operation: str, fn: Callable[[], Any]) -> Any:
+    """Run one logical upstream call under the timeout, retry and breaker policy"""
+    breaker = breakers[upstream_for(resource)]
+    timeout = timeout_for(resource, operation)
+    read = is_idempotent_read(resource, operation)
+    attempts = settings.UPSTREAM_RETRY_ATTEMPTS if read else 1
+    for attempt in range(1, attempts + 1):
+        breaker.before_call()
+        try:
+            if read and settings.HEDGING_ENABLED:
+                result = run_hedged(
+                    resource, operation, fn, timeout, _pool,
+                    timeout_error=UpstreamTimeout, saturated_error=UpstreamSaturated,
+                )
+            else:
+                result = run_with_timeout(fn, timeout)
+        except UpstreamSaturated as exc:
+            # Our own backlog, not the upstream's health
+            breaker.release()
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail=f"Upstream {breaker.name} call {resource}.{operation} not started: {exc}",
+                headers={"Retry-After": "1"},
+            )
+        except Exception as exc:
+            if not is_transient(exc):
+                # The upstream answered; it just said no
+                breaker.record_success()
+                raise
+            breaker.record_failure()
+            if isinstance(exc, UpstreamTimeout):
+                UPSTREAM_TIMEOUTS.labels(resource, operation).inc()
+            if attempt == attempts or breaker.state == OPEN:
+                raise HTTPException(
+                    status_code=status.HTTP_504_GATEWAY_TIMEOUT if isinstance(exc, UpstreamTimeout) else status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail=f"Upstream {breaker.name} call {resource}.{operation} failed: {exc}",
+                )
+            UPSTREAM_RETRIES.labels(resource, operation).inc()
+            cap = min(settings.UPSTREAM_RETRY_MAX_MS, settings.UPSTREAM_RETRY_BASE_MS * 2 ** (attempt - 1))
+            time.sleep(random.uniform(0, cap) / 1000)
+            continue
+        breaker.record_success()
+        return result
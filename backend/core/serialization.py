@@ -0,0 +1,80 @@
+"""
+Fast response serialization for list endpoints
+
+Rows returned by our own Supabase tables are already JSON-shaped, so building a
+response model per row and letting FastAPI validate and encode it a second time
+is pure overhead. `serialize_rows` either trusts the rows and only projects them
+onto the response model's fields, or validates the whole list once with a
+TypeAdapter. Either way the result is encoded in a single pass.
+"""
+import json
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Tuple, Type
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, TypeAdapter
+from config.settings import settings
+from core.timing import span
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - stdlib fallback
+    orjson = None
+
+
+def dumps(content: Any) -> bytes:
+    """Encode JSON-compatible content, using orjson when it is installed"""
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse that encodes with orjson, or accepts pre-encoded bytes"""
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        return dumps(content)
+
+
+@lru_cache(maxsize=None)
+def _field_plan(model: Type[BaseModel]) -> Tuple[Tuple[str, Any], ...]:
+    """Field names and defaults of a response model, computed once per model"""
+    return tuple(
+        (name, None if field.is_required() else field.get_default(call_default_factory=True))
+        for name, field in model.model_fields.items()
+    )
+
+
+@lru_cache(maxsize=None)
+def _list_adapter(model: Type[BaseModel]) -> TypeAdapter:
+    return TypeAdapter(List[model])
+
+
+def project_rows(model: Type[BaseModel], rows: Iterable[Dict]) -> List[Dict]:
+    """Trusted construction: keep only the model's fields, filling defaults"""
+    plan = _field_plan(model)
+    return [{name: row.get(name, default) for name, default in plan} for row in rows]
+
+
+def serialize_rows(model: Type[BaseModel], rows: Iterable[Dict], trusted: bool | None = None) -> bytes:
+    """
+    Encode database rows as a JSON array shaped like `List[model]`.
+
+    trusted=True skips validation entirely (only for rows read from our own tables);
+    trusted=False validates the list once and lets pydantic-core encode it.
+    Defaults to settings.TRUSTED_SERIALIZATION.
+    """
+    if trusted is None:
+        trusted = settings.TRUSTED_SERIALIZATION
+    if trusted:
+        return dumps(project_rows(model, rows))
+    adapter = _list_adapter(model)
+    return adapter.dump_json(adapter.validate_python(list(rows)))
+
+
+def rows_response(model: Type[BaseModel], rows: Iterable[Dict], status_code: int = 200) -> FastJSONResponse:
+    """Response for list endpoints; bypasses FastAPI's response_model re-validation"""
+    with span("serialize"):
+        body = serialize_rows(model, rows)
+    return FastJSONResponse(content=body, status_code=status_code)
@@ -0,0 +1,106 @@
+"""
+Single-flight coalescing of identical concurrent reads
+
+    @staticmethod
+    @single_flight
+    def list_hackathons(include_inactive: bool = False) -> List[Dict]:
+        ...
+
+While a call is in flight, identical calls (same function, same bound
+arguments, same tenant) wait for it and share its result or exception instead
+of issuing their own upstream request. Nothing is cached: once the leader
+returns, the next call starts a new flight. Callers block on an Event, so this
+is for the sync service methods that run on the threadpool.
+
+Followers get a shallow copy of list/dict results so one request adding keys
+to a row cannot leak into another. A follower can see data read just before a
+concurrent write committed, exactly as if its own read had raced the write;
+but a principal who wrote within READ_YOUR_WRITES_S (core/replicas.py) only
+shares flights with their own reads, so they never get a result read before
+their write.
+"""
+import functools
+import inspect
+import threading
+from typing import Any, Callable, Dict, Hashable
+from core.context import current_request
+from core.metrics import REGISTRY
+from core.replicas import wrote_recently
+from core.tenancy import current_tenant
+
+SINGLE_FLIGHT_CALLS = REGISTRY.counter(
+    "single_flight_calls_total",
+    "Coalesced reads by function and role (leader ran the call, follower shared its result)",
+    ("function", "role"),
+)
+
+
+def _share(result: Any) -> Any:
+    if isinstance(result, list):
+        return [dict(item) if isinstance(item, dict) else item for item in result]
+    if isinstance(result, dict):
+        return dict(result)
+    return result
+
+
+class _Flight:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Keyed registry of in-flight calls"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self._flights: Dict[Hashable, _Flight] = {}
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+        if not leader:
+            SINGLE_FLIGHT_CALLS.labels(self.name, "follower").inc()
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return _share(flight.result)
+
+        SINGLE_FLIGHT_CALLS.labels(self.name, "leader").inc()
+        try:
+            flight.result = fn()
+            return flight.result
+        except BaseException as exc:
+            flight.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+
+def single_flight(fn: Callable) -> Callable:
+    """Decorator: coalesce concurrent calls to `fn` with equal arguments (defaults applied) within a tenant"""
+    signature = inspect.signature(fn)
+    flights = SingleFlight(fn.__qualname__)
+
+    def key_for(args, kwargs) -> Hashable:
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        context = current_request()
+        principal = context.principal if context is not None else None
+        # Inside their read-your-writes window a principal only joins their own flights
+        own = principal if wrote_recently(principal) else None
+        return repr((current_tenant(), own, tuple(bound.arguments.items())))
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        return flights.do(key_for(args, kwargs), lambda: fn(*args, **kwargs))
+    return wrapper
@@ -0,0 +1,49 @@
+"""
+Tenant (college) scoping for multi-college deployments
+
+With Settings.MULTI_TENANT on, rows in college_users, hackathons,
+hackathon_registrations, sync_tombstones and jobs carry a tenant_id.
+get_current_user records the principal's tenant on the request context; the
+repositories then add `tenant_id = <tenant>` to every query and stamp it on
+every insert, so no AuthService/HackathonService query reads or writes another
+college's rows. Work outside a request (background jobs) pins its tenant with
+`use_tenant`.
+
+Lookups made before the tenant is known (the principal lookup by auth id,
+login, account activation) are unscoped, which is why college_id, email and
+auth_user_id stay globally unique.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+from config.settings import settings
+from core.context import current_request
+
+DEFAULT_TENANT = "default"
+
+_pinned_tenant: ContextVar[Optional[str]] = ContextVar("pinned_tenant", default=None)
+
+
+def tenant_of(user: dict) -> str:
+    return user.get("tenant_id") or DEFAULT_TENANT
+
+
+def current_tenant() -> Optional[str]:
+    """Tenant to scope queries to, or None for unscoped (single tenant, or not yet authenticated)"""
+    if not settings.MULTI_TENANT:
+        return None
+    pinned = _pinned_tenant.get()
+    if pinned is not None:
+        return pinned
+    context = current_request()
+    return context.tenant if context is not None else None
+
+
+@contextmanager
+def use_tenant(tenant: Optional[str]):
+    """Scope everything inside the block to `tenant`"""
+    token = _pinned_tenant.set(tenant)
+    try:
+        yield
+    finally:
+        _pinned_tenant.reset(token)
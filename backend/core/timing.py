@@ -0,0 +1,64 @@
+"""
+Lightweight phase spans for the Server-Timing breakdown
+
+    with span("auth"):
+        payload = AuthService.verify_jwt_token(token)
+
+Upstream calls made inside a span are attributed to it; calls made outside any
+span are accounted to the "db" phase. Without an active request context (scripts,
+benchmarks) spans are no-ops.
+"""
+import time
+from contextlib import contextmanager
+from core.context import current_request
+
+DB_PHASE = "db"
+
+
+@contextmanager
+def span(name: str):
+    context = current_request()
+    if context is None or context.active_phase is not None:
+        # Nested spans are accounted to the outer phase
+        yield
+        return
+    context.active_phase = name
+    calls_before = context.round_trips
+    profiler = context.profiler
+    if profiler is not None:
+        profiler.enter()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        if profiler is not None:
+            profiler.exit()
+        context.active_phase = None
+        context.add_phase(name, time.perf_counter() - start, context.round_trips - calls_before)
+
+
+def record_upstream(seconds: float) -> None:
+    """Called by the upstream layer after every round trip"""
+    context = current_request()
+    if context is None:
+        return
+    context.round_trips += 1
+    if context.active_phase is None:
+        context.add_phase(DB_PHASE, seconds, 1)
+
+
+def server_timing_header(context) -> str:
+    """Format phases as a Server-Timing header value"""
+    entries = []
+    accounted = 0.0
+    for name, (seconds, calls) in context.phases.items():
+        accounted += seconds
+        entry = f"{name};dur={seconds * 1000:.1f}"
+        if calls:
+            entry += f';desc="{int(calls)} call{"s" if calls != 1 else ""}"'
+        entries.append(entry)
+    total = context.elapsed()
+    entries.append(f"app;dur={max(total - accounted, 0.0) * 1000:.1f}")
+    entries.append(f'upstream;desc="{context.round_trips} round trips"')
+    entries.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(entries)
@@ -0,0 +1,187 @@
+"""
+Minimal OpenTelemetry-compatible tracing with local exporters
+
+Spans carry W3C trace/span ids and are exported one JSON object per line using
+OTLP field names (traceId, spanId, parentSpanId, startTimeUnixNano, ...), so the
+output can be loaded into any OTLP-aware tool or converted offline. Incoming
+`traceparent` headers are honoured, and the response carries the request's own
+`traceparent` so clients and proxies can correlate.
+
+    with start_span("HackathonService.list_hackathons"):
+        ...
+
+When tracing is disabled (the default) `start_span` yields None and costs one
+settings check.
+"""
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional, Tuple
+from config.settings import settings
+
+logger = logging.getLogger("hackathon.tracing")
+
+_current_span: ContextVar[Optional[object]] = ContextVar("current_span", default=None)
+
+
+class _Unsampled:
+    """Stands in for the current span of a trace that is not recorded, so its children are not either"""
+
+    __slots__ = ("trace_id",)
+
+    def __init__(self, trace_id: str):
+        self.trace_id = trace_id
+
+
+class Span:
+    __slots__ = ("trace_id", "span_id", "parent_id", "name", "kind", "start_ns", "end_ns", "attributes", "status", "message")
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str], kind: str, attributes: Optional[Dict]):
+        self.trace_id = trace_id
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.attributes = dict(attributes or {})
+        self.status = "UNSET"
+        self.message = None
+
+    def set_attribute(self, key: str, value) -> None:
+        self.attributes[key] = value
+
+    def set_error(self, exc: BaseException) -> None:
+        self.status = "ERROR"
+        self.message = f"{type(exc).__name__}: {exc}"
+
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def to_dict(self) -> Dict:
+        return {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_id or "",
+            "name": self.name,
+            "kind": f"SPAN_KIND_{self.kind}",
+            "startTimeUnixNano": self.start_ns,
+            "endTimeUnixNano": self.end_ns,
+            "attributes": self.attributes,
+            "status": {"code": f"STATUS_CODE_{self.status}", **({"message": self.message} if self.message else {})},
+            "resource": {"service.name": settings.APP_NAME, "service.version": settings.API_VERSION, "process.pid": os.getpid()},
+        }
+
+
+class _Exporter:
+    """Background thread that writes finished spans to the console or a JSON-lines file"""
+
+    def __init__(self):
+        self._queue: "queue.Queue[Dict]" = queue.Queue(maxsize=10_000)
+        self._thread = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+        self._thread.start()
+
+    def export(self, span: Span) -> None:
+        try:
+            self._queue.put_nowait(span.to_dict())
+        except queue.Full:
+            pass  # drop rather than block the request path
+
+    def _run(self) -> None:
+        while True:
+            record = self._queue.get()
+            line = json.dumps(record, default=str)
+            if settings.TRACING_EXPORTER == "file":
+                with open(settings.TRACING_FILE, "a", encoding="utf-8") as fh:
+                    fh.write(line + "\n")
+                    # Drain whatever else is queued while the file is open
+                    while not self._queue.empty():
+                        fh.write(json.dumps(self._queue.get_nowait(), default=str) + "\n")
+            else:
+                logger.info(line)
+
+
+_exporter: Optional[_Exporter] = None
+_exporter_lock = threading.Lock()
+
+
+def _export(span: Span) -> None:
+    global _exporter
+    if _exporter is None:
+        with _exporter_lock:
+            if _exporter is None:
+                _exporter = _Exporter()
+    _exporter.export(span)
+
+
+def parse_traceparent(header: Optional[str]) -> Optional[Tuple[str, str, bool]]:
+    """(trace_id, parent_span_id, sampled) from a W3C traceparent header, or None if invalid"""
+    if not header:
+        return None
+    parts = header.strip().split("-")
+    if len(parts) < 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    version, trace_id, span_id, flags = parts[:4]
+    if version == "ff" or trace_id == "0" * 32 or span_id == "0" * 16:
+        return None
+    try:
+        int(trace_id, 16), int(span_id, 16)
+        sampled = bool(int(flags, 16) & 1)
+    except ValueError:
+        return None
+    return trace_id.lower(), span_id.lower(), sampled
+
+
+def current_span() -> Optional[Span]:
+    span = _current_span.get()
+    return span if isinstance(span, Span) else None
+
+
+@contextmanager
+def start_span(name: str, kind: str = "INTERNAL", attributes: Optional[Dict] = None, traceparent: Optional[str] = None):
+    """
+    Open a span as a child of the current one. A root span starts a new trace,
+    or continues the one in `traceparent` (which also decides sampling). Spans
+    of an unsampled trace, root and children alike, yield None.
+    """
+    if not settings.TRACING_ENABLED:
+        yield None
+        return
+    parent = _current_span.get()
+    if isinstance(parent, _Unsampled):
+        yield None
+        return
+    if parent is not None:
+        trace_id, parent_id = parent.trace_id, parent.span_id
+    else:
+        incoming = parse_traceparent(traceparent)
+        if incoming is not None:
+            trace_id, parent_id, sampled = incoming
+        else:
+            trace_id, parent_id = f"{random.getrandbits(128):032x}", None
+            sampled = random.random() < settings.TRACING_SAMPLE_RATIO
+        if not sampled:
+            token = _current_span.set(_Unsampled(trace_id))
+            try:
+                yield None
+            finally:
+                _current_span.reset(token)
+            return
+
+    span = Span(name, trace_id, parent_id, kind, attributes)
+    token = _current_span.set(span)
+    try:
+        yield span
+    except BaseException as exc:
+        span.set_error(exc)
+        raise
+    finally:
+        _current_span.reset(token)
+        span.end_ns = time.time_ns()
+        _export(span)
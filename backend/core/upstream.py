@@ -0,0 +1,95 @@
+"""
+Single choke point for every call the services make to the data backend
+
+`config.repositories` wraps each repository in an `UpstreamProxy`, so every
+public repository method (one PostgREST or GoTrue round trip for the Supabase
+backend) goes through `call`. Cross-cutting concerns hook in here once instead
+of in each repository implementation. Proxies built with `resilient=True` (the
+Supabase backend) also get timeouts, retries and circuit breaking from
+`core.resilience`; proxies given a `core.replicas.ReplicaRouter` send eligible
+reads to a read replica.
+"""
+import time
+from typing import Any, Callable, Dict
+from core.budget import before_call, call_site
+from core.context import current_service_method
+from core.metrics import UPSTREAM_CALLS, UPSTREAM_LATENCY
+from core.replicas import note_write
+from core.resilience import UpstreamSaturated, execute as execute_resilient, is_transient, run_with_timeout, timeout_for
+from core.timing import record_upstream
+from core.tracing import start_span
+
+
+def call(resource: str, operation: str, fn: Callable[[], Any], site: str | None = None, resilient: bool = False) -> Any:
+    """Run one upstream call, recording count, latency, per-request round trips and a client span"""
+    before_call(site or f"{resource}.{operation}()")
+    service_method = current_service_method()
+    outcome = "ok"
+    attributes = {"db.system": "auth" if resource == "auth" else "postgresql", "db.operation": operation}
+    if resource != "auth":
+        attributes["db.sql.table"] = resource
+    start = time.perf_counter()
+    try:
+        with start_span(f"{resource}.{operation}", kind="CLIENT", attributes=attributes):
+            if resilient:
+                return execute_resilient(resource, operation, fn)
+            return fn()
+    except Exception:
+        outcome = "error"
+        raise
+    finally:
+        elapsed = time.perf_counter() - start
+        UPSTREAM_LATENCY.labels(resource, operation, service_method).observe(elapsed)
+        UPSTREAM_CALLS.labels(resource, operation, service_method, outcome).inc()
+        record_upstream(elapsed)
+
+
+class UpstreamProxy:
+    """Wraps a repository so each public method call is routed through `call`"""
+
+    def __init__(self, target: Any, resource: str, resilient: bool = False, router: Any = None):
+        self._target = target
+        self._resource = resource
+        self._resilient = resilient
+        self._router = router
+        self._wrapped: Dict[str, Callable] = {}
+
+    def __getattr__(self, name: str):
+        attr = getattr(self._target, name)
+        if name.startswith("_") or not callable(attr):
+            return attr
+        wrapped = self._wrapped.get(name)
+        if wrapped is None:
+            resource = self._resource
+            resilient = self._resilient
+            router = self._router
+
+            def wrapped(*args, **kwargs):
+                site = call_site(resource, name, kwargs)
+                if router is not None:
+                    replica = router.pick(resource, name)
+                    if replica is not None:
+                        replica_fn = getattr(replica.targets[resource], name)
+                        try:
+                            # Timeout but no retries or breaker: a replica failing transiently falls back to the primary instead
+                            return call(
+                                resource, name,
+                                lambda: run_with_timeout(lambda: replica_fn(*args, **kwargs), timeout_for(resource, name)),
+                                site=f"{site}@{replica.name}",
+                            )
+                        except UpstreamSaturated:
+                            # Our own pool was full, which says nothing about the replica
+                            pass
+                        except Exception as exc:
+                            if not is_transient(exc):
+                                # The replica answered (invalid input, budget exceeded...): the primary would say the same
+                                raise
+                            router.mark_failed(replica, exc)
+                note_write(resource, name)
+                return call(
+                    resource, name, lambda: getattr(self._target, name)(*args, **kwargs),
+                    site=site, resilient=resilient,
+                )
+
+            self._wrapped[name] = wrapped
+        return wrapped
@@ -133,3 +133,165 @@ ALTER TABLE hackathons
 
 -- Ensure existing rows are marked approved
 UPDATE hackathons SET approval_status = COALESCE(approval_status, 'approved'), source = COALESCE(source, 'manual') WHERE approval_status IS NULL OR source IS NULL;
+
+-- Delta sync support: keyset indexes over (updated_at, id) and tombstones for deleted rows
+CREATE INDEX IF NOT EXISTS idx_hackathons_updated_at_id ON hackathons(updated_at, id);
+CREATE INDEX IF NOT EXISTS idx_hackathon_registrations_updated_at_id ON hackathon_registrations(updated_at, id);
+
+CREATE TABLE IF NOT EXISTS sync_tombstones (
+    id UUID DEFAULT gen_random_uuid() PRIMARY KEY,
+    entity TEXT NOT NULL CHECK (entity IN ('hackathon','registration')),
+    entity_id UUID NOT NULL,
+    scope_college_id VARCHAR(50),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_sync_tombstones_updated_at_id ON sync_tombstones(updated_at, id);
+
+-- Record a tombstone for every deleted hackathon and registration (including ON DELETE CASCADE)
+CREATE OR REPLACE FUNCTION record_sync_tombstone()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_TABLE_NAME = 'hackathons' THEN
+        INSERT INTO sync_tombstones (entity, entity_id) VALUES ('hackathon', OLD.id);
+    ELSE
+        INSERT INTO sync_tombstones (entity, entity_id, scope_college_id)
+        VALUES ('registration', OLD.id, OLD.student_college_id);
+    END IF;
+    RETURN OLD;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER record_hackathons_tombstone
+    AFTER DELETE ON hackathons
+    FOR EACH ROW EXECUTE FUNCTION record_sync_tombstone();
+
+CREATE TRIGGER record_hackathon_registrations_tombstone
+    AFTER DELETE ON hackathon_registrations
+    FOR EACH ROW EXECUTE FUNCTION record_sync_tombstone();
+
+ALTER TABLE sync_tombstones ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Tombstones service role all" ON sync_tombstones
+    FOR ALL USING (auth.role() = 'service_role');
+
+-- Responses stored for Idempotency-Key retries (only with IDEMPOTENCY_STORE=table; see core/idempotency.py)
+CREATE TABLE IF NOT EXISTS idempotency_keys (
+    key TEXT PRIMARY KEY,  -- "<college_id>:<Idempotency-Key>"
+    fingerprint TEXT NOT NULL,
+    state TEXT NOT NULL DEFAULT 'in_progress' CHECK (state IN ('in_progress','completed')),
+    status_code INTEGER,
+    headers JSONB,
+    body TEXT,  -- base64
+    expires_at TIMESTAMP WITH TIME ZONE NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_idempotency_keys_expires_at ON idempotency_keys(expires_at);
+
+ALTER TABLE idempotency_keys ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Idempotency keys service role all" ON idempotency_keys
+    FOR ALL USING (auth.role() = 'service_role');
+
+-- Replication lag in seconds, polled by core/replicas.py on each read replica (0 on the primary)
+CREATE OR REPLACE FUNCTION replica_lag_seconds()
+RETURNS DOUBLE PRECISION AS $$
+    SELECT CASE
+        WHEN pg_is_in_recovery() THEN COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+        ELSE 0
+    END;
+$$ LANGUAGE sql STABLE SECURITY DEFINER;
+
+-- Background jobs for heavy admin operations (see core/jobs.py)
+CREATE TABLE IF NOT EXISTS jobs (
+    id UUID DEFAULT gen_random_uuid() PRIMARY KEY,
+    kind TEXT NOT NULL,
+    params JSONB NOT NULL DEFAULT '{}'::jsonb,
+    status TEXT NOT NULL DEFAULT 'queued' CHECK (status IN ('queued','running','done','failed')),
+    progress INTEGER NOT NULL DEFAULT 0,
+    total INTEGER,
+    message TEXT,
+    result JSONB,
+    result_location TEXT,
+    error TEXT,
+    worker TEXT,  -- "<host>:<pid>" running the job
+    created_by VARCHAR(50) REFERENCES college_users(college_id),
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    started_at TIMESTAMP WITH TIME ZONE,
+    finished_at TIMESTAMP WITH TIME ZONE,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_jobs_status_created_at ON jobs(status, created_at);
+
+CREATE TRIGGER update_jobs_updated_at BEFORE UPDATE ON jobs
+    FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+
+ALTER TABLE jobs ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Jobs service role all" ON jobs
+    FOR ALL USING (auth.role() = 'service_role');
+
+-- Multi-college tenancy (Settings.MULTI_TENANT; see core/tenancy.py). Existing rows join the 'default' tenant.
+ALTER TABLE college_users ADD COLUMN IF NOT EXISTS tenant_id TEXT NOT NULL DEFAULT 'default';
+ALTER TABLE hackathons ADD COLUMN IF NOT EXISTS tenant_id TEXT NOT NULL DEFAULT 'default';
+ALTER TABLE hackathon_registrations ADD COLUMN IF NOT EXISTS tenant_id TEXT NOT NULL DEFAULT 'default';
+ALTER TABLE sync_tombstones ADD COLUMN IF NOT EXISTS tenant_id TEXT NOT NULL DEFAULT 'default';
+ALTER TABLE jobs ADD COLUMN IF NOT EXISTS tenant_id TEXT NOT NULL DEFAULT 'default';
+
+-- Tenant-leading indexes: every scoped query filters on tenant_id first
+CREATE INDEX IF NOT EXISTS idx_college_users_tenant_role_department ON college_users(tenant_id, role, department);
+CREATE INDEX IF NOT EXISTS idx_hackathons_tenant_status_active ON hackathons(tenant_id, approval_status, is_active, deadline);
+CREATE INDEX IF NOT EXISTS idx_hackathons_tenant_updated_at_id ON hackathons(tenant_id, updated_at, id);
+CREATE INDEX IF NOT EXISTS idx_hackathon_registrations_tenant_hackathon ON hackathon_registrations(tenant_id, hackathon_id);
+CREATE INDEX IF NOT EXISTS idx_hackathon_registrations_tenant_updated_at_id ON hackathon_registrations(tenant_id, updated_at, id);
+CREATE INDEX IF NOT EXISTS idx_sync_tombstones_tenant_updated_at_id ON sync_tombstones(tenant_id, updated_at, id);
+CREATE INDEX IF NOT EXISTS idx_jobs_tenant_created_at ON jobs(tenant_id, created_at);
+
+-- Tombstones belong to the deleted row's tenant
+CREATE OR REPLACE FUNCTION record_sync_tombstone()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_TABLE_NAME = 'hackathons' THEN
+        INSERT INTO sync_tombstones (entity, entity_id, tenant_id) VALUES ('hackathon', OLD.id, OLD.tenant_id);
+    ELSE
+        INSERT INTO sync_tombstones (entity, entity_id, scope_college_id, tenant_id)
+        VALUES ('registration', OLD.id, OLD.student_college_id, OLD.tenant_id);
+    END IF;
+    RETURN OLD;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Bulk activation (see services/provisioning.py): link many auth accounts in one statement
+CREATE OR REPLACE FUNCTION link_auth_users(links JSONB, p_tenant_id TEXT DEFAULT NULL)
+RETURNS TABLE (college_id VARCHAR) AS $$
+    UPDATE college_users AS u
+    SET auth_user_id = l.auth_user_id
+    FROM jsonb_to_recordset(links) AS l(college_id VARCHAR, auth_user_id UUID)
+    WHERE u.college_id = l.college_id
+      AND u.auth_user_id IS NULL
+      AND (p_tenant_id IS NULL OR u.tenant_id = p_tenant_id)
+    RETURNING u.college_id;
+$$ LANGUAGE sql;
+
+-- Bulk activation: find the auth account of an email, e.g. one created by an interrupted run but never linked.
+-- Reads auth.users, so only the service role may call it.
+CREATE OR REPLACE FUNCTION auth_user_by_email(p_email TEXT)
+RETURNS TABLE (id UUID, email VARCHAR) AS $$
+    SELECT u.id, u.email::VARCHAR FROM auth.users AS u WHERE lower(u.email) = lower(p_email);
+$$ LANGUAGE sql STABLE SECURITY DEFINER SET search_path = '';
+
+REVOKE EXECUTE ON FUNCTION auth_user_by_email(TEXT) FROM PUBLIC, anon, authenticated;
+
+-- Registration counts per hackathon and status for a page of hackathons (GET /hackathons/?with_counts=true)
+CREATE INDEX IF NOT EXISTS idx_hackathon_registrations_hackathon_status ON hackathon_registrations(hackathon_id, status);
+
+CREATE OR REPLACE FUNCTION registration_status_counts(hackathon_ids UUID[], p_tenant_id TEXT DEFAULT NULL)
+RETURNS TABLE (hackathon_id UUID, status TEXT, registrations BIGINT) AS $$
+    SELECT r.hackathon_id, r.status, COUNT(*)
+    FROM hackathon_registrations AS r
+    WHERE r.hackathon_id = ANY(hackathon_ids)
+      AND (p_tenant_id IS NULL OR r.tenant_id = p_tenant_id)
+    GROUP BY r.hackathon_id, r.status;
+$$ LANGUAGE sql STABLE;
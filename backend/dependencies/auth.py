@@ -1,13 +1,45 @@
-from fastapi import Depends, HTTPException, status
+import hmac
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from typing import List, Optional
 from models.user import UserRole
+from config.settings import settings
 from services.auth import AuthService
+from core.admission import tenant_limiter
+from core.context import current_request
+from core.tenancy import tenant_of
+from core.timing import span
+from core.tracing import start_span
 
 # Security scheme for Swagger UI
 security = HTTPBearer()
 
-def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
+# ASGI scope key carrying a principal resolved before routing: set by /batch for its
+# sub-requests and by the idempotency middleware
+PRINCIPAL_SCOPE_KEY = "auth.principal"
+
+def _remember_principal(user: dict) -> None:
+    """Record the caller (read-your-writes routing keys on it) and their tenant on the request context"""
+    context = current_request()
+    if context is not None:
+        context.principal = user.get("college_id")
+        if settings.MULTI_TENANT:
+            context.tenant = tenant_of(user)
+
+def _admit_tenant() -> None:
+    """Take the request's per-tenant admission slot; RequestContextMiddleware gives it back"""
+    context = current_request()
+    if context is None or context.tenant is None or context.tenant_admitted:
+        return
+    if not tenant_limiter.try_acquire(context.tenant):
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many concurrent requests for this college, retry shortly",
+            headers={"Retry-After": str(settings.ADMISSION_RETRY_AFTER_S)}
+        )
+    context.tenant_admitted = True
+
+def get_current_user(request: Request, credentials: HTTPAuthorizationCredentials = Depends(security)):
     """
     Dependency to get the current authenticated user
     Verifies JWT token and returns user data
@@ -19,21 +51,32 @@ def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(securit
             headers={"WWW-Authenticate": "Bearer"}
         )
     
+    # Reuse a principal already resolved for this request (batch sub-requests, idempotency);
+    # each batch sub-request still takes its own per-tenant slot
+    resolved_principal = request.scope.get(PRINCIPAL_SCOPE_KEY)
+    if resolved_principal is not None:
+        _remember_principal(resolved_principal)
+        _admit_tenant()
+        return resolved_principal
+    
     # Get the token from credentials
     token = credentials.credentials
     
-    # Verify JWT token
-    payload = AuthService.verify_jwt_token(token)
-    auth_user_id = payload.get("sub")
-    
-    if not auth_user_id:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid token payload"
-        )
-    
-    # Get user from database
-    user = AuthService.get_user_by_auth_id(auth_user_id)
+    with start_span("dependency.get_current_user"):
+        # Verify JWT token
+        with span("auth"):
+            payload = AuthService.verify_jwt_token(token)
+        auth_user_id = payload.get("sub")
+        
+        if not auth_user_id:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid token payload"
+            )
+        
+        # Get user from database
+        with span("principal"):
+            user = AuthService.get_user_by_auth_id(auth_user_id)
     
     if not user:
         raise HTTPException(
@@ -47,8 +90,25 @@ def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(securit
             detail="Account is deactivated"
         )
     
+    _remember_principal(user)
+    _admit_tenant()
     return user
 
+def department_scope(current_user: dict) -> Optional[str]:
+    """
+    Department an HOD or teacher is limited to (pushed into their queries);
+    None for roles that see every department
+    """
+    if current_user.get("role") not in (UserRole.HOD.value, UserRole.TEACHER.value):
+        return None
+    department = current_user.get("department")
+    if not department:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="No department assigned to this account"
+        )
+    return department
+
 def require_role(allowed_roles: List[UserRole]):
     """
     Dependency factory to check if user has required role
@@ -113,6 +173,13 @@ def require_student(current_user: dict = Depends(get_current_user)):
         )
     return current_user
 
+def require_metrics_access(request: Request, credentials: HTTPAuthorizationCredentials = Depends(security)):
+    """Prometheus scrapes with METRICS_SCRAPE_TOKEN as the bearer token; admins may use their own token"""
+    scrape_token = settings.METRICS_SCRAPE_TOKEN
+    if scrape_token and hmac.compare_digest(credentials.credentials.encode(), scrape_token.encode()):
+        return None
+    return require_admin(get_current_user(request, credentials))
+
 def require_admin_or_principal(current_user: dict = Depends(get_current_user)):
     """Dependency to require admin or principal role"""
     if current_user.get("role") not in [UserRole.ADMIN.value, UserRole.PRINCIPAL.value]:
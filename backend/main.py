@@ -1,8 +1,22 @@
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI, HTTPException, Response
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import HTTPBearer
-from routes import admin, auth, hackathon
+from routes import admin, auth, batch, hackathon
 from config.settings import settings
+from config.repositories import repos
+from core.idempotency import start_sweeper as start_idempotency_sweeper
+from core.invalidation import bus as invalidation_bus
+from core.jobs import runner as job_runner
+from core.resilience import breakers
+from services.provisioning import start_password_expiry
+from core.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, REGISTRY
+from dependencies.auth import require_metrics_access
+from middleware.admission import AdmissionMiddleware
+from middleware.idempotency import IdempotencyMiddleware
+from middleware.metrics import MetricsMiddleware
+from middleware.profiling import ProfilingMiddleware
+from middleware.request_context import RequestContextMiddleware
 
 # Configure HTTPBearer security for Swagger UI
 security = HTTPBearer()
@@ -18,6 +32,13 @@ app = FastAPI(
 )
 
 
+if settings.IDEMPOTENCY_ENABLED:
+    app.add_middleware(IdempotencyMiddleware)
+
+# Inside CORS, so shed requests still get CORS headers, timing and metrics
+if settings.ADMISSION_ENABLED:
+    app.add_middleware(AdmissionMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.ALLOWED_ORIGINS,  
@@ -26,10 +47,41 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if settings.PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware)
+
+app.add_middleware(RequestContextMiddleware)
+
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
 
 app.include_router(auth.router)
 app.include_router(admin.router)
 app.include_router(hackathon.router)
+app.include_router(batch.router)
+
+@app.on_event("startup")
+def start_invalidation_bus():
+    """Subscribe this worker to cache invalidations from the others"""
+    invalidation_bus.start()
+
+@app.on_event("startup")
+def recover_jobs():
+    """Resume jobs queued before a restart and fail those whose worker died"""
+    if repos.configured:
+        job_runner.recover()
+
+@app.on_event("startup")
+def expire_one_time_passwords():
+    """Blank one-time passwords left in bulk activation outcomes past BULK_PASSWORD_TTL_S"""
+    start_password_expiry()
+
+@app.on_event("startup")
+def sweep_idempotency_keys():
+    """Delete expired idempotency_keys rows when the table store is in use"""
+    if repos.configured:
+        start_idempotency_sweeper()
 
 @app.get("/")
 def root():
@@ -41,4 +93,30 @@ def root():
 
 @app.get("/health")
 def health_check():
-    return {"status": "healthy"}
\ No newline at end of file
+    """Liveness: never touches upstream, so it stays fast while Supabase is down"""
+    return {"status": "healthy"}
+
+@app.get("/health/ready")
+def readiness_check():
+    """
+    Readiness: circuit breaker states plus one cheap indexed lookup against the
+    backend. Returns 503 while any circuit is open or the probe fails.
+    """
+    circuits = {name: breaker.snapshot() for name, breaker in breakers.items()}
+    upstream = {"backend": repos.backend, "status": "ok"}
+    try:
+        repos.users.get_by_college_id("__readiness_probe__")
+    except HTTPException as exc:
+        upstream.update(status="unavailable", detail=exc.detail)
+    except Exception as exc:
+        upstream.update(status="error", detail=str(exc))
+    ready = upstream["status"] == "ok" and all(c["state"] != "open" for c in circuits.values())
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={"status": "ready" if ready else "unavailable", "upstream": upstream, "circuits": circuits},
+    )
+
+@app.get("/metrics", include_in_schema=False, dependencies=[Depends(require_metrics_access)])
+def metrics():
+    """Prometheus metrics for this worker (METRICS_SCRAPE_TOKEN or an admin token)"""
+    return Response(content=REGISTRY.render(), media_type=METRICS_CONTENT_TYPE)
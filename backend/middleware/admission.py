@@ -0,0 +1,47 @@
+from config.settings import settings
+from core.admission import AdmissionRejected, admission_class, controller
+from core.context import route_template
+from core.serialization import dumps
+
+
+class AdmissionMiddleware:
+    """
+    Pure ASGI middleware that admits each HTTP request into its route class
+    (see core/admission.py) and sheds it with 503 + Retry-After when the class
+    is saturated. /batch sub-requests come through here too and are admitted
+    by their own route; the batch envelope itself is not.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        route = route_template(scope["app"], scope) if "app" in scope else "unmatched"
+        name = admission_class(scope["method"], route)
+        if name is None:
+            await self.app(scope, receive, send)
+            return
+        admission = controller()
+        try:
+            await admission.acquire(name)
+        except AdmissionRejected as exc:
+            body = dumps({"detail": f"Server busy: {exc}, retry shortly"})
+            await send({
+                "type": "http.response.start",
+                "status": 503,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"retry-after", str(settings.ADMISSION_RETRY_AFTER_S).encode()),
+                ],
+            })
+            await send({"type": "http.response.body", "body": body})
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            admission.release(name)
@@ -0,0 +1,164 @@
+import asyncio
+import time
+from typing import Dict
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+from config.settings import settings
+from core.context import route_template
+from core.idempotency import (
+    COMPLETED,
+    IDEMPOTENCY_REQUESTS,
+    IDEMPOTENT_ROUTES,
+    IN_PROGRESS,
+    decode_response,
+    encode_response,
+    fingerprint,
+    store,
+)
+from core.serialization import dumps
+from dependencies.auth import PRINCIPAL_SCOPE_KEY, get_current_user
+
+IDEMPOTENCY_HEADER = b"idempotency-key"
+MAX_KEY_LENGTH = 255
+POLL_INTERVAL_S = 0.05
+
+
+def _resolve_principal(scope) -> Dict:
+    """Same checks as Depends(get_current_user); raises HTTPException otherwise"""
+    header = dict(scope["headers"]).get(b"authorization", b"").decode()
+    scheme, _, token = header.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    credentials = HTTPAuthorizationCredentials(scheme=scheme, credentials=token)
+    return get_current_user(Request(scope), credentials)
+
+
+async def _send_response(send, status_code: int, headers, body: bytes) -> None:
+    headers = list(headers) + [(b"content-length", str(len(body)).encode())]
+    await send({"type": "http.response.start", "status": status_code, "headers": headers})
+    await send({"type": "http.response.body", "body": body})
+
+
+async def _send_error(send, status_code: int, detail: str) -> None:
+    await _send_response(send, status_code, [(b"content-type", b"application/json")], dumps({"detail": detail}))
+
+
+class IdempotencyMiddleware:
+    """
+    Pure ASGI middleware implementing Idempotency-Key for the routes in
+    core.idempotency.IDEMPOTENT_ROUTES
+
+    The first response per (principal, key) is stored and replayed to retries
+    with `Idempotent-Replayed: true`; a concurrent duplicate waits for the first
+    request instead of running alongside it. Requests without the header, or
+    whose token does not resolve, pass straight through.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        # store key -> set when the request holding it in this worker finishes
+        self._in_flight: Dict[str, asyncio.Event] = {}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST":
+            await self.app(scope, receive, send)
+            return
+        idempotency_key = dict(scope["headers"]).get(IDEMPOTENCY_HEADER)
+        route = route_template(scope["app"], scope) if "app" in scope else "unmatched"
+        if idempotency_key is None or f"{scope['method']} {route}" not in IDEMPOTENT_ROUTES:
+            await self.app(scope, receive, send)
+            return
+        if not idempotency_key or len(idempotency_key) > MAX_KEY_LENGTH:
+            await _send_error(send, 400, f"Idempotency-Key must be 1-{MAX_KEY_LENGTH} characters")
+            return
+
+        principal = scope.get(PRINCIPAL_SCOPE_KEY)
+        if principal is None:
+            try:
+                principal = await run_in_threadpool(_resolve_principal, scope)
+            except HTTPException:
+                # Let the route's own dependency produce the auth error
+                await self.app(scope, receive, send)
+                return
+            scope = {**scope, PRINCIPAL_SCOPE_KEY: principal}
+
+        # Buffer the body: it is part of the fingerprint and must be replayed to the app
+        chunks = []
+        while True:
+            message = await receive()
+            if message["type"] != "http.request":
+                return
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                break
+        body = b"".join(chunks)
+
+        key = f"{principal.get('college_id')}:{idempotency_key.decode('latin-1')}"
+        record = {"key": key, "fingerprint": fingerprint(scope["method"], scope["path"], body), "state": IN_PROGRESS}
+        backend = store()
+        deadline = time.monotonic() + settings.IDEMPOTENCY_WAIT_S
+        while True:
+            existing = await backend.claim(record)
+            if existing is None:
+                break
+            if existing["fingerprint"] != record["fingerprint"]:
+                IDEMPOTENCY_REQUESTS.labels(route, "mismatch").inc()
+                await _send_error(send, 422, "Idempotency-Key was already used for a different request")
+                return
+            if existing["state"] == COMPLETED:
+                IDEMPOTENCY_REQUESTS.labels(route, "replayed").inc()
+                status_code, headers, stored_body = decode_response(existing)
+                await _send_response(send, status_code, headers + [(b"idempotent-replayed", b"true")], stored_body)
+                return
+            # The first request with this key is still running: wait for it, then look again
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                IDEMPOTENCY_REQUESTS.labels(route, "conflict").inc()
+                await _send_error(send, 409, "A request with this Idempotency-Key is still being processed")
+                return
+            event = self._in_flight.get(key)
+            if event is not None:
+                try:
+                    await asyncio.wait_for(event.wait(), timeout=remaining)
+                except asyncio.TimeoutError:
+                    pass
+            else:
+                await asyncio.sleep(min(POLL_INTERVAL_S, remaining))
+
+        event = self._in_flight[key] = asyncio.Event()
+        response = {"status": 500, "headers": [], "chunks": []}
+
+        async def replay_receive():
+            nonlocal body
+            if body is not None:
+                message, body = {"type": "http.request", "body": body, "more_body": False}, None
+                return message
+            return await receive()
+
+        async def capture_send(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+                response["headers"] = list(message.get("headers", []))
+            elif message["type"] == "http.response.body":
+                response["chunks"].append(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, replay_receive, capture_send)
+        finally:
+            try:
+                if response["status"] < 500:
+                    await backend.complete(key, {
+                        "state": COMPLETED,
+                        **encode_response(response["status"], response["headers"], b"".join(response["chunks"])),
+                    })
+                    IDEMPOTENCY_REQUESTS.labels(route, "stored").inc()
+                else:
+                    # Let the client's retry run the request again
+                    await backend.release(key)
+                    IDEMPOTENCY_REQUESTS.labels(route, "not_stored").inc()
+            finally:
+                del self._in_flight[key]
+                event.set()
@@ -0,0 +1,104 @@
+import time
+from urllib.parse import parse_qs
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+from config.settings import settings
+from core.context import current_request
+from core.profiling import StackSampler
+from dependencies.auth import get_current_user, require_admin
+
+PROFILE_HEADER = b"x-profile"
+PROFILE_QUERY_PARAM = "__profile"
+TRUE_VALUES = {"1", "true", "yes", "on"}
+
+
+def _wants_profile(scope) -> bool:
+    """The query parameter, else the header, holds a true value ("X-Profile: 0" or "false" does not profile)"""
+    if PROFILE_QUERY_PARAM.encode() in scope.get("query_string", b""):
+        values = parse_qs(scope["query_string"].decode()).get(PROFILE_QUERY_PARAM)
+        if values:
+            return values[-1].strip().lower() in TRUE_VALUES
+    for name, value in scope["headers"]:
+        if name == PROFILE_HEADER:
+            return value.decode("latin-1").strip().lower() in TRUE_VALUES
+    return False
+
+
+def _authorize_admin(scope) -> None:
+    """Same checks as Depends(require_admin); raises HTTPException otherwise"""
+    header = dict(scope["headers"]).get(b"authorization", b"").decode()
+    scheme, _, token = header.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    credentials = HTTPAuthorizationCredentials(scheme=scheme, credentials=token)
+    require_admin(get_current_user(Request(scope), credentials))
+
+
+class ProfilingMiddleware:
+    """
+    Profile one request on demand for admins
+
+    Send `X-Profile: 1` (or `?__profile=1`) with an admin token. The request runs
+    normally under a sampling profiler and the response is replaced by the
+    collapsed-stack profile as a download; the real status code is reported in
+    `X-Profiled-Status`. Requests without the flag, or whose caller is not an
+    admin, pass straight through.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not _wants_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            await run_in_threadpool(_authorize_admin, scope)
+        except HTTPException:
+            # Not for us to answer: the flag is ignored and the route does its own auth
+            await self.app(scope, receive, send)
+            return
+
+        sampler = StackSampler(settings.PROFILE_SAMPLE_INTERVAL_MS / 1000)
+        context = current_request()
+        if context is not None:
+            context.profiler = sampler
+        status_code = 500
+
+        async def discard(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+
+        started = time.perf_counter()
+        sampler.start()
+        # The event loop thread: routing, async handlers and response rendering
+        sampler.enter()
+        try:
+            await self.app(scope, receive, discard)
+        finally:
+            sampler.exit()
+            # Joins the sampler thread, which can take up to one sample interval
+            await run_in_threadpool(sampler.stop)
+            if context is not None:
+                context.profiler = None
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        route = context.route if context is not None else scope["path"]
+        filename = f"profile-{scope['method'].lower()}-{route.strip('/').replace('/', '_') or 'root'}-{int(time.time())}.collapsed"
+        body = sampler.collapsed().encode()
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [
+                (b"content-type", b"text/plain; charset=utf-8"),
+                (b"content-disposition", f'attachment; filename="{filename}"'.encode()),
+                (b"x-profiled-status", str(status_code).encode()),
+                (b"x-profile-duration-ms", f"{elapsed_ms:.1f}".encode()),
+                (b"x-profile-samples", str(sum(sampler.samples.values())).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
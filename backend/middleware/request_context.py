@@ -0,0 +1,78 @@
+import json
+import logging
+from config.settings import settings
+from core.admission import tenant_limiter
+from core.budget import budget_for, report as report_budget
+from core.context import begin_request, end_request, route_template
+from core.timing import server_timing_header
+from core.tracing import start_span
+
+logger = logging.getLogger("hackathon.timing")
+
+
+class RequestContextMiddleware:
+    """
+    Pure ASGI middleware that opens a RequestContext for every HTTP request
+
+    Adds a Server-Timing header with per-phase durations (auth, principal, db,
+    serialize) and the number of upstream round trips, optionally logs the same
+    breakdown as one JSON line per request, and checks the route's round-trip budget.
+    When tracing is enabled it also opens the request's root span, continuing an
+    incoming W3C traceparent and returning the request's own in the response.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        route = route_template(scope["app"], scope) if "app" in scope else "unmatched"
+        context, token = begin_request(scope["method"], route)
+        context.budget = budget_for(context.method, route)
+        status_code = 500
+        root = None
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = list(message.get("headers", []))
+                if settings.SERVER_TIMING_ENABLED:
+                    headers.append((b"server-timing", server_timing_header(context).encode()))
+                    if "*" in settings.ALLOWED_ORIGINS:
+                        # Lets cross-origin frontends read the breakdown in devtools
+                        headers.append((b"timing-allow-origin", b"*"))
+                if root is not None:
+                    root.set_attribute("http.status_code", status_code)
+                    headers.append((b"traceparent", root.traceparent().encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        incoming = None
+        for name, value in scope.get("headers", []):
+            if name == b"traceparent":
+                incoming = value.decode("latin-1")
+                break
+        attributes = {"http.method": context.method, "http.route": route, "http.target": scope.get("path", "")}
+        try:
+            with start_span(f"{context.method} {route}", kind="SERVER", attributes=attributes, traceparent=incoming) as root:
+                await self.app(scope, receive, send_wrapper)
+                if root is not None and status_code >= 500:
+                    root.status = "ERROR"
+        finally:
+            end_request(token)
+            if context.tenant_admitted:
+                tenant_limiter.release(context.tenant)
+            report_budget(context)
+            if settings.SERVER_TIMING_LOG:
+                logger.info(json.dumps({
+                    "method": context.method,
+                    "route": context.route,
+                    "status": status_code,
+                    "total_ms": round(context.elapsed() * 1000, 2),
+                    "round_trips": context.round_trips,
+                    "phases": {name: {"ms": round(s * 1000, 2), "calls": int(c)} for name, (s, c) in context.phases.items()},
+                }))
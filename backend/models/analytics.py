@@ -0,0 +1,52 @@
+from pydantic import BaseModel
+from typing import List, Optional
+from datetime import datetime
+
+
+class DepartmentParticipation(BaseModel):
+    department: Optional[str]
+    total_students: int
+    # One entry per period, aligned with ParticipationResponse.periods
+    participants: List[int]
+    rates: List[float]
+
+
+class ParticipationResponse(BaseModel):
+    periods: List[str]
+    departments: List[DepartmentParticipation]
+    refreshed_at: Optional[datetime] = None
+
+
+class DepartmentRepeatParticipation(BaseModel):
+    department: Optional[str]
+    participants: int
+    repeat_participants: int
+    ratio: float
+
+
+class RepeatParticipantsResponse(BaseModel):
+    participants: int
+    repeat_participants: int
+    ratio: float
+    per_department: List[DepartmentRepeatParticipation]
+    refreshed_at: Optional[datetime] = None
+
+
+class ReviewerStats(BaseModel):
+    reviewer: str
+    reviewed: int
+    acknowledged: int
+    rejected: int
+    acknowledgement_rate: float
+
+
+class ReviewersResponse(BaseModel):
+    reviewers: List[ReviewerStats]
+    refreshed_at: Optional[datetime] = None
+
+
+class AnalyticsRefreshResponse(BaseModel):
+    registrations: int
+    students: int
+    hackathons: int
+    refreshed_at: Optional[datetime] = None
@@ -0,0 +1,24 @@
+from pydantic import BaseModel, Field
+from typing import Any, Dict, List, Optional
+
+
+class BatchSubRequest(BaseModel):
+    id: Optional[str] = None
+    method: str = "GET"
+    path: str
+    body: Optional[Any] = None
+
+
+class BatchRequest(BaseModel):
+    requests: List[BatchSubRequest] = Field(..., min_length=1)
+
+
+class BatchSubResponse(BaseModel):
+    id: Optional[str] = None
+    status: int
+    headers: Dict[str, str] = {}
+    body: Optional[Any] = None
+
+
+class BatchResponse(BaseModel):
+    responses: List[BatchSubResponse]
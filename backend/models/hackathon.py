@@ -23,6 +23,13 @@ class HackathonAISuggest(BaseModel):
     suggested_by_model: Optional[str] = None
 
 
+class RegistrationCounts(BaseModel):
+    total: int = 0
+    applied: int = 0
+    acknowledged: int = 0
+    rejected: int = 0
+
+
 class HackathonResponse(BaseModel):
     id: str
     title: str
@@ -38,6 +45,10 @@ class HackathonResponse(BaseModel):
     created_by_college_id: Optional[str] = None
     created_at: datetime
     updated_at: Optional[datetime] = None
+    # Only with GET /hackathons/?with_counts=true
+    registration_counts: Optional[RegistrationCounts] = None
+    # Served from cold storage (GET /hackathons/{hackathon_id} only)
+    archived: bool = False
 
 
 class HackathonRegistrationCreate(BaseModel):
@@ -70,3 +81,17 @@ class HackathonStatsResponse(BaseModel):
     total_registered: int
     per_department: List[HackathonDepartmentStats]
     last_updated: datetime
+
+
+class SyncTombstone(BaseModel):
+    entity: str
+    entity_id: str
+    deleted_at: datetime
+
+
+class HackathonChangesResponse(BaseModel):
+    hackathons: List[HackathonResponse]
+    registrations: List[HackathonRegistrationResponse]
+    deleted: List[SyncTombstone]
+    cursor: str
+    has_more: bool
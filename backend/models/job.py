@@ -0,0 +1,25 @@
+from pydantic import BaseModel
+from typing import Any, Dict, Optional
+from datetime import datetime
+
+
+class JobCreate(BaseModel):
+    kind: str
+    params: Dict[str, Any] = {}
+
+
+class JobResponse(BaseModel):
+    id: str
+    kind: str
+    status: str
+    progress: int = 0
+    total: Optional[int] = None
+    message: Optional[str] = None
+    result: Optional[Any] = None
+    result_location: Optional[str] = None
+    error: Optional[str] = None
+    created_by: Optional[str] = None
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 from enum import Enum
 
@@ -32,6 +32,12 @@ class ActivateAccountRequest(BaseModel):
     email: EmailStr
     password: str
 
+class BulkActivateRequest(BaseModel):
+    college_ids: Optional[List[str]] = None
+    role: Optional[UserRole] = None
+    department: Optional[str] = None
+    resume_job_id: Optional[str] = None
+
 class LoginRequest(BaseModel):
     email: EmailStr
     password: str
@@ -0,0 +1,211 @@
+"""
+Repository interfaces for the tables and auth operations the services use
+
+Services depend only on these interfaces. `config.repositories` picks the
+implementation (Supabase or in-memory) from `Settings.REPOSITORY_BACKEND`.
+Rows are plain dicts shaped like the PostgREST JSON for the table.
+"""
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Sequence
+
+# Keyset position used by delta sync: [updated_at, id]
+Position = Optional[Sequence[str]]
+# Sorts before every row id at the same updated_at
+MIN_ID = "00000000-0000-0000-0000-000000000000"
+
+
+def is_unique_violation(exc: BaseException) -> bool:
+    """A unique constraint rejected an insert (PostgREST code 23505, or the memory backend's IntegrityError)"""
+    return "23505" in str(exc) or "duplicate key" in str(exc)
+
+
+def next_position(position: Position, rows: List[Dict], limit: int, settle_s: float) -> Position:
+    """
+    Where to continue a change feed after reading `rows` from `position`.
+
+    updated_at is the writing transaction's start time (NOW()), so a
+    transaction that commits after a later one surfaces rows below positions
+    already handed out. The position therefore stops at now - settle_s: rows
+    newer than that are read again next time (readers apply rows by id, so
+    repeats are harmless) together with any late commits among them. A full
+    page always advances to its last row, so bursts cannot stall paging.
+    """
+    if not rows:
+        return position
+    last = [rows[-1]["updated_at"], rows[-1]["id"]]
+    settled = datetime.now(timezone.utc) - timedelta(seconds=settle_s)
+    if datetime.fromisoformat(last[0]) <= settled or len(rows) >= limit:
+        return last
+    if not position or datetime.fromisoformat(position[0]) < settled:
+        return [settled.isoformat(), MIN_ID]
+    return position
+
+
+class ChangeFeed(ABC):
+    """Tables that can be paged by (updated_at, id) for delta sync"""
+
+    @abstractmethod
+    def changed_since(self, position: Position, limit: int, filters: Dict) -> List[Dict]:
+        """Rows strictly after position, ordered by (updated_at, id), matching equality filters;
+        continue from next_position, not from the last row"""
+
+
+class UserRepository(ABC):
+    """college_users"""
+
+    @abstractmethod
+    def get_by_auth_id(self, auth_user_id: str) -> Optional[Dict]: ...
+
+    @abstractmethod
+    def get_by_college_id(self, college_id: str) -> Optional[Dict]: ...
+
+    @abstractmethod
+    def get_by_email(self, email: str) -> Optional[Dict]: ...
+
+    @abstractmethod
+    def insert(self, record: Dict) -> Dict: ...
+
+    @abstractmethod
+    def update(self, college_id: str, values: Dict) -> Optional[Dict]:
+        """Update one user; returns the updated row or None when it does not exist"""
+
+    @abstractmethod
+    def list(self, role: Optional[str] = None, department: Optional[str] = None, columns: str = "*") -> List[Dict]: ...
+
+    @abstractmethod
+    def list_by_college_ids(self, college_ids: Iterable[str], columns: str = "*") -> List[Dict]: ...
+
+    @abstractmethod
+    def link_auth_ids(self, links: Dict[str, str]) -> List[str]:
+        """Set auth_user_id for many users at once (college_id -> auth id) where still unset; returns the linked college_ids"""
+
+
+class HackathonRepository(ChangeFeed):
+    """hackathons"""
+
+    @abstractmethod
+    def insert(self, record: Dict) -> Dict: ...
+
+    @abstractmethod
+    def get(self, hackathon_id: str, columns: str = "*") -> Optional[Dict]: ...
+
+    @abstractmethod
+    def find_by_link_or_title(self, link: Optional[str], title: Optional[str]) -> Optional[Dict]: ...
+
+    @abstractmethod
+    def list(self, approval_status: str, active_only: bool = False) -> List[Dict]:
+        """Hackathons with the given approval status, ordered by deadline asc then created_at desc"""
+
+    @abstractmethod
+    def list_ended(self, before: str, limit: int, after: Position = None) -> List[Dict]:
+        """Hackathons whose deadline is before `before` (ISO timestamp), by (deadline, id), strictly after `after`"""
+
+    @abstractmethod
+    def update(self, hackathon_id: str, values: Dict) -> Optional[Dict]: ...
+
+    @abstractmethod
+    def delete(self, hackathon_id: str) -> Optional[Dict]:
+        """Delete a hackathon and cascade to its registrations; returns the deleted row"""
+
+
+class RegistrationRepository(ChangeFeed):
+    """hackathon_registrations"""
+
+    @abstractmethod
+    def insert(self, record: Dict) -> Dict: ...
+
+    @abstractmethod
+    def find(self, hackathon_id: str, student_college_id: str) -> Optional[Dict]: ...
+
+    @abstractmethod
+    def list_by_hackathon(self, hackathon_id: str, columns: str = "*", department: Optional[str] = None) -> List[Dict]:
+        """Registrations of a hackathon, optionally only those of students in `department` (joined through college_users)"""
+
+    @abstractmethod
+    def list_by_hackathons(
+        self, hackathon_ids: Iterable[str], columns: str = "*",
+        after: Optional[str] = None, limit: Optional[int] = None, updated_after: Optional[str] = None,
+    ) -> List[Dict]:
+        """Registrations of many hackathons in one query, by id: those with id > `after`, at most
+        `limit`, and only those changed after `updated_after` (ISO timestamp) when given"""
+
+    @abstractmethod
+    def get_status_counts(self, hackathon_ids: Iterable[str]) -> Dict[str, Dict[str, int]]:
+        """hackathon_id -> {status: registrations} for many hackathons in one grouped query; hackathons without any are absent"""
+
+    @abstractmethod
+    def update(self, registration_id: str, values: Dict) -> Optional[Dict]: ...
+
+
+class TombstoneRepository(ChangeFeed):
+    """sync_tombstones (written by delete triggers, read by delta sync)"""
+
+
+class JobRepository(ABC):
+    """jobs (background job queue, see core/jobs.py)"""
+
+    @abstractmethod
+    def insert(self, record: Dict) -> Dict: ...
+
+    @abstractmethod
+    def get(self, job_id: str) -> Optional[Dict]: ...
+
+    @abstractmethod
+    def update(self, job_id: str, values: Dict) -> Optional[Dict]: ...
+
+    @abstractmethod
+    def claim(self, job_id: str, values: Dict) -> Optional[Dict]:
+        """Update a job only while it is still queued; returns the row, or None if another worker took it"""
+
+    @abstractmethod
+    def list_by_status(self, status: str, limit: int = 100, after: Position = None) -> List[Dict]:
+        """Oldest first, by (created_at, id), strictly after `after`"""
+
+
+class IdempotencyRepository(ABC):
+    """idempotency_keys (responses stored for Idempotency-Key retries, see core/idempotency.py)"""
+
+    @abstractmethod
+    def claim(self, record: Dict) -> Optional[Dict]:
+        """Insert an in-progress record; returns None if inserted, else the existing record for the key"""
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[Dict]: ...
+
+    @abstractmethod
+    def complete(self, key: str, values: Dict) -> None: ...
+
+    @abstractmethod
+    def release(self, key: str) -> None:
+        """Delete the record so the key can be claimed again"""
+
+    @abstractmethod
+    def delete_expired(self) -> None:
+        """Delete records past their expires_at"""
+
+
+class AuthGateway(ABC):
+    """Supabase Auth operations"""
+
+    @abstractmethod
+    def get_user(self, token: str) -> Optional[Dict]:
+        """Resolve an access token to {"id", "email", "role"} or None"""
+
+    @abstractmethod
+    def sign_in(self, email: str, password: str) -> Optional[Dict]:
+        """Returns {"user": {"id", "email"}, "access_token"} or None for bad credentials"""
+
+    @abstractmethod
+    def create_user(self, email: str, password: str) -> Optional[Dict]:
+        """Create a confirmed auth user; returns {"id", "email"}"""
+
+    @abstractmethod
+    def update_password(self, auth_user_id: str, password: str) -> None: ...
+
+    @abstractmethod
+    def find_user_by_email(self, email: str) -> Optional[Dict]:
+        """The auth user registered with `email` as {"id", "email"}, or None (service role only)"""
+
+    @abstractmethod
+    def delete_user(self, auth_user_id: str) -> None: ...
@@ -0,0 +1,500 @@
+"""
+Indexed in-memory implementation of the repositories
+
+Mirrors the Supabase semantics the services rely on: unique constraints,
+id/created_at/updated_at defaults, the updated_at trigger, ON DELETE CASCADE
+from hackathons to registrations, tombstone triggers and PostgREST ordering
+(NULLs last for ascending sorts). Lookups use dict and secondary indexes so
+load tests and benchmarks measure service logic, not linear scans. Tenant
+scoping (core/tenancy.py) filters rows by their tenant_id.
+"""
+import secrets
+import threading
+import uuid
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Set
+from core.tenancy import DEFAULT_TENANT, current_tenant
+from repositories.base import (
+    AuthGateway,
+    HackathonRepository,
+    IdempotencyRepository,
+    JobRepository,
+    Position,
+    RegistrationRepository,
+    TombstoneRepository,
+    UserRepository,
+)
+
+
+class IntegrityError(Exception):
+    """Raised on unique constraint violations, like the PostgREST 409 error"""
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _visible(row: Dict, tenant: Optional[str]) -> bool:
+    return tenant is None or row.get("tenant_id") == tenant
+
+
+def _project(row: Dict, columns: str) -> Dict:
+    if columns.strip() == "*":
+        return dict(row)
+    return {name: row.get(name) for name in (c.strip() for c in columns.split(","))}
+
+
+class MemoryTable:
+    """Primary-key dict plus helpers shared by every in-memory table"""
+
+    def __init__(self, lock: threading.RLock):
+        self._lock = lock
+        self._rows: Dict[str, Dict] = {}
+
+    def _stamp_insert(self, record: Dict) -> Dict:
+        row = dict(record)
+        row.setdefault("id", str(uuid.uuid4()))
+        now = _now()
+        row["created_at"] = row.get("created_at") or now
+        row["updated_at"] = now
+        row["tenant_id"] = current_tenant() or row.get("tenant_id") or DEFAULT_TENANT
+        return row
+
+    def changed_since(self, position: Position, limit: int, filters: Dict) -> List[Dict]:
+        tenant = current_tenant()
+        with self._lock:
+            rows = [
+                row for row in self._rows.values()
+                if _visible(row, tenant)
+                and all(row.get(column) == value for column, value in filters.items())
+                and (not position or (row["updated_at"], row["id"]) > tuple(position))
+            ]
+            rows.sort(key=lambda row: (row["updated_at"], row["id"]))
+            return [dict(row) for row in rows[:limit]]
+
+
+class MemoryUserRepository(MemoryTable, UserRepository):
+    def __init__(self, lock: threading.RLock):
+        super().__init__(lock)
+        # _rows is keyed by college_id
+        self._by_auth_id: Dict[str, str] = {}
+        self._by_email: Dict[str, str] = {}
+        self._by_role: Dict[str, Set[str]] = defaultdict(set)
+        self._by_department: Dict[Optional[str], Set[str]] = defaultdict(set)
+
+    def _index(self, row: Dict) -> None:
+        if row.get("auth_user_id"):
+            self._by_auth_id[row["auth_user_id"]] = row["college_id"]
+        self._by_email[row["email"]] = row["college_id"]
+        self._by_role[row.get("role")].add(row["college_id"])
+        self._by_department[row.get("department")].add(row["college_id"])
+
+    def _unindex(self, row: Dict) -> None:
+        if row.get("auth_user_id"):
+            self._by_auth_id.pop(row["auth_user_id"], None)
+        self._by_email.pop(row["email"], None)
+        self._by_role[row.get("role")].discard(row["college_id"])
+        self._by_department[row.get("department")].discard(row["college_id"])
+
+    def _check_unique(self, row: Dict) -> None:
+        college_id = row["college_id"]
+        if self._by_email.get(row["email"], college_id) != college_id:
+            raise IntegrityError(f"duplicate key value violates unique constraint: email={row['email']}")
+        auth_user_id = row.get("auth_user_id")
+        if auth_user_id and self._by_auth_id.get(auth_user_id, college_id) != college_id:
+            raise IntegrityError(f"duplicate key value violates unique constraint: auth_user_id={auth_user_id}")
+
+    def _get(self, college_id: Optional[str]) -> Optional[Dict]:
+        row = self._rows.get(college_id) if college_id else None
+        return dict(row) if row and _visible(row, current_tenant()) else None
+
+    def get_by_auth_id(self, auth_user_id: str) -> Optional[Dict]:
+        with self._lock:
+            return self._get(self._by_auth_id.get(auth_user_id))
+
+    def get_by_college_id(self, college_id: str) -> Optional[Dict]:
+        with self._lock:
+            return self._get(college_id)
+
+    def get_by_email(self, email: str) -> Optional[Dict]:
+        with self._lock:
+            return self._get(self._by_email.get(email))
+
+    def insert(self, record: Dict) -> Dict:
+        with self._lock:
+            row = self._stamp_insert(record)
+            row.setdefault("is_active", True)
+            row.setdefault("auth_user_id", None)
+            row.setdefault("department", None)
+            if row["college_id"] in self._rows:
+                raise IntegrityError(f"duplicate key value violates unique constraint: college_id={row['college_id']}")
+            self._check_unique(row)
+            self._rows[row["college_id"]] = row
+            self._index(row)
+            return dict(row)
+
+    def update(self, college_id: str, values: Dict) -> Optional[Dict]:
+        with self._lock:
+            current = self._rows.get(college_id)
+            if not current or not _visible(current, current_tenant()):
+                return None
+            row = {**current, **values, "updated_at": _now()}
+            self._check_unique(row)
+            self._unindex(current)
+            self._rows[college_id] = row
+            self._index(row)
+            return dict(row)
+
+    def list(self, role: Optional[str] = None, department: Optional[str] = None, columns: str = "*") -> List[Dict]:
+        tenant = current_tenant()
+        with self._lock:
+            if role and department:
+                keys = self._by_role.get(role, set()) & self._by_department.get(department, set())
+            elif role:
+                keys = self._by_role.get(role, set())
+            elif department:
+                keys = self._by_department.get(department, set())
+            else:
+                keys = self._rows.keys()
+            return [_project(self._rows[key], columns) for key in keys if _visible(self._rows[key], tenant)]
+
+    def list_by_college_ids(self, college_ids: Iterable[str], columns: str = "*") -> List[Dict]:
+        tenant = current_tenant()
+        with self._lock:
+            return [
+                _project(self._rows[cid], columns)
+                for cid in set(college_ids)
+                if cid in self._rows and _visible(self._rows[cid], tenant)
+            ]
+
+    def link_auth_ids(self, links: Dict[str, str]) -> List[str]:
+        tenant = current_tenant()
+        linked = []
+        with self._lock:
+            for college_id, auth_user_id in links.items():
+                current = self._rows.get(college_id)
+                if current and not current.get("auth_user_id") and _visible(current, tenant):
+                    self.update(college_id, {"auth_user_id": auth_user_id})
+                    linked.append(college_id)
+        return linked
+
+
+class MemoryHackathonRepository(MemoryTable, HackathonRepository):
+    def __init__(self, lock: threading.RLock, registrations: "MemoryRegistrationRepository", tombstones: "MemoryTombstoneRepository"):
+        super().__init__(lock)
+        self._registrations = registrations
+        self._tombstones = tombstones
+        self._by_status: Dict[str, Set[str]] = defaultdict(set)
+        self._by_link: Dict[str, Set[str]] = defaultdict(set)
+        self._by_title: Dict[str, Set[str]] = defaultdict(set)
+
+    def _index(self, row: Dict) -> None:
+        self._by_status[row.get("approval_status")].add(row["id"])
+        self._by_link[row.get("link")].add(row["id"])
+        self._by_title[row.get("title")].add(row["id"])
+
+    def _unindex(self, row: Dict) -> None:
+        self._by_status[row.get("approval_status")].discard(row["id"])
+        self._by_link[row.get("link")].discard(row["id"])
+        self._by_title[row.get("title")].discard(row["id"])
+
+    def insert(self, record: Dict) -> Dict:
+        with self._lock:
+            row = self._stamp_insert(record)
+            row.setdefault("is_active", True)
+            row.setdefault("source", "manual")
+            row.setdefault("approval_status", "approved")
+            for column in ("description", "domain", "deadline", "approved_by", "suggested_by_model", "created_by_college_id"):
+                row.setdefault(column, None)
+            self._rows[row["id"]] = row
+            self._index(row)
+            return dict(row)
+
+    def get(self, hackathon_id: str, columns: str = "*") -> Optional[Dict]:
+        with self._lock:
+            row = self._rows.get(hackathon_id)
+            return _project(row, columns) if row and _visible(row, current_tenant()) else None
+
+    def find_by_link_or_title(self, link: Optional[str], title: Optional[str]) -> Optional[Dict]:
+        with self._lock:
+            tenant = current_tenant()
+            ids = {i for i in self._by_link.get(link, set()) | self._by_title.get(title, set()) if _visible(self._rows[i], tenant)}
+            if not ids:
+                return None
+            return _project(self._rows[min(ids)], "id, approval_status")
+
+    def list(self, approval_status: str, active_only: bool = False) -> List[Dict]:
+        with self._lock:
+            tenant = current_tenant()
+            rows = [self._rows[i] for i in self._by_status.get(approval_status, set()) if _visible(self._rows[i], tenant)]
+            if active_only:
+                rows = [row for row in rows if row.get("is_active")]
+            # created_at desc, then a stable sort by deadline asc with NULLs last
+            rows.sort(key=lambda row: row.get("created_at") or "", reverse=True)
+            if approval_status != "pending":
+                rows.sort(key=lambda row: (row.get("deadline") is None, row.get("deadline") or ""))
+            return [dict(row) for row in rows]
+
+    def list_ended(self, before: str, limit: int, after: Position = None) -> List[Dict]:
+        with self._lock:
+            tenant = current_tenant()
+            rows = [
+                row for row in self._rows.values()
+                if row.get("deadline") is not None and row["deadline"] < before and _visible(row, tenant)
+                and (not after or (row["deadline"], row["id"]) > tuple(after))
+            ]
+            rows.sort(key=lambda row: (row["deadline"], row["id"]))
+            return [dict(row) for row in rows[:limit]]
+
+    def update(self, hackathon_id: str, values: Dict) -> Optional[Dict]:
+        with self._lock:
+            current = self._rows.get(hackathon_id)
+            if not current or not _visible(current, current_tenant()):
+                return None
+            row = {**current, **values, "updated_at": _now()}
+            self._unindex(current)
+            self._rows[hackathon_id] = row
+            self._index(row)
+            return dict(row)
+
+    def delete(self, hackathon_id: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._rows.get(hackathon_id)
+            if not row or not _visible(row, current_tenant()):
+                return None
+            del self._rows[hackathon_id]
+            self._unindex(row)
+            self._registrations.delete_for_hackathon(hackathon_id)
+            self._tombstones.record("hackathon", hackathon_id, tenant_id=row["tenant_id"])
+            return dict(row)
+
+
+class MemoryRegistrationRepository(MemoryTable, RegistrationRepository):
+    def __init__(self, lock: threading.RLock, tombstones: "MemoryTombstoneRepository", users: MemoryUserRepository):
+        super().__init__(lock)
+        self._tombstones = tombstones
+        self._users = users
+        self._by_hackathon: Dict[str, Set[str]] = defaultdict(set)
+        self._by_pair: Dict[tuple, str] = {}
+
+    def insert(self, record: Dict) -> Dict:
+        with self._lock:
+            row = self._stamp_insert(record)
+            row.setdefault("status", "applied")
+            for column in ("link_submission", "notes", "acknowledged_by"):
+                row.setdefault(column, None)
+            self._rows[row["id"]] = row
+            self._by_hackathon[row["hackathon_id"]].add(row["id"])
+            self._by_pair[(row["hackathon_id"], row["student_college_id"])] = row["id"]
+            return dict(row)
+
+    def find(self, hackathon_id: str, student_college_id: str) -> Optional[Dict]:
+        with self._lock:
+            registration_id = self._by_pair.get((hackathon_id, student_college_id))
+            if not registration_id or not _visible(self._rows[registration_id], current_tenant()):
+                return None
+            return {"id": registration_id}
+
+    def list_by_hackathon(self, hackathon_id: str, columns: str = "*", department: Optional[str] = None) -> List[Dict]:
+        tenant = current_tenant()
+        with self._lock:
+            rows = [self._rows[i] for i in self._by_hackathon.get(hackathon_id, set()) if _visible(self._rows[i], tenant)]
+            if department is not None:
+                # Inner join on college_users, like the PostgREST embed
+                in_department = self._users._by_department.get(department, set())
+                rows = [row for row in rows if row["student_college_id"] in in_department]
+            return [_project(row, columns) for row in rows]
+
+    def list_by_hackathons(
+        self, hackathon_ids: Iterable[str], columns: str = "*",
+        after: Optional[str] = None, limit: Optional[int] = None, updated_after: Optional[str] = None,
+    ) -> List[Dict]:
+        tenant = current_tenant()
+        with self._lock:
+            rows = sorted(
+                (
+                    self._rows[i]
+                    for hackathon_id in set(hackathon_ids)
+                    for i in self._by_hackathon.get(hackathon_id, set())
+                ),
+                key=lambda row: row["id"],
+            )
+            rows = [
+                row for row in rows
+                if _visible(row, tenant)
+                and (after is None or row["id"] > after)
+                and (updated_after is None or row["updated_at"] > updated_after)
+            ]
+            return [_project(row, columns) for row in rows[:limit]]
+
+    def get_status_counts(self, hackathon_ids: Iterable[str]) -> Dict[str, Dict[str, int]]:
+        tenant = current_tenant()
+        counts: Dict[str, Dict[str, int]] = {}
+        with self._lock:
+            for hackathon_id in set(hackathon_ids):
+                for registration_id in self._by_hackathon.get(hackathon_id, set()):
+                    row = self._rows[registration_id]
+                    if _visible(row, tenant):
+                        by_status = counts.setdefault(hackathon_id, {})
+                        by_status[row["status"]] = by_status.get(row["status"], 0) + 1
+        return counts
+
+    def update(self, registration_id: str, values: Dict) -> Optional[Dict]:
+        with self._lock:
+            current = self._rows.get(registration_id)
+            if not current or not _visible(current, current_tenant()):
+                return None
+            row = {**current, **values, "updated_at": _now()}
+            self._rows[registration_id] = row
+            return dict(row)
+
+    def delete_for_hackathon(self, hackathon_id: str) -> None:
+        """ON DELETE CASCADE from hackathons, including tombstones"""
+        for registration_id in self._by_hackathon.pop(hackathon_id, set()):
+            row = self._rows.pop(registration_id)
+            self._by_pair.pop((row["hackathon_id"], row["student_college_id"]), None)
+            self._tombstones.record("registration", registration_id, row["student_college_id"], row["tenant_id"])
+
+
+class MemoryTombstoneRepository(MemoryTable, TombstoneRepository):
+    def record(self, entity: str, entity_id: str, scope_college_id: Optional[str] = None, tenant_id: str = DEFAULT_TENANT) -> None:
+        with self._lock:
+            row = self._stamp_insert({"entity": entity, "entity_id": entity_id, "scope_college_id": scope_college_id})
+            # Like the trigger: the tombstone belongs to the deleted row's tenant
+            row["tenant_id"] = tenant_id
+            self._rows[row["id"]] = row
+
+
+class MemoryJobRepository(MemoryTable, JobRepository):
+    def insert(self, record: Dict) -> Dict:
+        with self._lock:
+            row = self._stamp_insert(record)
+            self._rows[row["id"]] = row
+            return dict(row)
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._rows.get(job_id)
+            return dict(row) if row and _visible(row, current_tenant()) else None
+
+    def update(self, job_id: str, values: Dict) -> Optional[Dict]:
+        with self._lock:
+            current = self._rows.get(job_id)
+            if not current or not _visible(current, current_tenant()):
+                return None
+            current.update(values, updated_at=_now())
+            return dict(current)
+
+    def claim(self, job_id: str, values: Dict) -> Optional[Dict]:
+        with self._lock:
+            current = self._rows.get(job_id)
+            if not current or current.get("status") != "queued" or not _visible(current, current_tenant()):
+                return None
+            return self.update(job_id, values)
+
+    def list_by_status(self, status: str, limit: int = 100, after: Position = None) -> List[Dict]:
+        with self._lock:
+            tenant = current_tenant()
+            rows = sorted(
+                (
+                    row for row in self._rows.values()
+                    if row.get("status") == status and _visible(row, tenant)
+                    and (not after or (row["created_at"], row["id"]) > tuple(after))
+                ),
+                key=lambda row: (row["created_at"], row["id"]),
+            )
+            return [dict(row) for row in rows[:limit]]
+
+
+class MemoryIdempotencyRepository(IdempotencyRepository):
+    def __init__(self, lock: threading.RLock):
+        self._lock = lock
+        self._rows: Dict[str, Dict] = {}
+
+    def claim(self, record: Dict) -> Optional[Dict]:
+        with self._lock:
+            existing = self._rows.get(record["key"])
+            if existing is not None and existing["expires_at"] > _now():
+                return dict(existing)
+            self._rows[record["key"]] = {**record, "created_at": _now()}
+            return None
+
+    def get(self, key: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._rows.get(key)
+            return dict(row) if row is not None else None
+
+    def complete(self, key: str, values: Dict) -> None:
+        with self._lock:
+            if key in self._rows:
+                self._rows[key].update(values)
+
+    def release(self, key: str) -> None:
+        with self._lock:
+            self._rows.pop(key, None)
+
+    def delete_expired(self) -> None:
+        with self._lock:
+            now = _now()
+            for key in [k for k, row in self._rows.items() if row["expires_at"] <= now]:
+                del self._rows[key]
+
+
+class MemoryAuthGateway(AuthGateway):
+    """Stand-in for Supabase Auth: plain-text credentials and opaque random tokens"""
+
+    def __init__(self, lock: threading.RLock):
+        self._lock = lock
+        self._users: Dict[str, Dict] = {}  # auth user id -> {"id", "email", "password"}
+        self._by_email: Dict[str, str] = {}
+        self._tokens: Dict[str, str] = {}  # access token -> auth user id
+
+    def get_user(self, token: str) -> Optional[Dict]:
+        with self._lock:
+            user = self._users.get(self._tokens.get(token))
+            if not user:
+                return None
+            return {"id": user["id"], "email": user["email"], "role": "authenticated"}
+
+    def sign_in(self, email: str, password: str) -> Optional[Dict]:
+        with self._lock:
+            user = self._users.get(self._by_email.get(email))
+            if not user or user["password"] != password:
+                return None
+            token = secrets.token_urlsafe(24)
+            self._tokens[token] = user["id"]
+            return {"user": {"id": user["id"], "email": user["email"]}, "access_token": token}
+
+    def create_user(self, email: str, password: str) -> Optional[Dict]:
+        with self._lock:
+            if email in self._by_email:
+                raise IntegrityError("A user with this email address has already been registered")
+            user = {"id": str(uuid.uuid4()), "email": email, "password": password}
+            self._users[user["id"]] = user
+            self._by_email[email] = user["id"]
+            return {"id": user["id"], "email": email}
+
+    def update_password(self, auth_user_id: str, password: str) -> None:
+        with self._lock:
+            if auth_user_id in self._users:
+                self._users[auth_user_id]["password"] = password
+
+    def find_user_by_email(self, email: str) -> Optional[Dict]:
+        with self._lock:
+            user = self._users.get(self._by_email.get(email))
+            return {"id": user["id"], "email": user["email"]} if user else None
+
+    def delete_user(self, auth_user_id: str) -> None:
+        with self._lock:
+            user = self._users.pop(auth_user_id, None)
+            if user:
+                del self._by_email[user["email"]]
+                self._tokens = {token: uid for token, uid in self._tokens.items() if uid != auth_user_id}
+
+    def issue_token(self, auth_user_id: str) -> str:
+        """Mint an access token directly, for seeding benchmarks and load tests"""
+        with self._lock:
+            token = secrets.token_urlsafe(24)
+            self._tokens[token] = auth_user_id
+            return token
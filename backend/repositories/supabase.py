@@ -0,0 +1,338 @@
+"""
+Supabase (PostgREST + GoTrue) implementation of the repositories
+"""
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional
+from supabase import Client
+from core.tenancy import current_tenant
+from repositories.base import (
+    AuthGateway,
+    HackathonRepository,
+    IdempotencyRepository,
+    JobRepository,
+    Position,
+    RegistrationRepository,
+    TombstoneRepository,
+    UserRepository,
+    is_unique_violation,
+)
+
+
+class SupabaseTable:
+    """Common helpers for a single PostgREST table"""
+
+    table: str
+    # Rows carry a tenant_id and queries are filtered to the current tenant (see core/tenancy.py)
+    tenant_scoped = False
+
+    def __init__(self, client: Client):
+        self._client = client
+
+    def _query(self):
+        return self._client.table(self.table)
+
+    def _tenant(self) -> Optional[str]:
+        return current_tenant() if self.tenant_scoped else None
+
+    def _scoped(self, query):
+        tenant = self._tenant()
+        return query if tenant is None else query.eq("tenant_id", tenant)
+
+    def _select(self, columns: str = "*"):
+        return self._scoped(self._query().select(columns))
+
+    def _insert(self, record: Dict):
+        tenant = self._tenant()
+        return self._query().insert(record if tenant is None else {**record, "tenant_id": tenant})
+
+    def _update(self, values: Dict):
+        return self._scoped(self._query().update(values))
+
+    def _delete(self):
+        return self._scoped(self._query().delete())
+
+    def _first(self, query) -> Optional[Dict]:
+        res = query.limit(1).execute()
+        return res.data[0] if res.data else None
+
+    def changed_since(self, position: Position, limit: int, filters: Dict) -> List[Dict]:
+        query = self._select("*")
+        for column, value in filters.items():
+            query = query.eq(column, value)
+        if position:
+            updated_at, row_id = position
+            query = query.or_(f'updated_at.gt."{updated_at}",and(updated_at.eq."{updated_at}",id.gt.{row_id})')
+        res = query.order("updated_at").order("id").limit(limit).execute()
+        return res.data or []
+
+
+class SupabaseUserRepository(SupabaseTable, UserRepository):
+    table = "college_users"
+    tenant_scoped = True
+
+    def get_by_auth_id(self, auth_user_id: str) -> Optional[Dict]:
+        return self._first(self._select("*").eq("auth_user_id", auth_user_id))
+
+    def get_by_college_id(self, college_id: str) -> Optional[Dict]:
+        return self._first(self._select("*").eq("college_id", college_id))
+
+    def get_by_email(self, email: str) -> Optional[Dict]:
+        return self._first(self._select("*").eq("email", email))
+
+    def insert(self, record: Dict) -> Dict:
+        return self._insert(record).execute().data[0]
+
+    def update(self, college_id: str, values: Dict) -> Optional[Dict]:
+        res = self._update(values).eq("college_id", college_id).execute()
+        return res.data[0] if res.data else None
+
+    def list(self, role: Optional[str] = None, department: Optional[str] = None, columns: str = "*") -> List[Dict]:
+        query = self._select(columns)
+        if role:
+            query = query.eq("role", role)
+        if department:
+            query = query.eq("department", department)
+        return query.execute().data or []
+
+    def list_by_college_ids(self, college_ids: Iterable[str], columns: str = "*") -> List[Dict]:
+        college_ids = list(college_ids)
+        if not college_ids:
+            return []
+        return self._select(columns).in_("college_id", college_ids).execute().data or []
+
+    def link_auth_ids(self, links: Dict[str, str]) -> List[str]:
+        if not links:
+            return []
+        res = self._client.rpc("link_auth_users", {
+            "links": [{"college_id": cid, "auth_user_id": aid} for cid, aid in links.items()],
+            "p_tenant_id": self._tenant(),
+        }).execute()
+        return [row["college_id"] for row in res.data or []]
+
+
+class SupabaseHackathonRepository(SupabaseTable, HackathonRepository):
+    table = "hackathons"
+    tenant_scoped = True
+
+    def insert(self, record: Dict) -> Dict:
+        try:
+            return self._insert(record).execute().data[0]
+        except Exception as exc:
+            # Older databases lack the optional suggested_by_model column; retry without it.
+            msg = str(exc)
+            if "suggested_by_model" in record and "suggested_by_model" in msg and "schema cache" in msg:
+                record = {k: v for k, v in record.items() if k != "suggested_by_model"}
+                return self._insert(record).execute().data[0]
+            raise
+
+    def get(self, hackathon_id: str, columns: str = "*") -> Optional[Dict]:
+        return self._first(self._select(columns).eq("id", hackathon_id))
+
+    def find_by_link_or_title(self, link: Optional[str], title: Optional[str]) -> Optional[Dict]:
+        return self._first(
+            self._select("id, approval_status").or_(f"link.eq.{link},title.eq.{title}")
+        )
+
+    def list(self, approval_status: str, active_only: bool = False) -> List[Dict]:
+        query = self._select("*").eq("approval_status", approval_status)
+        if active_only:
+            query = query.eq("is_active", True)
+        if approval_status == "pending":
+            query = query.order("created_at", desc=True)
+        else:
+            query = query.order("deadline", desc=False).order("created_at", desc=True)
+        return query.execute().data or []
+
+    def list_ended(self, before: str, limit: int, after: Position = None) -> List[Dict]:
+        query = self._select("*").lt("deadline", before)
+        if after:
+            deadline, row_id = after
+            query = query.or_(f'deadline.gt."{deadline}",and(deadline.eq."{deadline}",id.gt.{row_id})')
+        return query.order("deadline").order("id").limit(limit).execute().data or []
+
+    def update(self, hackathon_id: str, values: Dict) -> Optional[Dict]:
+        res = self._update(values).eq("id", hackathon_id).execute()
+        return res.data[0] if res.data else None
+
+    def delete(self, hackathon_id: str) -> Optional[Dict]:
+        res = self._delete().eq("id", hackathon_id).execute()
+        return res.data[0] if res.data else None
+
+
+class SupabaseRegistrationRepository(SupabaseTable, RegistrationRepository):
+    table = "hackathon_registrations"
+    tenant_scoped = True
+
+    def insert(self, record: Dict) -> Dict:
+        return self._insert(record).execute().data[0]
+
+    def find(self, hackathon_id: str, student_college_id: str) -> Optional[Dict]:
+        return self._first(
+            self._select("id")
+            .eq("hackathon_id", hackathon_id)
+            .eq("student_college_id", student_college_id)
+        )
+
+    def list_by_hackathon(self, hackathon_id: str, columns: str = "*", department: Optional[str] = None) -> List[Dict]:
+        if department is None:
+            return self._select(columns).eq("hackathon_id", hackathon_id).execute().data or []
+        # Inner-join the student's profile so only that department's rows leave the database
+        rows = (
+            self._select(f"{columns}, student:college_users!student_college_id!inner(department)")
+            .eq("hackathon_id", hackathon_id)
+            .eq("student.department", department)
+            .execute()
+            .data
+            or []
+        )
+        for row in rows:
+            row.pop("student", None)
+        return rows
+
+    def list_by_hackathons(
+        self, hackathon_ids: Iterable[str], columns: str = "*",
+        after: Optional[str] = None, limit: Optional[int] = None, updated_after: Optional[str] = None,
+    ) -> List[Dict]:
+        hackathon_ids = list(hackathon_ids)
+        if not hackathon_ids:
+            return []
+        query = self._select(columns).in_("hackathon_id", hackathon_ids)
+        if after is not None:
+            query = query.gt("id", after)
+        if updated_after is not None:
+            query = query.gt("updated_at", updated_after)
+        query = query.order("id")
+        if limit is not None:
+            query = query.limit(limit)
+        return query.execute().data or []
+
+    def get_status_counts(self, hackathon_ids: Iterable[str]) -> Dict[str, Dict[str, int]]:
+        hackathon_ids = list(hackathon_ids)
+        if not hackathon_ids:
+            return {}
+        res = self._client.rpc("registration_status_counts", {
+            "hackathon_ids": hackathon_ids,
+            "p_tenant_id": self._tenant(),
+        }).execute()
+        counts: Dict[str, Dict[str, int]] = {}
+        for row in res.data or []:
+            counts.setdefault(row["hackathon_id"], {})[row["status"]] = row["registrations"]
+        return counts
+
+    def update(self, registration_id: str, values: Dict) -> Optional[Dict]:
+        res = self._update(values).eq("id", registration_id).execute()
+        return res.data[0] if res.data else None
+
+
+class SupabaseTombstoneRepository(SupabaseTable, TombstoneRepository):
+    table = "sync_tombstones"
+    tenant_scoped = True
+
+
+class SupabaseJobRepository(SupabaseTable, JobRepository):
+    table = "jobs"
+    tenant_scoped = True
+
+    def insert(self, record: Dict) -> Dict:
+        return self._insert(record).execute().data[0]
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        return self._first(self._select("*").eq("id", job_id))
+
+    def update(self, job_id: str, values: Dict) -> Optional[Dict]:
+        res = self._update(values).eq("id", job_id).execute()
+        return res.data[0] if res.data else None
+
+    def claim(self, job_id: str, values: Dict) -> Optional[Dict]:
+        res = self._update(values).eq("id", job_id).eq("status", "queued").execute()
+        return res.data[0] if res.data else None
+
+    def list_by_status(self, status: str, limit: int = 100, after: Position = None) -> List[Dict]:
+        query = self._select("*").eq("status", status)
+        if after:
+            created_at, row_id = after
+            query = query.or_(f'created_at.gt."{created_at}",and(created_at.eq."{created_at}",id.gt.{row_id})')
+        return query.order("created_at").order("id").limit(limit).execute().data or []
+
+
+class SupabaseIdempotencyRepository(SupabaseTable, IdempotencyRepository):
+    table = "idempotency_keys"
+
+    def claim(self, record: Dict) -> Optional[Dict]:
+        try:
+            self._insert(record).execute()
+            return None
+        except Exception as exc:
+            if not is_unique_violation(exc):
+                raise
+        now = datetime.now(timezone.utc).isoformat()
+        # Take an expired key over; of several workers racing for it, only one update matches
+        taken = self._update({**record, "status_code": None, "headers": None, "body": None}) \
+            .eq("key", record["key"]).lte("expires_at", now).execute()
+        if taken.data:
+            return None
+        existing = self.get(record["key"])
+        if existing is None:
+            # Released in between: claim it afresh
+            try:
+                self._insert(record).execute()
+                return None
+            except Exception as exc:
+                if not is_unique_violation(exc):
+                    raise
+            existing = self.get(record["key"])
+        return existing
+
+    def get(self, key: str) -> Optional[Dict]:
+        return self._first(self._select("*").eq("key", key))
+
+    def complete(self, key: str, values: Dict) -> None:
+        self._update(values).eq("key", key).execute()
+
+    def release(self, key: str) -> None:
+        self._delete().eq("key", key).execute()
+
+    def delete_expired(self) -> None:
+        self._delete().lte("expires_at", datetime.now(timezone.utc).isoformat()).execute()
+
+
+class SupabaseAuthGateway(AuthGateway):
+    def __init__(self, client: Client, admin_client: Client):
+        self._client = client
+        self._admin = admin_client
+
+    def get_user(self, token: str) -> Optional[Dict]:
+        response = self._client.auth.get_user(token)
+        if not response or not response.user:
+            return None
+        return {"id": response.user.id, "email": response.user.email, "role": response.user.role}
+
+    def sign_in(self, email: str, password: str) -> Optional[Dict]:
+        response = self._client.auth.sign_in_with_password({"email": email, "password": password})
+        if not response.user:
+            return None
+        return {
+            "user": {"id": response.user.id, "email": response.user.email},
+            "access_token": response.session.access_token,
+        }
+
+    def create_user(self, email: str, password: str) -> Optional[Dict]:
+        response = self._admin.auth.admin.create_user({
+            "email": email,
+            "password": password,
+            "email_confirm": True  # Auto-confirm email
+        })
+        if not response.user:
+            return None
+        return {"id": response.user.id, "email": response.user.email}
+
+    def update_password(self, auth_user_id: str, password: str) -> None:
+        self._admin.auth.admin.update_user_by_id(auth_user_id, {"password": password})
+
+    def find_user_by_email(self, email: str) -> Optional[Dict]:
+        # GoTrue's admin API has no lookup by email; the auth_user_by_email RPC reads auth.users directly
+        res = self._admin.rpc("auth_user_by_email", {"p_email": email}).execute()
+        return {"id": res.data[0]["id"], "email": res.data[0]["email"]} if res.data else None
+
+    def delete_user(self, auth_user_id: str) -> None:
+        self._admin.auth.admin.delete_user(auth_user_id)
@@ -1,15 +1,28 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from models.user import AddUserRequest, UserResponse, UserRole
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import FileResponse
+from starlette.background import BackgroundTask
+from models.analytics import (
+    AnalyticsRefreshResponse,
+    ParticipationResponse,
+    RepeatParticipantsResponse,
+    ReviewersResponse,
+)
+from models.job import JobCreate, JobResponse
+from models.user import AddUserRequest, BulkActivateRequest, UserResponse, UserRole
+from services.analytics import AnalyticsService
 from services.auth import AuthService
+from services.jobs import JobService
 from dependencies.auth import (
     require_admin,
     require_admin_or_principal,
     require_admin_principal_hod,
     require_admin_principal_hod_teacher,
+    department_scope,
     get_current_user,
 )
-from config.supabase import supabase
-from typing import List
+from core.invalidation import publish
+from core.serialization import rows_response
+from typing import List, Optional
 
 router = APIRouter(prefix="/admin", tags=["Admin"])
 
@@ -25,6 +38,7 @@ def add_student(
     # Force role to be student
     user_data.role = UserRole.STUDENT
     new_user = AuthService.add_user(user_data)
+    publish("stats")
     return UserResponse(**new_user)
 
 @router.post("/add-teacher", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
@@ -39,6 +53,7 @@ def add_teacher(
     # Force role to be teacher
     user_data.role = UserRole.TEACHER
     new_user = AuthService.add_user(user_data)
+    publish("stats")
     return UserResponse(**new_user)
 
 @router.post("/add-hod", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
@@ -60,6 +75,7 @@ def add_hod(
         )
     
     new_user = AuthService.add_user(user_data)
+    publish("stats")
     return UserResponse(**new_user)
 
 @router.post("/add-principal", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
@@ -74,39 +90,25 @@ def add_principal(
     # Force role to be principal
     user_data.role = UserRole.PRINCIPAL
     new_user = AuthService.add_user(user_data)
+    publish("stats")
     return UserResponse(**new_user)
 
 @router.get("/users", response_model=List[UserResponse])
 def get_all_users(
     role: str = None,
     department: str = None,
-    current_user: dict = Depends(require_admin)
+    current_user: dict = Depends(require_admin_principal_hod_teacher)
 ):
     """
     Get all users with optional filters
-    Only accessible by admin
+    Accessible by admin and principal (all departments), HOD and teacher (their own department only)
     
     - **role**: Filter by role (optional)
-    - **department**: Filter by department (optional)
-    """
-    try:
-        query = supabase.table("college_users").select("*")
-        
-        if role:
-            query = query.eq("role", role)
-        
-        if department:
-            query = query.eq("department", department)
-        
-        response = query.execute()
-        
-        return [UserResponse(**user) for user in response.data]
-    
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error fetching users: {str(e)}"
-        )
+    - **department**: Filter by department (optional; fixed to their own for HOD/teacher)
+    """
+    department = department_scope(current_user) or department
+    users = AuthService.list_users(role=role, department=department)
+    return rows_response(UserResponse, users)
 
 @router.get("/users/{college_id}", response_model=UserResponse)
 def get_user_by_id(
@@ -136,28 +138,10 @@ def deactivate_user(
     Deactivate a user account
     Only accessible by admin
     """
-    try:
-        user = AuthService.get_user_by_college_id(college_id)
-        
-        if not user:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="User not found"
-            )
-        
-        supabase.table("college_users").update({
-            "is_active": False
-        }).eq("college_id", college_id).execute()
-        
-        return {"message": f"User {college_id} deactivated successfully"}
-    
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error deactivating user: {str(e)}"
-        )
+    AuthService.set_user_active(college_id, False)
+    publish("principal")
+    publish("stats")
+    return {"message": f"User {college_id} deactivated successfully"}
 
 @router.patch("/users/{college_id}/activate")
 def activate_user(
@@ -168,28 +152,10 @@ def activate_user(
     Reactivate a user account
     Only accessible by admin
     """
-    try:
-        user = AuthService.get_user_by_college_id(college_id)
-        
-        if not user:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="User not found"
-            )
-        
-        supabase.table("college_users").update({
-            "is_active": True
-        }).eq("college_id", college_id).execute()
-        
-        return {"message": f"User {college_id} activated successfully"}
-    
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error activating user: {str(e)}"
-        )
+    AuthService.set_user_active(college_id, True)
+    publish("principal")
+    publish("stats")
+    return {"message": f"User {college_id} activated successfully"}
 
 @router.get("/dashboard/stats")
 def get_dashboard_stats(
@@ -199,31 +165,130 @@ def get_dashboard_stats(
     Get dashboard statistics for admin
     Returns counts of users by role and activation status
     """
-    try:
-        # Get all users
-        all_users = supabase.table("college_users").select("role, auth_user_id, is_active").execute()
-        
-        users_data = all_users.data
-        
-        stats = {
-            "total_users": len(users_data),
-            "activated_users": len([u for u in users_data if u.get("auth_user_id")]),
-            "pending_activation": len([u for u in users_data if not u.get("auth_user_id")]),
-            "by_role": {
-                "admin": len([u for u in users_data if u.get("role") == "admin"]),
-                "principal": len([u for u in users_data if u.get("role") == "principal"]),
-                "hod": len([u for u in users_data if u.get("role") == "hod"]),
-                "teacher": len([u for u in users_data if u.get("role") == "teacher"]),
-                "student": len([u for u in users_data if u.get("role") == "student"])
-            },
-            "active_users": len([u for u in users_data if u.get("is_active", True)]),
-            "inactive_users": len([u for u in users_data if not u.get("is_active", True)])
-        }
-        
-        return stats
-    
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error fetching dashboard stats: {str(e)}"
-        )
+    return AuthService.get_dashboard_stats()
+
+@router.post("/jobs", response_model=JobResponse, status_code=status.HTTP_202_ACCEPTED)
+def submit_job(
+    job: JobCreate,
+    current_user: dict = Depends(require_admin)
+):
+    """
+    Queue a heavy admin operation to run in the background
+    Only accessible by admin
+
+    - **kind**: dashboard_stats, hackathon_stats, users_export, registrations_export,
+      bulk_add_users, bulk_activate or archive_hackathons
+    - **params**: kind-specific parameters (e.g. hackathon_id, role, department, users)
+
+    Poll GET /admin/jobs/{id} for progress and the result.
+    """
+    return JobResponse(**JobService.submit(job.kind, job.params, current_user))
+
+@router.get("/jobs/{job_id}", response_model=JobResponse)
+def get_job(
+    job_id: str,
+    current_user: dict = Depends(require_admin)
+):
+    """
+    Get status, progress and result of a background job
+    Only accessible by admin
+    """
+    return JobResponse(**JobService.get_job(job_id))
+
+@router.get("/jobs/{job_id}/result")
+def download_job_result(
+    job_id: str,
+    current_user: dict = Depends(require_admin)
+):
+    """
+    Download the file produced by a finished job (e.g. users_export)
+    Only accessible by admin
+
+    Bulk activation outcomes include the one-time passwords on the first
+    download only.
+    """
+    path = JobService.result_path(job_id)
+    return FileResponse(
+        path,
+        filename=path.rsplit("/", 1)[-1],
+        background=BackgroundTask(JobService.result_downloaded, job_id),
+    )
+
+@router.post("/bulk-activate", response_model=JobResponse, status_code=status.HTTP_202_ACCEPTED)
+def bulk_activate(
+    request: BulkActivateRequest,
+    current_user: dict = Depends(require_admin)
+):
+    """
+    Pre-provision auth accounts with one-time passwords for many users
+    Only accessible by admin
+
+    - **college_ids**: users to activate, or
+    - **role** / **department**: every matching user not activated yet
+    - **resume_job_id**: continue an interrupted bulk activation
+
+    Runs as a background job; download per-user outcomes (including the
+    one-time passwords) from GET /admin/jobs/{id}/result.
+    """
+    return JobResponse(**JobService.submit("bulk_activate", request.dict(exclude_none=True), current_user))
+
+@router.post("/archive", response_model=JobResponse, status_code=status.HTTP_202_ACCEPTED)
+def archive_hackathons(
+    retention_days: Optional[int] = Query(None, ge=0),
+    current_user: dict = Depends(require_admin)
+):
+    """
+    Move hackathons past their deadline plus the retention period, and their
+    registrations, to compressed Parquet files
+    Only accessible by admin
+
+    - **retention_days**: defaults to ARCHIVE_RETENTION_DAYS
+
+    Archived hackathons stay readable through GET /hackathons/{id}, its
+    registrations and stats, and the registrations_export job.
+    """
+    params = {} if retention_days is None else {"retention_days": retention_days}
+    return JobResponse(**JobService.submit("archive_hackathons", params, current_user))
+
+@router.get("/analytics/participation", response_model=ParticipationResponse)
+def participation_analytics(
+    current_user: dict = Depends(require_admin_or_principal)
+):
+    """
+    Share of each department's students registering for any hackathon, per month
+    Only accessible by admin and principal
+    """
+    return ParticipationResponse(**AnalyticsService.participation())
+
+@router.get("/analytics/repeat-participants", response_model=RepeatParticipantsResponse)
+def repeat_participant_analytics(
+    current_user: dict = Depends(require_admin_or_principal)
+):
+    """
+    Students who registered for two or more hackathons, overall and per department
+    Only accessible by admin and principal
+    """
+    return RepeatParticipantsResponse(**AnalyticsService.repeat_participants())
+
+@router.get("/analytics/reviewers", response_model=ReviewersResponse)
+def reviewer_analytics(
+    current_user: dict = Depends(require_admin_or_principal)
+):
+    """
+    Registrations decided per reviewer and the share acknowledged
+    Only accessible by admin and principal
+    """
+    return ReviewersResponse(**AnalyticsService.reviewers())
+
+@router.post("/analytics/refresh", response_model=AnalyticsRefreshResponse)
+def refresh_analytics(
+    full: bool = False,
+    current_user: dict = Depends(require_admin_or_principal)
+):
+    """
+    Pull registration changes into the analytics now instead of waiting for ANALYTICS_REFRESH_S
+    Only accessible by admin and principal
+
+    - **full**: rebuild from scratch
+    """
+    return AnalyticsRefreshResponse(**AnalyticsService.refresh(full))
@@ -7,6 +7,7 @@ from models.user import (
 )
 from services.auth import AuthService
 from dependencies.auth import get_current_user
+from core.invalidation import publish
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
@@ -28,6 +29,7 @@ def activate_account(activation_data: ActivateAccountRequest):
     - **password**: New password (min 6 characters)
     """
     result = AuthService.activate_account(activation_data)
+    publish("stats")
     return result
 
 @router.post("/login", response_model=TokenResponse)
@@ -82,11 +84,8 @@ def change_password(
         # Verify old password by attempting login
         AuthService.login(current_user["email"], old_password)
         
-        # Update password using Supabase
-        from config.supabase import supabase
-        supabase.auth.update_user({
-            "password": new_password
-        })
+        # Update password with the auth provider
+        AuthService.change_password(current_user, new_password)
         
         return {"message": "Password changed successfully"}
     
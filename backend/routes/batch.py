@@ -0,0 +1,119 @@
+import asyncio
+import json
+import logging
+from typing import Dict, List
+from urllib.parse import urlsplit
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from models.batch import BatchRequest, BatchResponse, BatchSubRequest
+from dependencies.auth import get_current_user, PRINCIPAL_SCOPE_KEY
+from config.settings import settings
+
+router = APIRouter(prefix="/batch", tags=["Batch"])
+logger = logging.getLogger("hackathon.batch")
+
+# Sub-requests with these methods have no side effects and may run concurrently
+CONCURRENT_METHODS = {"GET", "HEAD"}
+FORWARDED_HEADERS = {b"authorization", b"accept-language", b"user-agent"}
+INHERITED_SCOPE_KEYS = ("type", "asgi", "http_version", "scheme", "server", "client", "root_path")
+
+
+async def _dispatch(request: Request, principal: Dict, sub: BatchSubRequest) -> Dict:
+    """Run one sub-request through the application and capture its response"""
+    url = urlsplit(sub.path)
+    if not url.path.startswith("/") or url.path.rstrip("/") == "/batch":
+        return {"id": sub.id, "status": status.HTTP_400_BAD_REQUEST, "body": {"detail": "Invalid sub-request path"}}
+
+    body = b"" if sub.body is None else json.dumps(sub.body).encode()
+    headers = [(k, v) for k, v in request.scope["headers"] if k in FORWARDED_HEADERS]
+    if sub.body is not None:
+        headers += [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]
+
+    scope = {
+        **{key: request.scope[key] for key in INHERITED_SCOPE_KEYS if key in request.scope},
+        "method": sub.method.upper(),
+        "path": url.path,
+        "raw_path": url.path.encode(),
+        "query_string": url.query.encode(),
+        "headers": headers,
+        PRINCIPAL_SCOPE_KEY: principal,
+    }
+
+    request_sent = False
+    response_done = asyncio.Event()
+    response = {"status": 500, "headers": {}, "chunks": []}
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        await response_done.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            response["status"] = message["status"]
+            response["headers"] = {k.decode(): v.decode() for k, v in message.get("headers", [])}
+        elif message["type"] == "http.response.body":
+            response["chunks"].append(message.get("body", b""))
+            if not message.get("more_body", False):
+                response_done.set()
+
+    try:
+        await request.app(scope, receive, send)
+    except Exception:
+        # ServerErrorMiddleware re-raises after answering; keep it from failing the whole batch
+        logger.exception("Batch sub-request %s %s failed", scope["method"], url.path)
+        return {"id": sub.id, "status": status.HTTP_500_INTERNAL_SERVER_ERROR, "body": {"detail": "Internal server error"}}
+    finally:
+        response_done.set()
+
+    raw = b"".join(response["chunks"])
+    content_type = response["headers"].get("content-type", "")
+    if not raw:
+        payload = None
+    elif content_type.startswith("application/json"):
+        payload = json.loads(raw)
+    else:
+        payload = raw.decode(errors="replace")
+
+    kept_headers = {k: v for k, v in response["headers"].items() if k not in {"content-length", "content-type"}}
+    return {"id": sub.id, "status": response["status"], "headers": kept_headers, "body": payload}
+
+
+@router.post("", response_model=BatchResponse)
+async def run_batch(
+    payload: BatchRequest,
+    request: Request,
+    current_user: dict = Depends(get_current_user),
+):
+    """
+    Execute several API calls in one HTTP exchange
+
+    The caller is authenticated once and every sub-request reuses that principal.
+    Consecutive GET sub-requests run concurrently; any other method runs on its own,
+    in order, after everything before it has finished. Responses keep request order.
+    """
+    if len(payload.requests) > settings.BATCH_MAX_REQUESTS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"A batch may contain at most {settings.BATCH_MAX_REQUESTS} requests"
+        )
+
+    responses: List[Dict] = []
+    pending: List[BatchSubRequest] = []
+
+    async def flush():
+        if pending:
+            responses.extend(await asyncio.gather(*(_dispatch(request, current_user, sub) for sub in pending)))
+            pending.clear()
+
+    for sub in payload.requests:
+        if sub.method.upper() in CONCURRENT_METHODS:
+            pending.append(sub)
+            continue
+        await flush()
+        responses.append(await _dispatch(request, current_user, sub))
+    await flush()
+
+    return {"responses": responses}
@@ -1,6 +1,7 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from typing import List, Optional
 from models.hackathon import (
+    HackathonChangesResponse,
     HackathonCreate,
     HackathonResponse,
     HackathonRegistrationCreate,
@@ -8,7 +9,9 @@ from models.hackathon import (
     HackathonStatsResponse,
 )
 from services.hackathon import HackathonService
+from core.serialization import rows_response
 from dependencies.auth import (
+    department_scope,
     get_current_user,
     require_admin_principal_hod,
     require_admin_principal_hod_teacher,
@@ -27,9 +30,47 @@ def create_hackathon(
 
 
 @router.get("/", response_model=List[HackathonResponse])
-def list_hackathons(include_inactive: bool = False, current_user: dict = Depends(get_current_user)):
+def list_hackathons(
+    include_inactive: bool = False,
+    with_counts: bool = False,
+    current_user: dict = Depends(get_current_user),
+):
+    """
+    Approved hackathons
+
+    - **with_counts**: attach total and per-status registration counts to each item
+    """
     items = HackathonService.list_hackathons(include_inactive)
-    return [HackathonResponse(**i) for i in items]
+    if with_counts:
+        items = HackathonService.with_registration_counts(items)
+    return rows_response(HackathonResponse, items)
+
+
+@router.get("/changes", response_model=HackathonChangesResponse)
+def list_changes(
+    since: Optional[str] = None,
+    limit: int = Query(500, ge=1, le=1000),
+    current_user: dict = Depends(get_current_user),
+):
+    """
+    Delta sync: rows created, updated or deleted after the `since` cursor
+
+    Call without `since` for a full initial sync, then pass the returned `cursor`.
+    Keep calling while `has_more` is true.
+    """
+    return HackathonService.get_changes(since, current_user, limit)
+
+
+@router.get("/{hackathon_id}", response_model=HackathonResponse)
+def get_hackathon(
+    hackathon_id: str,
+    current_user: dict = Depends(get_current_user),
+):
+    """
+    One hackathon; finished ones moved to cold storage are served from the
+    archive with `archived` set
+    """
+    return HackathonResponse(**HackathonService.get_hackathon(hackathon_id, current_user))
 
 
 @router.delete("/{hackathon_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -59,8 +100,8 @@ def list_registrations(
     hackathon_id: str,
     current_user: dict = Depends(require_admin_principal_hod_teacher),
 ):
-    rows = HackathonService.list_registrations(hackathon_id)
-    return [HackathonRegistrationResponse(**r) for r in rows]
+    rows = HackathonService.list_registrations(hackathon_id, department=department_scope(current_user))
+    return rows_response(HackathonRegistrationResponse, rows)
 
 
 @router.patch("/registrations/{registration_id}/acknowledge", response_model=HackathonRegistrationResponse)
@@ -79,5 +120,5 @@ def hackathon_stats(
     hackathon_id: str,
     current_user: dict = Depends(require_admin_principal_hod_teacher),
 ):
-    stats = HackathonService.get_hackathon_stats(hackathon_id)
+    stats = HackathonService.get_hackathon_stats(hackathon_id, department=department_scope(current_user))
     return HackathonStatsResponse(**stats)
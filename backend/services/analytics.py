@@ -0,0 +1,84 @@
+from typing import Dict
+from fastapi import HTTPException
+from config.repositories import repos
+from config.settings import settings
+from core import analytics, archive
+from core.analytics import ParticipationFrame
+from core.context import instrument_service
+from core.tenancy import current_tenant
+from repositories.base import next_position
+
+
+ARCHIVED_COLUMNS = ["id", "hackathon_id", "student_college_id", "status", "acknowledged_by", "created_at"]
+
+
+def _pull(frame: ParticipationFrame) -> None:
+    """Apply registrations and tombstones changed since the frame's positions, then reload the roster.
+    Reads the change feeds on the primary (core/replicas.py), as a lagging replica would skip rows."""
+    page_size = settings.ANALYTICS_PAGE_SIZE
+    if not frame.archive_loaded:
+        # First load: past semesters already moved to cold storage
+        for rows in archive.store.iter_registrations(ARCHIVED_COLUMNS):
+            frame.upsert(rows)
+        frame.archive_loaded = True
+    while True:
+        rows = repos.registrations.changed_since(frame.positions["r"], page_size, {})
+        frame.upsert(rows)
+        frame.positions["r"] = next_position(frame.positions["r"], rows, page_size, settings.CHANGE_FEED_SETTLE_S)
+        if len(rows) < page_size:
+            break
+    # Archiving deletes the hot rows too; those registrations are not gone, only cold
+    archive.store.refresh()
+    while True:
+        rows = repos.tombstones.changed_since(frame.positions["t"], page_size, {})
+        frame.delete(
+            row["entity_id"] for row in rows
+            if row["entity"] == "registration" and not archive.store.contains(frame.hackathon_of(row["entity_id"]))
+        )
+        frame.positions["t"] = next_position(frame.positions["t"], rows, page_size, settings.CHANGE_FEED_SETTLE_S)
+        if len(rows) < page_size:
+            break
+    frame.set_roster(repos.users.list(role="student", columns="college_id, department"))
+    frame.mark_refreshed()
+
+
+def _frame(refresh: bool = False, full: bool = False) -> ParticipationFrame:
+    """The current tenant's frame, pulled first when asked to or older than ANALYTICS_REFRESH_S"""
+    if not repos.configured:
+        raise HTTPException(status_code=500, detail="Service role key not configured")
+    if not analytics.available():
+        raise HTTPException(status_code=500, detail="Analytics require the numpy package")
+    frame = analytics.frame_for(current_tenant())
+    with frame.lock:
+        if refresh or frame.age() > settings.ANALYTICS_REFRESH_S:
+            try:
+                if full:
+                    frame.reset()
+                _pull(frame)
+            except HTTPException:
+                raise
+            except Exception as e:
+                raise HTTPException(status_code=500, detail=f"Error loading analytics: {e}")
+    return frame
+
+
+@instrument_service
+class AnalyticsService:
+    """Cross-hackathon participation metrics over the columnar frame in core/analytics.py"""
+
+    @staticmethod
+    def participation() -> Dict:
+        return _frame().participation()
+
+    @staticmethod
+    def repeat_participants() -> Dict:
+        return _frame().repeat_participants()
+
+    @staticmethod
+    def reviewers() -> Dict:
+        return _frame().reviewers()
+
+    @staticmethod
+    def refresh(full: bool = False) -> Dict:
+        """Pull changes now; `full` drops the frame and reloads everything"""
+        return _frame(refresh=True, full=full).summary()
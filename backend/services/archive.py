@@ -0,0 +1,157 @@
+"""
+Archival of finished hackathons to cold storage (see core/archive.py)
+
+Runs as the "archive_hackathons" job. Hackathons whose deadline passed more
+than ARCHIVE_RETENTION_DAYS ago (or `retention_days` from the job params) are
+taken ARCHIVE_BATCH_SIZE at a time: the batch and its registrations are
+written to Parquet, then the hackathons are deleted from the hot tables. The
+delete triggers record tombstones as usual, so delta-sync clients drop the
+archived rows too.
+
+Deleting cascades to the registrations, so a hackathon is only deleted when
+its archived copy is known to be complete and current. Registrations are read
+in keyset pages (PostgREST caps the rows per response), the count read must
+match the grouped count, and just before the delete neither the count nor
+any registration may have changed since the read. Hackathons failing a check
+stay hot and are tried again on the next run.
+"""
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, Iterator, List, Set
+from fastapi import HTTPException, status
+from config.repositories import repos
+from config.settings import settings
+from core import archive
+from core.context import instrument_service
+from core.invalidation import publish
+from core.jobs import JobProgress
+
+# ids per PostgREST `in` filter, to keep the URL short
+ID_CHUNK = 200
+# Registrations per read; at or below PostgREST's max-rows, and paging goes on to an empty page anyway
+REGISTRATION_PAGE_SIZE = 1000
+
+
+def _chunks(ids: List[str]) -> Iterator[List[str]]:
+    for start in range(0, len(ids), ID_CHUNK):
+        yield ids[start:start + ID_CHUNK]
+
+
+def _departments(college_ids: Iterable[str]) -> Dict[str, str]:
+    departments = {}
+    for chunk in _chunks(list(dict.fromkeys(college_ids))):
+        for row in repos.users.list_by_college_ids(chunk, columns="college_id, department"):
+            departments[row["college_id"]] = row.get("department")
+    return departments
+
+
+def _registrations(hackathon_ids: List[str]) -> List[Dict]:
+    rows: List[Dict] = []
+    for chunk in _chunks(hackathon_ids):
+        after = None
+        while True:
+            page = repos.registrations.list_by_hackathons(chunk, after=after, limit=REGISTRATION_PAGE_SIZE)
+            if not page:
+                break
+            rows.extend(page)
+            after = page[-1]["id"]
+    return rows
+
+
+def _counts(hackathon_ids: List[str]) -> Dict[str, int]:
+    """hackathon_id -> registrations, from the grouped count"""
+    counts: Dict[str, int] = {}
+    for chunk in _chunks(hackathon_ids):
+        for hackathon_id, by_status in repos.registrations.get_status_counts(chunk).items():
+            counts[hackathon_id] = sum(by_status.values())
+    return counts
+
+
+def _changed(hackathon_ids: List[str], since: str) -> Set[str]:
+    """Hackathons with a registration inserted or updated after `since`"""
+    changed: Set[str] = set()
+    for chunk in _chunks(hackathon_ids):
+        rows = repos.registrations.list_by_hackathons(chunk, columns="hackathon_id", updated_after=since)
+        changed.update(row["hackathon_id"] for row in rows)
+    return changed
+
+
+def _mismatched(hackathon_ids: List[str], archived: Counter) -> Set[str]:
+    counts = _counts(hackathon_ids)
+    return {hackathon_id for hackathon_id in hackathon_ids if counts.get(hackathon_id, 0) != archived[hackathon_id]}
+
+
+@instrument_service
+class ArchiveService:
+    """Moves finished hackathons and their registrations to Parquet files"""
+
+    @staticmethod
+    def archive_hackathons(params: Dict, progress: JobProgress) -> Dict:
+        if not repos.configured:
+            raise HTTPException(status_code=500, detail="Service role key not configured")
+        if not archive.available():
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Archiving is disabled (set ARCHIVE_ENABLED and install pyarrow)",
+            )
+        retention_days = int(params.get("retention_days", settings.ARCHIVE_RETENTION_DAYS))
+        if retention_days < 0:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="retention_days must not be negative")
+        cutoff = (datetime.now(timezone.utc) - timedelta(days=retention_days)).isoformat()
+
+        batches: List[str] = []
+        hackathon_count = registration_count = skipped = 0
+        position = None
+        while True:
+            hackathons = repos.hackathons.list_ended(cutoff, settings.ARCHIVE_BATCH_SIZE, after=position)
+            if not hackathons:
+                break
+            position = [hackathons[-1]["deadline"], hackathons[-1]["id"]]
+            # updated_at is a transaction's start time, so look back as far as the change feeds do
+            snapshot_at = (datetime.now(timezone.utc) - timedelta(seconds=settings.CHANGE_FEED_SETTLE_S)).isoformat()
+            hackathon_ids = [row["id"] for row in hackathons]
+            registrations = _registrations(hackathon_ids)
+            archived = Counter(row["hackathon_id"] for row in registrations)
+
+            # Incomplete reads (or rows that changed meanwhile) are not archived at all
+            unsafe = _mismatched(hackathon_ids, archived)
+            hackathons = [row for row in hackathons if row["id"] not in unsafe]
+            registrations = [row for row in registrations if row["hackathon_id"] not in unsafe]
+            skipped += len(unsafe)
+            if not hackathons:
+                continue
+
+            departments = _departments(row["student_college_id"] for row in registrations)
+            for row in registrations:
+                row["student_department"] = departments.get(row["student_college_id"])
+            batches.append(archive.store.write_batch(hackathons, registrations))
+
+            # Only once the files are on disk, and only hackathons whose registrations are as archived;
+            # the delete cascades to them
+            hackathon_ids = [row["id"] for row in hackathons]
+            # (a skipped one keeps its archived copy, which the next run's batch supersedes)
+            unsafe = _changed(hackathon_ids, snapshot_at) | _mismatched(hackathon_ids, archived)
+            deleted = [hackathon_id for hackathon_id in hackathon_ids if hackathon_id not in unsafe]
+            for hackathon_id in deleted:
+                repos.hackathons.delete(hackathon_id)
+            skipped += len(unsafe)
+
+            hackathon_count += len(deleted)
+            registration_count += sum(archived[hackathon_id] for hackathon_id in deleted)
+            progress.update(hackathon_count, message=f"{hackathon_count} hackathons, {registration_count} registrations archived")
+
+        if hackathon_count:
+            publish("hackathons")
+            publish("registrations")
+            publish("stats")
+        message = f"{hackathon_count} hackathons, {registration_count} registrations archived in {len(batches)} batches"
+        if skipped:
+            message += f", {skipped} skipped (registrations changed while archiving)"
+        progress.update(hackathon_count, hackathon_count, message=message, force=True)
+        return {
+            "cutoff": cutoff,
+            "hackathons": hackathon_count,
+            "registrations": registration_count,
+            "skipped": skipped,
+            "batches": batches,
+        }
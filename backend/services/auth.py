@@ -1,15 +1,21 @@
 from fastapi import HTTPException, status
-from config.supabase import supabase, supabase_admin
+from config.repositories import repos
+from core.cache import cached
+from core.context import instrument_service
+from core.singleflight import single_flight
 from config.settings import settings
 from models.user import UserRole, CollegeUser, AddUserRequest, ActivateAccountRequest
-from typing import Optional, Dict
+from repositories.base import is_unique_violation
+from typing import Optional, Dict, List
 import jwt
 from datetime import datetime
 
+@instrument_service
 class AuthService:
     """Service for handling authentication and user management"""
     
     @staticmethod
+    @single_flight
     def verify_jwt_token(token: str) -> Dict:
         """
         Verify and decode JWT token from Supabase
@@ -20,10 +26,10 @@ class AuthService:
             if token.startswith("Bearer "):
                 token = token[7:]
             
-            # Verify token using Supabase client
-            response = supabase.auth.get_user(token)
+            # Verify token with the auth provider
+            auth_user = repos.auth.get_user(token)
             
-            if not response.user:
+            if not auth_user:
                 raise HTTPException(
                     status_code=status.HTTP_401_UNAUTHORIZED,
                     detail="Invalid token"
@@ -31,10 +37,12 @@ class AuthService:
             
             # Return user data from token
             return {
-                "sub": response.user.id,
-                "email": response.user.email,
-                "role": response.user.role
+                "sub": auth_user["id"],
+                "email": auth_user["email"],
+                "role": auth_user["role"]
             }
+        except HTTPException:
+            raise
         except Exception as e:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -42,14 +50,16 @@ class AuthService:
             )
     
     @staticmethod
+    @single_flight
+    @cached("principal")
     def get_user_by_auth_id(auth_user_id: str) -> Optional[Dict]:
         """
         Get user details from college_users table by auth_user_id
         """
         try:
-            # Use service role to bypass RLS when looking up users by auth_user_id
-            response = supabase_admin.table("college_users").select("*").eq("auth_user_id", auth_user_id).single().execute()
-            return response.data
+            return repos.users.get_by_auth_id(auth_user_id)
+        except HTTPException:
+            raise
         except Exception as e:
             return None
     
@@ -59,9 +69,9 @@ class AuthService:
         Get user details from college_users table by college_id
         """
         try:
-            # Use service role to bypass RLS
-            response = supabase_admin.table("college_users").select("*").eq("college_id", college_id).single().execute()
-            return response.data
+            return repos.users.get_by_college_id(college_id)
+        except HTTPException:
+            raise
         except Exception as e:
             return None
     
@@ -81,14 +91,13 @@ class AuthService:
                 )
             
             # Check if email already exists
-            email_check = supabase_admin.table("college_users").select("*").eq("email", user_data.email).execute()
-            if email_check.data:
+            if repos.users.get_by_email(user_data.email):
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
                     detail=f"User with email {user_data.email} already exists"
                 )
             
-            # Insert user into college_users table (using service role to bypass RLS)
+            # Insert user into college_users table
             user_dict = {
                 "college_id": user_data.college_id,
                 "name": user_data.name,
@@ -100,12 +109,17 @@ class AuthService:
                 "created_at": datetime.utcnow().isoformat()
             }
             
-            response = supabase_admin.table("college_users").insert(user_dict).execute()
-            return response.data[0]
+            return repos.users.insert(user_dict)
         
         except HTTPException:
             raise
         except Exception as e:
+            if is_unique_violation(e):
+                # college_id and email are unique across all colleges, the checks above only see this one
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"User with college_id {user_data.college_id} or email {user_data.email} already exists"
+                )
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"Error adding user: {str(e)}"
@@ -148,29 +162,24 @@ class AuthService:
                 )
             
             # Step 5: Create Supabase Auth user
-            if not supabase_admin:
+            if not repos.configured:
                 raise HTTPException(
                     status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                     detail="Service role key not configured"
                 )
             
-            auth_response = supabase_admin.auth.admin.create_user({
-                "email": activation_data.email,
-                "password": activation_data.password,
-                "email_confirm": True  # Auto-confirm email
-            })
+            auth_user = repos.auth.create_user(activation_data.email, activation_data.password)
             
-            if not auth_response.user:
+            if not auth_user:
                 raise HTTPException(
                     status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                     detail="Failed to create auth user"
                 )
             
             # Step 6: Link auth_user_id to college_users
-            # Use service-role client to bypass RLS when writing auth_user_id
-            supabase_admin.table("college_users").update({
-                "auth_user_id": auth_response.user.id
-            }).eq("college_id", activation_data.college_id).execute()
+            repos.users.update(activation_data.college_id, {
+                "auth_user_id": auth_user["id"]
+            })
             
             return {
                 "message": "Account activated successfully. You can now login.",
@@ -193,19 +202,16 @@ class AuthService:
         """
         try:
             # Authenticate with Supabase
-            auth_response = supabase.auth.sign_in_with_password({
-                "email": email,
-                "password": password
-            })
+            session = repos.auth.sign_in(email, password)
             
-            if not auth_response.user:
+            if not session:
                 raise HTTPException(
                     status_code=status.HTTP_401_UNAUTHORIZED,
                     detail="Invalid credentials"
                 )
             
             # Get user details from college_users
-            user = AuthService.get_user_by_auth_id(auth_response.user.id)
+            user = AuthService.get_user_by_auth_id(session["user"]["id"])
             
             if not user:
                 raise HTTPException(
@@ -220,7 +226,7 @@ class AuthService:
                 )
             
             return {
-                "access_token": auth_response.session.access_token,
+                "access_token": session["access_token"],
                 "token_type": "Bearer",
                 "user": user
             }
@@ -232,3 +238,90 @@ class AuthService:
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail=f"Login failed: {str(e)}"
             )
+    
+    @staticmethod
+    def change_password(user: Dict, new_password: str) -> None:
+        """
+        Set a new password for an activated user
+        """
+        if not user.get("auth_user_id"):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Account is not activated"
+            )
+        repos.auth.update_password(user["auth_user_id"], new_password)
+    
+    @staticmethod
+    def list_users(role: Optional[str] = None, department: Optional[str] = None) -> List[Dict]:
+        """
+        List college users with optional role and department filters
+        """
+        try:
+            return repos.users.list(role=role, department=department)
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Error fetching users: {str(e)}"
+            )
+    
+    @staticmethod
+    def set_user_active(college_id: str, is_active: bool) -> Dict:
+        """
+        Activate or deactivate a user account
+        """
+        action = "activating" if is_active else "deactivating"
+        try:
+            updated = repos.users.update(college_id, {"is_active": is_active})
+            if not updated:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="User not found"
+                )
+            return updated
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Error {action} user: {str(e)}"
+            )
+    
+    @staticmethod
+    @single_flight
+    @cached("stats")
+    def get_dashboard_stats() -> Dict:
+        """
+        Counts of users by role and activation status
+        """
+        try:
+            users_data = repos.users.list(columns="role, auth_user_id, is_active")
+            
+            by_role = {role.value: 0 for role in UserRole}
+            activated = 0
+            active = 0
+            for u in users_data:
+                if u.get("role") in by_role:
+                    by_role[u["role"]] += 1
+                if u.get("auth_user_id"):
+                    activated += 1
+                if u.get("is_active", True):
+                    active += 1
+            
+            return {
+                "total_users": len(users_data),
+                "activated_users": activated,
+                "pending_activation": len(users_data) - activated,
+                "by_role": by_role,
+                "active_users": active,
+                "inactive_users": len(users_data) - active
+            }
+        
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Error fetching dashboard stats: {str(e)}"
+            )
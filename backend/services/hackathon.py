@@ -1,16 +1,49 @@
+import base64
+import json
 from datetime import datetime
-from typing import List, Dict
+from typing import List, Dict, Optional
 from fastapi import HTTPException, status
 from fastapi.encoders import jsonable_encoder
-from config.supabase import supabase_admin
+from config.repositories import repos
+from config.settings import settings
+from core import archive
+from core.context import instrument_service
+from core.singleflight import single_flight
+from core.cache import cached
+from core.invalidation import publish
+from models.hackathon import RegistrationCounts
+from models.user import UserRole
+from repositories.base import next_position
 
 
+STAFF_ROLES = {UserRole.ADMIN.value, UserRole.PRINCIPAL.value, UserRole.HOD.value, UserRole.TEACHER.value}
+SYNC_STREAMS = ("h", "r", "t")
+SYNC_MAX_LIMIT = 1000
+
+
+def _encode_cursor(positions: Dict) -> str:
+    raw = json.dumps(positions, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: Optional[str]) -> Dict:
+    if not cursor:
+        return {key: None for key in SYNC_STREAMS}
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        positions = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return {key: positions.get(key) for key in SYNC_STREAMS}
+    except Exception:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid sync cursor")
+
+
+@instrument_service
 class HackathonService:
     """Service layer for hackathon posts and registrations"""
 
     @staticmethod
     def create_hackathon(payload: Dict, creator: Dict) -> Dict:
-        if not supabase_admin:
+        if not repos.configured:
             raise HTTPException(status_code=500, detail="Service role key not configured")
         try:
             source = payload.get("source", "manual") or "manual"
@@ -31,27 +64,22 @@ class HackathonService:
                     "created_at": datetime.utcnow().isoformat(),
                 }
             )
-            # Keep optional AI metadata only if the column exists in the DB; fallback without it when missing.
+            # Optional AI metadata; the repository drops it when the column is missing in the DB.
             if payload.get("suggested_by_model") is not None:
                 record["suggested_by_model"] = payload.get("suggested_by_model")
 
-            try:
-                res = supabase_admin.table("hackathons").insert(record).execute()
-                return res.data[0]
-            except Exception as exc:
-                msg = str(exc)
-                if "suggested_by_model" in msg and "schema cache" in msg:
-                    record.pop("suggested_by_model", None)
-                    res = supabase_admin.table("hackathons").insert(record).execute()
-                    return res.data[0]
-                raise
+            created = repos.hackathons.insert(record)
+            publish("hackathons")
+            return created
+        except HTTPException:
+            raise
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Error creating hackathon: {e}")
 
     @staticmethod
     def ai_suggest(payload: Dict, creator: Dict) -> Dict:
         # force AI source + pending approval
-        if not supabase_admin:
+        if not repos.configured:
             raise HTTPException(status_code=500, detail="Service role key not configured")
 
         link = payload.get("link")
@@ -59,15 +87,9 @@ class HackathonService:
 
         try:
             # Prevent duplicates (approved/pending/rejected) on same link or title
-            existing = (
-                supabase_admin.table("hackathons")
-                .select("id, approval_status")
-                .or_(f"link.eq.{link},title.eq.{title}")
-                .limit(1)
-                .execute()
-            )
-            if existing.data:
-                status_value = existing.data[0].get("approval_status")
+            existing = repos.hackathons.find_by_link_or_title(link, title)
+            if existing:
+                status_value = existing.get("approval_status")
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
                     detail=f"Hackathon already present with status '{status_value}', not suggesting again",
@@ -85,48 +107,77 @@ class HackathonService:
             raise HTTPException(status_code=500, detail=f"Error suggesting hackathon: {e}")
 
     @staticmethod
+    def get_hackathon(hackathon_id: str, viewer: Dict) -> Dict:
+        """One hackathon, from the hot table or else the archive; students only see approved ones"""
+        if not repos.configured:
+            raise HTTPException(status_code=500, detail="Service role key not configured")
+        try:
+            hackathon = repos.hackathons.get(hackathon_id)
+            if hackathon is None:
+                hackathon = archive.store.get_hackathon(hackathon_id)
+                if hackathon is not None:
+                    hackathon["archived"] = True
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Error fetching hackathon: {e}")
+        if not hackathon or (viewer.get("role") not in STAFF_ROLES and hackathon.get("approval_status") != "approved"):
+            raise HTTPException(status_code=404, detail="Hackathon not found")
+        return hackathon
+
+    @staticmethod
+    @single_flight
+    @cached("hackathons")
     def list_hackathons(include_inactive: bool = False) -> List[Dict]:
-        if not supabase_admin:
+        if not repos.configured:
             raise HTTPException(status_code=500, detail="Service role key not configured")
         try:
-            query = supabase_admin.table("hackathons").select("*").eq("approval_status", "approved")
-            if not include_inactive:
-                query = query.eq("is_active", True)
-            res = query.order("deadline", desc=False).order("created_at", desc=True).execute()
-            return res.data
+            return repos.hackathons.list("approved", active_only=not include_inactive)
+        except HTTPException:
+            raise
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Error fetching hackathons: {e}")
 
     @staticmethod
+    def with_registration_counts(hackathons: List[Dict]) -> List[Dict]:
+        """Copies of `hackathons` with total and per-status registration counts, from one grouped query"""
+        if not repos.configured:
+            raise HTTPException(status_code=500, detail="Service role key not configured")
+        try:
+            counts = repos.registrations.get_status_counts([item["id"] for item in hackathons])
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Error counting registrations: {e}")
+        result = []
+        for item in hackathons:
+            by_status = counts.get(item["id"], {})
+            # Every status key, zero-filled: the list is serialized without re-validation
+            counts_model = RegistrationCounts(total=sum(by_status.values()), **by_status)
+            result.append({**item, "registration_counts": counts_model.model_dump()})
+        return result
+
+    @staticmethod
+    @single_flight
+    @cached("hackathons")
     def list_pending() -> List[Dict]:
-        if not supabase_admin:
+        if not repos.configured:
             raise HTTPException(status_code=500, detail="Service role key not configured")
         try:
-            res = (
-                supabase_admin.table("hackathons")
-                .select("*")
-                .eq("approval_status", "pending")
-                .order("created_at", desc=True)
-                .execute()
-            )
-            return res.data
+            return repos.hackathons.list("pending")
+        except HTTPException:
+            raise
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Error fetching pending hackathons: {e}")
 
     @staticmethod
     def register_for_hackathon(hackathon_id: str, student: Dict, payload: Dict) -> Dict:
-        if not supabase_admin:
+        if not repos.configured:
             raise HTTPException(status_code=500, detail="Service role key not configured")
         try:
             # prevent duplicate registration per student per hackathon
-            existing = (
-                supabase_admin.table("hackathon_registrations")
-                .select("id")
-                .eq("hackathon_id", hackathon_id)
-                .eq("student_college_id", student.get("college_id"))
-                .execute()
-            )
-            if existing.data:
+            existing = repos.registrations.find(hackathon_id, student.get("college_id"))
+            if existing:
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
                     detail="Already registered for this hackathon",
@@ -142,36 +193,89 @@ class HackathonService:
                     "created_at": datetime.utcnow().isoformat(),
                 }
             )
-            res = supabase_admin.table("hackathon_registrations").insert(record).execute()
-            return res.data[0]
+            created = repos.registrations.insert(record)
+            publish("registrations", tag=hackathon_id)
+            publish("stats", tag=hackathon_id)
+            return created
         except HTTPException:
             raise
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Error registering: {e}")
 
     @staticmethod
-    def list_registrations(hackathon_id: str) -> List[Dict]:
-        if not supabase_admin:
+    @single_flight
+    @cached("registrations", tag="hackathon_id")
+    def list_registrations(hackathon_id: str, department: Optional[str] = None) -> List[Dict]:
+        """All registrations, or only those of students in `department` (HOD/teacher views)"""
+        if not repos.configured:
             raise HTTPException(status_code=500, detail="Service role key not configured")
         try:
-            res = (
-                supabase_admin.table("hackathon_registrations")
-                .select("*")
-                .eq("hackathon_id", hackathon_id)
-                .execute()
-            )
-            return res.data
+            rows = repos.registrations.list_by_hackathon(hackathon_id, department=department)
+            if not rows and archive.store.contains(hackathon_id):
+                rows = archive.store.list_registrations(hackathon_id, department=department)
+            return rows
+        except HTTPException:
+            raise
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Error fetching registrations: {e}")
 
+    @staticmethod
+    def get_changes(since: Optional[str], viewer: Dict, limit: int = 500) -> Dict:
+        """
+        Return hackathons, registrations and tombstones changed after the cursor.
+        Students only see approved hackathons and their own registrations.
+        Rows changed in the last CHANGE_FEED_SETTLE_S come again on the next
+        call, so clients apply them by id.
+        """
+        if not repos.configured:
+            raise HTTPException(status_code=500, detail="Service role key not configured")
+        positions = _decode_cursor(since)
+        limit = max(1, min(limit, SYNC_MAX_LIMIT))
+        is_staff = viewer.get("role") in STAFF_ROLES
+        college_id = viewer.get("college_id")
+
+        try:
+            hackathon_filters = {} if is_staff else {"approval_status": "approved"}
+            registration_filters = {} if is_staff else {"student_college_id": college_id}
+            pages = {
+                "h": repos.hackathons.changed_since(positions["h"], limit, hackathon_filters),
+                "r": repos.registrations.changed_since(positions["r"], limit, registration_filters),
+                "t": repos.tombstones.changed_since(positions["t"], limit, {}),
+            }
+
+            next_positions = {
+                key: next_position(positions[key], rows, limit, settings.CHANGE_FEED_SETTLE_S)
+                for key, rows in pages.items()
+            }
+
+            deleted = [
+                {"entity": row["entity"], "entity_id": row["entity_id"], "deleted_at": row["updated_at"]}
+                for row in pages["t"]
+                if is_staff or row["entity"] == "hackathon" or row.get("scope_college_id") == college_id
+            ]
+            return {
+                "hackathons": pages["h"],
+                "registrations": pages["r"],
+                "deleted": deleted,
+                "cursor": _encode_cursor(next_positions),
+                "has_more": any(len(rows) >= limit for rows in pages.values()),
+            }
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Error fetching changes: {e}")
+
     @staticmethod
     def delete_hackathon(hackathon_id: str) -> None:
-        if not supabase_admin:
+        """Delete a hackathon; the schema triggers record tombstones for it and its registrations"""
+        if not repos.configured:
             raise HTTPException(status_code=500, detail="Service role key not configured")
         try:
-            res = supabase_admin.table("hackathons").delete().eq("id", hackathon_id).execute()
-            if not res.data:
+            if not repos.hackathons.delete(hackathon_id):
                 raise HTTPException(status_code=404, detail="Hackathon not found")
+            publish("hackathons")
+            publish("registrations", tag=hackathon_id)
+            publish("stats", tag=hackathon_id)
         except HTTPException:
             raise
         except Exception as e:
@@ -179,36 +283,27 @@ class HackathonService:
 
     @staticmethod
     def approve_hackathon(hackathon_id: str, approver: Dict) -> Dict:
-        if not supabase_admin:
+        if not repos.configured:
             raise HTTPException(status_code=500, detail="Service role key not configured")
         try:
-            existing = (
-                supabase_admin.table("hackathons")
-                .select("approval_status")
-                .eq("id", hackathon_id)
-                .limit(1)
-                .execute()
-            )
-            if not existing.data:
+            existing = repos.hackathons.get(hackathon_id, columns="approval_status")
+            if not existing:
                 raise HTTPException(status_code=404, detail="Hackathon not found")
-            status_value = existing.data[0].get("approval_status")
+            status_value = existing.get("approval_status")
             if status_value != "pending":
                 raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Already decided")
 
-            res = (
-                supabase_admin.table("hackathons")
-                .update(
-                    {
-                        "approval_status": "approved",
-                        "approved_by": approver.get("college_id"),
-                        "is_active": True,
-                        "updated_at": datetime.utcnow().isoformat(),
-                    }
-                )
-                .eq("id", hackathon_id)
-                .execute()
+            approved = repos.hackathons.update(
+                hackathon_id,
+                {
+                    "approval_status": "approved",
+                    "approved_by": approver.get("college_id"),
+                    "is_active": True,
+                    "updated_at": datetime.utcnow().isoformat(),
+                },
             )
-            return res.data[0]
+            publish("hackathons")
+            return approved
         except HTTPException:
             raise
         except Exception as e:
@@ -216,36 +311,27 @@ class HackathonService:
 
     @staticmethod
     def reject_hackathon(hackathon_id: str, approver: Dict, note: str | None = None) -> Dict:
-        if not supabase_admin:
+        if not repos.configured:
             raise HTTPException(status_code=500, detail="Service role key not configured")
         try:
-            existing = (
-                supabase_admin.table("hackathons")
-                .select("approval_status")
-                .eq("id", hackathon_id)
-                .limit(1)
-                .execute()
-            )
-            if not existing.data:
+            existing = repos.hackathons.get(hackathon_id, columns="approval_status")
+            if not existing:
                 raise HTTPException(status_code=404, detail="Hackathon not found")
-            status_value = existing.data[0].get("approval_status")
+            status_value = existing.get("approval_status")
             if status_value != "pending":
                 raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Already decided")
 
-            res = (
-                supabase_admin.table("hackathons")
-                .update(
-                    {
-                        "approval_status": "rejected",
-                        "approved_by": approver.get("college_id"),
-                        "is_active": False,
-                        "updated_at": datetime.utcnow().isoformat(),
-                    }
-                )
-                .eq("id", hackathon_id)
-                .execute()
+            rejected = repos.hackathons.update(
+                hackathon_id,
+                {
+                    "approval_status": "rejected",
+                    "approved_by": approver.get("college_id"),
+                    "is_active": False,
+                    "updated_at": datetime.utcnow().isoformat(),
+                },
             )
-            return res.data[0]
+            publish("hackathons")
+            return rejected
         except HTTPException:
             raise
         except Exception as e:
@@ -255,76 +341,69 @@ class HackathonService:
     def acknowledge_registration(registration_id: str, reviewer: Dict, status_value: str, note: str | None = None) -> Dict:
         if status_value not in {"acknowledged", "rejected"}:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid status")
-        if not supabase_admin:
+        if not repos.configured:
             raise HTTPException(status_code=500, detail="Service role key not configured")
         try:
-            res = (
-                supabase_admin.table("hackathon_registrations")
-                .update(
-                    {
-                        "status": status_value,
-                        "acknowledged_by": reviewer.get("college_id"),
-                        "notes": note,
-                        "updated_at": datetime.utcnow().isoformat(),
-                    }
-                )
-                .eq("id", registration_id)
-                .execute()
+            updated = repos.registrations.update(
+                registration_id,
+                {
+                    "status": status_value,
+                    "acknowledged_by": reviewer.get("college_id"),
+                    "notes": note,
+                    "updated_at": datetime.utcnow().isoformat(),
+                },
             )
-            if not res.data:
+            if not updated:
                 raise HTTPException(status_code=404, detail="Registration not found")
-            return res.data[0]
+            publish("registrations", tag=updated.get("hackathon_id"))
+            return updated
         except HTTPException:
             raise
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Error updating registration: {e}")
 
     @staticmethod
-    def get_hackathon_stats(hackathon_id: str) -> Dict:
-        if not supabase_admin:
+    @single_flight
+    @cached("stats", tag="hackathon_id")
+    def get_hackathon_stats(hackathon_id: str, department: Optional[str] = None) -> Dict:
+        """Per-department registration stats; with `department`, only that department's (HOD/teacher views)"""
+        if not repos.configured:
             raise HTTPException(status_code=500, detail="Service role key not configured")
 
         try:
-            hackathon_res = (
-                supabase_admin.table("hackathons")
-                .select("id, title")
-                .eq("id", hackathon_id)
-                .limit(1)
-                .execute()
-            )
-            if not hackathon_res.data:
+            hackathon = repos.hackathons.get(hackathon_id, columns="id, title")
+            archived = hackathon is None
+            if archived:
+                hackathon = archive.store.get_hackathon(hackathon_id)
+            if not hackathon:
                 raise HTTPException(status_code=404, detail="Hackathon not found")
-            hackathon = hackathon_res.data[0]
 
-            regs_res = (
-                supabase_admin.table("hackathon_registrations")
-                .select("student_college_id")
-                .eq("hackathon_id", hackathon_id)
-                .execute()
-            )
-            reg_ids = [row.get("student_college_id") for row in regs_res.data or [] if row.get("student_college_id")]
+            if archived:
+                regs = archive.store.list_registrations(hackathon_id, department=department)
+            else:
+                regs = repos.registrations.list_by_hackathon(hackathon_id, columns="student_college_id", department=department)
+            reg_ids = [row.get("student_college_id") for row in regs if row.get("student_college_id")]
 
             # Total students per department
-            totals_res = (
-                supabase_admin.table("college_users")
-                .select("department")
-                .eq("role", "student")
-                .execute()
-            )
+            totals = repos.users.list(role="student", department=department, columns="department")
             total_by_dept: Dict[str | None, int] = {}
-            for row in totals_res.data or []:
+            for row in totals:
                 dept = row.get("department")
                 total_by_dept[dept] = total_by_dept.get(dept, 0) + 1
 
             registered_by_dept: Dict[str | None, int] = {}
-            if reg_ids:
-                students_res = (
-                    supabase_admin.table("college_users")
-                    .select("college_id, department")
-                    .in_("college_id", reg_ids)
-                    .execute()
-                )
-                for row in students_res.data or []:
+            if department is not None:
+                # The registrations were already filtered to this department upstream
+                if reg_ids:
+                    registered_by_dept[department] = len(reg_ids)
+            elif archived:
+                # Archived rows carry the student's department as it was when archived
+                for row in regs:
+                    dept = row.get("student_department")
+                    registered_by_dept[dept] = registered_by_dept.get(dept, 0) + 1
+            elif reg_ids:
+                students = repos.users.list_by_college_ids(reg_ids, columns="college_id, department")
+                for row in students:
                     dept = row.get("department")
                     registered_by_dept[dept] = registered_by_dept.get(dept, 0) + 1
 
@@ -0,0 +1,139 @@
+import csv
+import os
+from typing import Dict, Optional
+from fastapi import HTTPException, status
+from pydantic import ValidationError
+from config.repositories import repos
+from config.settings import settings
+from core.context import instrument_service
+from core.invalidation import publish
+from core.jobs import JobProgress, JobResult, job_handler, runner
+from models.user import AddUserRequest
+from services.archive import ArchiveService
+from services.auth import AuthService
+from services.hackathon import HackathonService
+from services.provisioning import ProvisioningService, redact_passwords
+
+EXPORT_COLUMNS = ("college_id", "name", "email", "role", "department", "is_active", "auth_user_id", "created_at")
+REGISTRATION_EXPORT_COLUMNS = (
+    "id", "hackathon_id", "student_college_id", "status", "link_submission", "notes", "acknowledged_by", "created_at", "updated_at",
+)
+
+
+@job_handler("dashboard_stats")
+def _dashboard_stats(params: Dict, progress: JobProgress) -> Dict:
+    return AuthService.get_dashboard_stats()
+
+
+@job_handler("hackathon_stats")
+def _hackathon_stats(params: Dict, progress: JobProgress) -> Dict:
+    if not params.get("hackathon_id"):
+        raise HTTPException(status_code=400, detail="params.hackathon_id is required")
+    return HackathonService.get_hackathon_stats(params["hackathon_id"])
+
+
+@job_handler("users_export")
+def _users_export(params: Dict, progress: JobProgress) -> JobResult:
+    """CSV of college users, optionally filtered by role and department"""
+    users = AuthService.list_users(role=params.get("role"), department=params.get("department"))
+    os.makedirs(settings.JOB_RESULTS_DIR, exist_ok=True)
+    path = os.path.join(settings.JOB_RESULTS_DIR, f"users_export_{progress.job_id}.csv")
+    with open(path, "w", newline="", encoding="utf-8") as fh:
+        writer = csv.DictWriter(fh, fieldnames=EXPORT_COLUMNS, extrasaction="ignore")
+        writer.writeheader()
+        for index, user in enumerate(users, 1):
+            writer.writerow(user)
+            progress.update(index, len(users))
+    progress.update(len(users), len(users), force=True)
+    return JobResult(location=path, summary={"rows": len(users)})
+
+
+@job_handler("registrations_export")
+def _registrations_export(params: Dict, progress: JobProgress) -> JobResult:
+    """CSV of one hackathon's registrations, archived or not"""
+    if not params.get("hackathon_id"):
+        raise HTTPException(status_code=400, detail="params.hackathon_id is required")
+    rows = HackathonService.list_registrations(params["hackathon_id"], department=params.get("department"))
+    os.makedirs(settings.JOB_RESULTS_DIR, exist_ok=True)
+    path = os.path.join(settings.JOB_RESULTS_DIR, f"registrations_export_{progress.job_id}.csv")
+    with open(path, "w", newline="", encoding="utf-8") as fh:
+        writer = csv.DictWriter(fh, fieldnames=REGISTRATION_EXPORT_COLUMNS, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(rows)
+    progress.update(len(rows), len(rows), force=True)
+    return JobResult(location=path, summary={"rows": len(rows)})
+
+
+@job_handler("bulk_add_users")
+def _bulk_add_users(params: Dict, progress: JobProgress) -> Dict:
+    """Pre-register many users; one failure does not stop the rest"""
+    records = params.get("users") or []
+    created, failed = 0, []
+    for index, record in enumerate(records, 1):
+        try:
+            AuthService.add_user(AddUserRequest(**record))
+            created += 1
+        except (HTTPException, ValidationError) as exc:
+            detail = exc.detail if isinstance(exc, HTTPException) else str(exc)
+            failed.append({"college_id": record.get("college_id"), "detail": detail})
+        progress.update(index, len(records), message=f"{created} created, {len(failed)} failed")
+    progress.update(len(records), len(records), message=f"{created} created, {len(failed)} failed", force=True)
+    if created:
+        publish("stats")
+    return {"created": created, "failed": failed}
+
+
+@job_handler("bulk_activate")
+def _bulk_activate(params: Dict, progress: JobProgress) -> JobResult:
+    return ProvisioningService.bulk_activate(params, progress)
+
+
+@job_handler("archive_hackathons")
+def _archive_hackathons(params: Dict, progress: JobProgress) -> Dict:
+    return ArchiveService.archive_hackathons(params, progress)
+
+
+@instrument_service
+class JobService:
+    """Submit and inspect background jobs (see core/jobs.py)"""
+
+    @staticmethod
+    def submit(kind: str, params: Dict, creator: Dict) -> Dict:
+        if not repos.configured:
+            raise HTTPException(status_code=500, detail="Service role key not configured")
+        try:
+            return runner.submit(kind, params, creator.get("college_id"))
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Error submitting job: {e}")
+
+    @staticmethod
+    def get_job(job_id: str) -> Dict:
+        if not repos.configured:
+            raise HTTPException(status_code=500, detail="Service role key not configured")
+        try:
+            job = repos.jobs.get(job_id)
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Error fetching job: {e}")
+        if not job:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+        return job
+
+    @staticmethod
+    def result_path(job_id: str) -> Optional[str]:
+        job = JobService.get_job(job_id)
+        if job.get("status") != "done" or not job.get("result_location"):
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Job has no downloadable result yet")
+        if not os.path.exists(job["result_location"]):
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Result file is not available on this server")
+        return job["result_location"]
+
+    @staticmethod
+    def result_downloaded(job_id: str) -> None:
+        """Called once a result file has been sent: bulk activation outcomes lose their one-time passwords"""
+        job = JobService.get_job(job_id)
+        if job.get("kind") == "bulk_activate" and os.path.exists(job["result_location"]):
+            redact_passwords(job["result_location"])
@@ -0,0 +1,307 @@
+"""
+Bulk account activation: pre-provision auth accounts for a whole intake
+
+Runs as the "bulk_activate" background job. For every pre-registered, active
+user without an auth account it creates one with a random one-time password
+(auth admin create_user, BULK_ACTIVATION_CONCURRENCY calls in flight and at
+most BULK_ACTIVATION_RATE per second), then links the new auth ids
+BULK_LINK_BATCH_SIZE at a time through the link_auth_users RPC instead of one
+update per user.
+
+Per-user outcomes (college_id, email, status, auth_user_id, one_time_password,
+detail) are appended to a CSV under JOB_RESULTS_DIR as they happen, and the
+file is compacted to one row per user when the job finishes. Statuses:
+linked, already_active, inactive, not_found, failed, and created (account made
+but not linked yet).
+
+The CSV is also the checkpoint: a job submitted with `resume_job_id` keeps the
+interrupted job's outcomes, links the accounts it created but did not link,
+and carries on with the remaining users (failed ones are tried again). An auth
+account that exists for a user's email but is linked to no profile (its run
+died before checkpointing it) is reused with a fresh one-time password; one
+whose profile turns out to be linked or removed meanwhile is deleted.
+Users should change the one-time password at first login (/auth/change-password).
+
+The outcomes file is readable by the server's user only, and its
+one_time_password column is blanked once the file has been downloaded
+(GET /admin/jobs/{id}/result) or BULK_PASSWORD_TTL_S after it was last
+written, whichever comes first. Resuming a job blanks the old file, since its
+passwords move to the new one.
+"""
+import glob
+import contextvars
+import csv
+import logging
+import os
+import secrets
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Iterable, List, Optional, Tuple
+from fastapi import HTTPException, status
+from config.repositories import repos
+from config.settings import settings
+from core.context import instrument_service
+from core.invalidation import publish
+from core.jobs import JobProgress, JobResult
+
+logger = logging.getLogger("hackathon.provisioning")
+
+OUTCOME_COLUMNS = ("college_id", "email", "status", "auth_user_id", "one_time_password", "detail")
+# Outcomes a resumed job keeps as they are
+SETTLED = {"linked", "already_active", "inactive", "not_found"}
+PASSWORD_EXPIRY_INTERVAL_S = 300.0
+
+
+class _RateLimiter:
+    """Spaces calls at least 1/rate seconds apart across the pool's threads"""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next = time.monotonic()
+        self._lock = threading.Lock()
+
+    def wait(self) -> None:
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(self._next, now)
+            self._next = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+def _results_path(job_id: str) -> str:
+    return os.path.join(settings.JOB_RESULTS_DIR, f"bulk_activate_{job_id}.csv")
+
+
+def _open_private(path: str):
+    """Open `path` for writing, readable and writable by this user only (it holds one-time passwords)"""
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    os.fchmod(fd, 0o600)  # in case it already existed
+    return open(fd, "w", newline="", encoding="utf-8")
+
+
+def _write_outcomes(path: str, rows: Iterable[Dict]) -> None:
+    with _open_private(path + ".tmp") as fh:
+        writer = csv.DictWriter(fh, fieldnames=OUTCOME_COLUMNS, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(rows)
+    os.replace(path + ".tmp", path)
+
+
+def redact_passwords(path: str) -> bool:
+    """Blank the one-time passwords of an outcomes file; False if there were none left"""
+    outcomes = _read_outcomes(path)
+    if not any(row.get("one_time_password") for row in outcomes.values()):
+        return False
+    _write_outcomes(path, ({**row, "one_time_password": ""} for row in outcomes.values()))
+    return True
+
+
+def expire_passwords() -> int:
+    """Redact outcomes files not written to for BULK_PASSWORD_TTL_S; returns how many were redacted"""
+    cutoff = time.time() - settings.BULK_PASSWORD_TTL_S
+    redacted = 0
+    for path in glob.glob(os.path.join(settings.JOB_RESULTS_DIR, "bulk_activate_*.csv")):
+        try:
+            if os.path.getmtime(path) < cutoff and redact_passwords(path):
+                redacted += 1
+        except OSError as exc:
+            logger.warning("Could not expire one-time passwords in %s: %s", path, exc)
+    return redacted
+
+
+def _expire_passwords_forever() -> None:
+    while True:
+        time.sleep(PASSWORD_EXPIRY_INTERVAL_S)
+        try:
+            expire_passwords()
+        except Exception as exc:
+            logger.warning("One-time password expiry failed: %s", exc)
+
+
+def start_password_expiry() -> None:
+    """Redact expired outcomes files now, then every PASSWORD_EXPIRY_INTERVAL_S in a daemon thread"""
+    expire_passwords()
+    threading.Thread(target=_expire_passwords_forever, name="password-expiry", daemon=True).start()
+
+
+def _read_outcomes(path: str) -> Dict[str, Dict]:
+    """Last row per college_id of an outcomes file"""
+    with open(path, newline="", encoding="utf-8") as fh:
+        return {row["college_id"]: row for row in csv.DictReader(fh)}
+
+
+def _previous_outcomes(resume_job_id: Optional[str]) -> Dict[str, Dict]:
+    if not resume_job_id:
+        return {}
+    job = repos.jobs.get(resume_job_id)
+    if not job or job.get("kind") != "bulk_activate":
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="resume_job_id is not a bulk activation job")
+    if job.get("status") in ("queued", "running"):
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="The job to resume is still running")
+    path = _results_path(resume_job_id)
+    if not os.path.exists(path):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="The job's outcomes are not available on this server")
+    outcomes = _read_outcomes(path)
+    redact_passwords(path)  # the passwords move to the resuming job's file
+    return outcomes
+
+
+def _targets(params: Dict) -> Tuple[List[Dict], List[str]]:
+    """(user rows to consider, requested college_ids that do not exist)"""
+    columns = "college_id, email, auth_user_id, is_active"
+    college_ids = params.get("college_ids")
+    if college_ids:
+        users = repos.users.list_by_college_ids(college_ids, columns=columns)
+        found = {user["college_id"] for user in users}
+        return users, [college_id for college_id in dict.fromkeys(college_ids) if college_id not in found]
+    if not params.get("role") and not params.get("department"):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Give college_ids, or a role and/or department")
+    return repos.users.list(role=params.get("role"), department=params.get("department"), columns=columns), []
+
+
+def _orphaned_auth_user(email: str) -> Optional[Dict]:
+    """
+    The auth account of `email` if no profile is linked to it: left behind by a
+    run that died between create_user and its checkpoint row
+    """
+    existing = repos.auth.find_user_by_email(email)
+    if existing is None or repos.users.get_by_auth_id(existing["id"]) is not None:
+        return None
+    return existing
+
+
+def _discard(auth_user_id: str) -> Dict:
+    """Delete an auth account whose profile could not be linked; returns the outcome fields to record"""
+    detail = "Profile was linked or removed meanwhile"
+    try:
+        repos.auth.delete_user(auth_user_id)
+    except Exception as exc:
+        logger.warning("Deleting unlinked auth account %s failed: %s", auth_user_id, exc)
+        return {"one_time_password": None, "detail": f"{detail}; deleting auth account {auth_user_id} failed: {exc}"}
+    return {"auth_user_id": None, "one_time_password": None, "detail": f"{detail}; its new auth account was deleted"}
+
+
+@instrument_service
+class ProvisioningService:
+    """Bulk creation and linking of auth accounts (see module docstring)"""
+
+    @staticmethod
+    def bulk_activate(params: Dict, progress: JobProgress) -> JobResult:
+        if not repos.configured:
+            raise HTTPException(status_code=500, detail="Service role key not configured")
+
+        previous = _previous_outcomes(params.get("resume_job_id"))
+        users, missing = _targets(params)
+        os.makedirs(settings.JOB_RESULTS_DIR, exist_ok=True)
+        path = _results_path(progress.job_id)
+        outcomes: Dict[str, Dict] = {}
+        pending: Dict[str, str] = {}  # college_id -> auth id created but not linked yet
+
+        with _open_private(path) as fh:
+            writer = csv.DictWriter(fh, fieldnames=OUTCOME_COLUMNS, extrasaction="ignore")
+            writer.writeheader()
+
+            def record(row: Dict) -> None:
+                outcomes[row["college_id"]] = row
+                writer.writerow(row)
+                fh.flush()
+
+            def link() -> None:
+                try:
+                    linked = set(repos.users.link_auth_ids(pending))
+                    unlinked = [college_id for college_id in pending if college_id not in linked]
+                    # A profile already holding our auth id was linked by an earlier, interrupted call
+                    current = {
+                        row["college_id"]: row.get("auth_user_id")
+                        for row in repos.users.list_by_college_ids(unlinked, columns="college_id, auth_user_id")
+                    }
+                except Exception as exc:
+                    # Stay "created" in the checkpoint; retried with the next batch or on resume
+                    logger.warning("Linking %d auth accounts failed: %s", len(pending), exc)
+                    return
+                for college_id, auth_user_id in list(pending.items()):
+                    row = outcomes[college_id]
+                    if college_id in linked or current.get(college_id) == auth_user_id:
+                        record({**row, "status": "linked"})
+                    else:
+                        record({**row, **_discard(auth_user_id), "status": "failed"})
+                    del pending[college_id]
+
+            for college_id, row in previous.items():
+                if row["status"] in SETTLED or row["status"] == "created":
+                    record(row)
+                if row["status"] == "created":
+                    pending[college_id] = row["auth_user_id"]
+            for college_id in missing:
+                if college_id not in outcomes:
+                    record({"college_id": college_id, "status": "not_found"})
+
+            todo = []
+            for user in users:
+                base = {"college_id": user["college_id"], "email": user.get("email")}
+                if user["college_id"] in outcomes:
+                    continue
+                if user.get("auth_user_id"):
+                    record({**base, "status": "already_active", "auth_user_id": user["auth_user_id"]})
+                elif not user.get("is_active", True):
+                    record({**base, "status": "inactive"})
+                else:
+                    todo.append(user)
+
+            total = len(outcomes) + len(todo)
+            limiter = _RateLimiter(settings.BULK_ACTIVATION_RATE)
+
+            def create(user: Dict) -> Tuple[str, Optional[Dict], bool]:
+                limiter.wait()
+                password = secrets.token_urlsafe(12)
+                try:
+                    return password, repos.auth.create_user(user["email"], password), False
+                except Exception:
+                    existing = _orphaned_auth_user(user["email"])
+                    if existing is None:
+                        raise
+                    repos.auth.update_password(existing["id"], password)
+                    return password, existing, True
+
+            with ThreadPoolExecutor(max_workers=settings.BULK_ACTIVATION_CONCURRENCY, thread_name_prefix="provision") as pool:
+                futures = {pool.submit(contextvars.copy_context().run, create, user): user for user in todo}
+                for done, future in enumerate(as_completed(futures), 1):
+                    user = futures[future]
+                    base = {"college_id": user["college_id"], "email": user.get("email")}
+                    try:
+                        password, auth_user, reused = future.result()
+                        if not auth_user:
+                            raise RuntimeError("Auth provider returned no user")
+                        record({
+                            **base,
+                            "status": "created",
+                            "auth_user_id": auth_user["id"],
+                            "one_time_password": password,
+                            "detail": "Reused an unlinked auth account" if reused else None,
+                        })
+                        pending[user["college_id"]] = auth_user["id"]
+                    except Exception as exc:
+                        detail = exc.detail if isinstance(exc, HTTPException) else str(exc)
+                        record({**base, "status": "failed", "detail": detail})
+                    if len(pending) >= settings.BULK_LINK_BATCH_SIZE:
+                        link()
+                    progress.update(total - len(todo) + done, total)
+            if pending:
+                link()
+
+        # One row per user from here on
+        _write_outcomes(path, outcomes.values())
+
+        counts: Dict[str, int] = {}
+        for row in outcomes.values():
+            counts[row["status"]] = counts.get(row["status"], 0) + 1
+        progress.update(total, total, message=", ".join(f"{n} {name}" for name, n in sorted(counts.items())), force=True)
+        if counts.get("linked"):
+            publish("stats")
+        if pending:
+            raise RuntimeError(f"{len(pending)} accounts were created but not linked; resume this job to link them")
+        return JobResult(location=path, summary={"total": total, **counts})
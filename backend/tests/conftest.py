@@ -0,0 +1,8 @@
+import os
+
+# Placeholder settings so modules import without a .env file or a Supabase project
+os.environ.setdefault("SUPABASE_URL", "http://127.0.0.1:54321")
+os.environ.setdefault("SUPABASE_ANON_KEY", "test-anon-key")
+os.environ.setdefault("SUPABASE_SERVICE_ROLE_KEY", "test-service-role-key")
+os.environ.setdefault("JWT_SECRET", "test-secret")
+os.environ.setdefault("REPOSITORY_BACKEND", "memory")
@@ -0,0 +1,38 @@
+import threading
+import time
+from config.settings import settings
+from core import cache
+from core.singleflight import single_flight
+
+
+def test_read_joining_a_flight_from_before_a_write_does_not_cache_it(monkeypatch):
+    monkeypatch.setattr(settings, "CACHE_TTLS", {"test": 60.0})
+    value = {"current": "old"}
+    leader_reading = threading.Event()
+    release_leader = threading.Event()
+
+    @single_flight
+    @cache.cached("test")
+    def read() -> dict:
+        result = {"value": value["current"]}
+        leader_reading.set()
+        release_leader.wait(5)
+        return result
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(read()))
+    leader.start()
+    assert leader_reading.wait(5)
+
+    # The write commits and invalidates while the leader's read is in flight
+    value["current"] = "new"
+    cache.invalidate("test")
+    follower = threading.Thread(target=lambda: results.append(read()))
+    follower.start()
+    time.sleep(0.05)  # let the follower join the leader's flight
+    release_leader.set()
+    leader.join(5)
+    follower.join(5)
+
+    assert len(results) == 2
+    assert read() == {"value": "new"}